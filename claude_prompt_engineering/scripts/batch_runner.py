@@ -0,0 +1,652 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Execução em Lote Distribuída
+----------------------------
+
+Gera os prompts de um arquivo de jobs (JSONL, um pedido por linha, com
+"model_id", "persona_id", "template_id", "task_description" e,
+opcionalmente, "parameters", "user_example" e "locale") dividindo-o em
+shards, faixas contíguas de linhas, processados por vários workers.
+
+O estado do lote fica em um diretório de trabalho:
+
+    manifest.json          arquivo de jobs, assinatura e quantidade de shards
+    pending/  running/     shards a processar e shards atribuídos a um worker
+    done/                  checkpoint de cada shard concluído
+    segments/              segmento de saída de cada shard
+
+Os workers recebem os shards diretamente do diretório de trabalho (que pode
+ser compartilhado entre máquinas) ou de um coordenador por socket local
+(HTTP). Cada worker renderiza os pedidos com PromptGenerator.generate_prompt()
+e grava o seu próprio segmento. Um shard só é marcado como concluído depois
+que o segmento está completo; se a execução for interrompida, a próxima
+execução sobre o mesmo diretório retoma apenas os shards não concluídos.
+
+Uso:
+    python3 batch_runner.py run jobs.jsonl --workdir lote/ --workers 4
+    python3 batch_runner.py run jobs.jsonl --workdir lote/ --transport socket --port 8766 --workers 0
+    python3 batch_runner.py worker --coordinator http://127.0.0.1:8766
+    python3 batch_runner.py worker --workdir lote/
+    python3 batch_runner.py status --workdir lote/
+    python3 batch_runner.py cat --workdir lote/ > prompts.jsonl
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from multiprocessing import Process
+from socketserver import ThreadingMixIn
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib import error, request
+
+from prompt_generator import (FALLBACK_LOCALE, LocaleCatalogs, PromptGenerator, ResourceManager,
+                              SOURCE_LOCALE, normalize_locale)
+from prompt_archive import ARCHIVE_SUFFIX, ArchiveWriter, dictionary_from_catalogs, iter_archive
+
+MANIFEST_FILENAME = "manifest.json"
+PENDING_DIR = "pending"
+RUNNING_DIR = "running"
+DONE_DIR = "done"
+SEGMENTS_DIR = "segments"
+
+DEFAULT_SHARD_SIZE = 1000
+SEGMENT_FORMATS = ("jsonl", "prar")
+TRANSPORTS = ("dir", "socket")
+
+# Intervalo de verificação do coordenador enquanto aguarda workers externos
+POLL_INTERVAL = 0.5
+# Segundos até o coordenador devolver à fila o shard de um worker que sumiu
+DEFAULT_LEASE_TIMEOUT = 600.0
+
+
+class BatchError(Exception):
+    pass
+
+
+def job_signature(path: str) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def plan_shards(job_path: str, shard_size: int = DEFAULT_SHARD_SIZE) -> List[Dict[str, int]]:
+    """Divide o arquivo de jobs em faixas de bytes com até `shard_size` pedidos
+
+    O arquivo é lido uma única vez e apenas os limites de cada faixa ficam
+    em memória.
+    """
+    shards = []
+    start, first_line, count = 0, 1, 0
+    offset = 0
+    with open(job_path, 'rb') as f:
+        for line_no, line in enumerate(f, 1):
+            if line.strip():
+                count += 1
+            offset += len(line)
+            if count == shard_size:
+                shards.append({"id": len(shards), "start": start, "end": offset,
+                               "first_line": first_line, "count": count})
+                start, first_line, count = offset, line_no + 1, 0
+    if count:
+        shards.append({"id": len(shards), "start": start, "end": offset,
+                       "first_line": first_line, "count": count})
+    return shards
+
+
+def read_shard(job_path: str, shard: Dict[str, int]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """(número da linha, pedido) de cada linha do shard; None para JSON inválido"""
+    with open(job_path, 'rb') as f:
+        f.seek(shard["start"])
+        line_no = shard["first_line"]
+        position = shard["start"]
+        while position < shard["end"]:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            if line.strip():
+                try:
+                    yield line_no, json.loads(line.decode("utf-8"))
+                except ValueError:
+                    yield line_no, None
+            line_no += 1
+
+
+class WorkDirectory:
+    """Estado de um lote em um diretório, compartilhável entre processos
+
+    As transições entre pending/, running/ e done/ usam os.rename, atômico
+    no mesmo sistema de arquivos: dois workers nunca recebem o mesmo shard.
+    """
+
+    def __init__(self, root: str):
+        # Caminho absoluto: os caminhos dos segmentos são enviados a workers com outro cwd
+        self.root = os.path.abspath(root)
+        self.manifest_file = os.path.join(root, MANIFEST_FILENAME)
+        self._manifest: Optional[Dict[str, Any]] = None
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    @staticmethod
+    def shard_filename(shard_id: int) -> str:
+        return f"{shard_id:06d}.json"
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        if self._manifest is None:
+            self._manifest = ResourceManager.load_json(self.manifest_file, None)
+            if not self._manifest:
+                raise BatchError(f"Diretório de trabalho sem lote: {self.root}")
+        return self._manifest
+
+    def prepare(self, job_path: str, shard_size: int = DEFAULT_SHARD_SIZE,
+                segment_format: str = "jsonl", restart: bool = False) -> Dict[str, Any]:
+        """Cria o lote ou retoma o lote existente do mesmo arquivo de jobs"""
+        job_path = os.path.abspath(job_path)
+        existing = ResourceManager.load_json(self.manifest_file, None)
+        if existing and not restart:
+            if existing["job"] != job_path or existing["signature"] != job_signature(job_path):
+                raise BatchError("O diretório de trabalho pertence a outro arquivo de jobs (use --restart)")
+            self._manifest = existing
+            self.requeue_running()
+            return existing
+
+        if os.path.isdir(self.root):
+            for name in (PENDING_DIR, RUNNING_DIR, DONE_DIR, SEGMENTS_DIR):
+                shutil.rmtree(self.path(name), ignore_errors=True)
+        for name in (PENDING_DIR, RUNNING_DIR, DONE_DIR, SEGMENTS_DIR):
+            os.makedirs(self.path(name), exist_ok=True)
+
+        shards = plan_shards(job_path, shard_size)
+        for shard in shards:
+            ResourceManager.save_json(self.path(PENDING_DIR, self.shard_filename(shard["id"])), shard)
+        manifest = {
+            "job": job_path,
+            "signature": job_signature(job_path),
+            "shard_size": shard_size,
+            "format": segment_format,
+            "shards": len(shards),
+            "requests": sum(shard["count"] for shard in shards),
+        }
+        ResourceManager.save_json(self.manifest_file, manifest)
+        self._manifest = manifest
+        return manifest
+
+    def requeue_running(self) -> List[int]:
+        """Devolve para pending/ os shards de workers interrompidos"""
+        requeued = []
+        for name in sorted(os.listdir(self.path(RUNNING_DIR))):
+            if os.path.exists(self.path(DONE_DIR, name)):
+                os.remove(self.path(RUNNING_DIR, name))
+                continue
+            os.rename(self.path(RUNNING_DIR, name), self.path(PENDING_DIR, name))
+            requeued.append(int(name.split(".")[0]))
+        return requeued
+
+    def lease(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Atribui ao worker o próximo shard pendente"""
+        for name in sorted(os.listdir(self.path(PENDING_DIR))):
+            if os.path.exists(self.path(DONE_DIR, name)):
+                # Concluído por um worker cujo prazo já tinha expirado
+                try:
+                    os.remove(self.path(PENDING_DIR, name))
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                os.rename(self.path(PENDING_DIR, name), self.path(RUNNING_DIR, name))
+            except FileNotFoundError:
+                # Outro worker ficou com o shard
+                continue
+            shard = ResourceManager.load_json(self.path(RUNNING_DIR, name))
+            shard["worker"] = worker
+            return shard
+        return None
+
+    def requests(self, shard: Dict[str, Any]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        return read_shard(self.manifest["job"], shard)
+
+    def segment_path(self, shard: Dict[str, Any]) -> str:
+        extension = ARCHIVE_SUFFIX if self.manifest["format"] == "prar" else ".jsonl"
+        return self.path(SEGMENTS_DIR, f"shard-{shard['id']:06d}{extension}")
+
+    def complete(self, shard: Dict[str, Any], stats: Dict[str, Any]):
+        """Grava o checkpoint do shard; o segmento já deve estar completo"""
+        name = self.shard_filename(shard["id"])
+        checkpoint = dict(shard, **stats)
+        tmp_path = self.path(DONE_DIR, f".{name}.tmp")
+        ResourceManager.save_json(tmp_path, checkpoint)
+        os.rename(tmp_path, self.path(DONE_DIR, name))
+        try:
+            os.remove(self.path(RUNNING_DIR, name))
+        except FileNotFoundError:
+            pass
+
+    def release(self, shard: Dict[str, Any]):
+        """Devolve um shard que o worker não conseguiu concluir"""
+        name = self.shard_filename(shard["id"])
+        try:
+            os.rename(self.path(RUNNING_DIR, name), self.path(PENDING_DIR, name))
+        except FileNotFoundError:
+            pass
+
+    def checkpoints(self) -> Dict[int, Dict[str, Any]]:
+        result = {}
+        for name in os.listdir(self.path(DONE_DIR)):
+            if name.endswith(".json") and not name.startswith("."):
+                checkpoint = ResourceManager.load_json(self.path(DONE_DIR, name), None)
+                if checkpoint:
+                    result[checkpoint["id"]] = checkpoint
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        checkpoints = self.checkpoints()
+        return {
+            "shards": self.manifest["shards"],
+            "pending": len(os.listdir(self.path(PENDING_DIR))),
+            "running": len(os.listdir(self.path(RUNNING_DIR))),
+            "done": len(checkpoints),
+            "records": sum(c.get("records", 0) for c in checkpoints.values()),
+            "errors": sum(len(c.get("errors", [])) for c in checkpoints.values()),
+        }
+
+    def iter_outputs(self) -> Iterator[Dict[str, Any]]:
+        """Registros dos shards concluídos, na ordem do arquivo de jobs"""
+        checkpoints = self.checkpoints()
+        for shard_id in sorted(checkpoints):
+            path = self.segment_path(checkpoints[shard_id])
+            if self.manifest["format"] == "prar":
+                yield from iter_archive(path)
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        yield json.loads(line)
+
+
+def validate_job(job: Any, languages: Optional[List[str]] = None):
+    """Verifica a forma de um pedido; levanta BatchError descrevendo o problema
+
+    Com `languages`, o locale do pedido também precisa ser de um desses idiomas.
+    """
+    if not isinstance(job, dict):
+        raise BatchError("o pedido deve ser um objeto JSON")
+    for key in ("model_id", "persona_id", "template_id", "task_description"):
+        if not isinstance(job.get(key), str) or not job[key]:
+            raise BatchError(f"'{key}' deve ser um texto não vazio")
+    for key in ("user_example", "locale"):
+        if key in job and not isinstance(job[key], str):
+            raise BatchError(f"'{key}' deve ser um texto")
+    parameters = job.get("parameters", {})
+    if not isinstance(parameters, dict):
+        raise BatchError("'parameters' deve ser um objeto")
+    for name, value in parameters.items():
+        if not isinstance(value, str):
+            raise BatchError(f"o parâmetro '{name}' deve ser um texto")
+    if "locale" in job:
+        try:
+            locale = normalize_locale(job["locale"])
+        except ValueError:
+            raise BatchError(f"locale inválido: '{job['locale']}'")
+        if languages is not None and locale.split("-")[0].lower() not in languages:
+            raise BatchError(f"locale desconhecido: '{job['locale']}'")
+
+
+class ShardRenderer:
+    """Renderiza pedidos com PromptGenerator.generate_prompt(), um gerador por locale"""
+
+    def __init__(self):
+        self.generators: Dict[str, PromptGenerator] = {}
+        self._languages: Optional[List[str]] = None
+
+    @property
+    def languages(self) -> List[str]:
+        """Idiomas com traduções nos catálogos, além do fallback"""
+        if self._languages is None:
+            locales = LocaleCatalogs().available_locales() + [FALLBACK_LOCALE]
+            self._languages = sorted({locale.split("-")[0].lower() for locale in locales})
+        return self._languages
+
+    def generator(self, locale: Optional[str]) -> PromptGenerator:
+        locale = normalize_locale(locale or SOURCE_LOCALE)
+        if locale not in self.generators:
+            self.generators[locale] = PromptGenerator(locale=locale)
+        return self.generators[locale]
+
+    def render(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """Registro no formato de save_prompt(); levanta BatchError para pedidos inválidos"""
+        validate_job(job, self.languages)
+        generator = self.generator(job.get("locale"))
+        for kind, key, catalog in (("Modelo", "model_id", generator.models),
+                                   ("Persona", "persona_id", generator.personas),
+                                   ("Template", "template_id", generator.templates)):
+            if job.get(key) not in catalog:
+                raise BatchError(f"{kind} não encontrado: {job.get(key)}")
+
+        generator.selected_model_id = job["model_id"]
+        generator.selected_persona_id = job["persona_id"]
+        generator.selected_template_id = job["template_id"]
+        generator.selected_model = generator.models[job["model_id"]]
+        generator.selected_persona = generator.personas[job["persona_id"]]
+        generator.selected_template = generator.templates[job["template_id"]]
+        generator.task_description = job["task_description"]
+        generator.parameters = dict(job.get("parameters", {}))
+        generator.user_example = job.get("user_example", "")
+        return generator.output_record(generator.generate_prompt())
+
+
+def process_shard(queue, shard: Dict[str, Any], renderer: ShardRenderer) -> Dict[str, Any]:
+    """Renderiza um shard e grava o seu segmento; retorna as estatísticas do checkpoint"""
+    path = queue.segment_path(shard)
+    tmp_path = f"{path}.{shard['worker']}.tmp"
+    records, errors = 0, []
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    if path.endswith(ARCHIVE_SUFFIX):
+        generator = renderer.generator(None)
+        output = ArchiveWriter(tmp_path, dictionary_from_catalogs(generator.personas, generator.templates))
+        write = output.append
+    else:
+        output = open(tmp_path, 'w', encoding='utf-8')
+        write = lambda record: output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    try:
+        for line_no, job in queue.requests(shard):
+            try:
+                if job is None:
+                    raise BatchError("JSON inválido")
+                write(renderer.render(job))
+                records += 1
+            except BatchError as e:
+                errors.append({"line": line_no, "error": str(e)})
+    finally:
+        output.close()
+    # O segmento só aparece completo
+    os.replace(tmp_path, path)
+    return {"worker": shard["worker"], "records": records, "errors": errors, "segment": os.path.basename(path)}
+
+
+def run_worker(queue, worker: str, max_shards: Optional[int] = None) -> int:
+    """Processa shards até a fila esvaziar; retorna quantos foram concluídos"""
+    renderer = ShardRenderer()
+    completed = 0
+    while max_shards is None or completed < max_shards:
+        shard = queue.lease(worker)
+        if shard is None:
+            break
+        try:
+            stats = process_shard(queue, shard, renderer)
+        except Exception:
+            queue.release(shard)
+            raise
+        queue.complete(shard, stats)
+        completed += 1
+    return completed
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class Coordinator:
+    """Distribui os shards de um diretório de trabalho por HTTP
+
+    Os pedidos de cada shard seguem na resposta, então os workers não
+    precisam ler o arquivo de jobs; os segmentos são gravados no caminho
+    indicado pelo coordenador. Um shard não concluído em `lease_timeout`
+    segundos volta para a fila, caso o worker tenha caído.
+    """
+
+    def __init__(self, work: WorkDirectory, host: str = "127.0.0.1", port: int = 0,
+                 lease_timeout: float = DEFAULT_LEASE_TIMEOUT):
+        self.work = work
+        self.lease_timeout = lease_timeout
+        self._leases: Dict[int, float] = {}
+        self._lock = lock = threading.Lock()
+        coordinator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _body(self) -> Any:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length).decode("utf-8")) if length else {}
+
+            def _reply(self, status: int, payload: Any = None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path != "/status":
+                    return self._reply(404)
+                with lock:
+                    self._reply(200, work.status())
+
+            def do_POST(self):
+                body = self._body()
+                with lock:
+                    if self.path == "/lease":
+                        coordinator._expire()
+                        shard = work.lease(body.get("worker", ""))
+                        if shard is None:
+                            return self._reply(204)
+                        coordinator._leases[shard["id"]] = time.monotonic()
+                        return self._reply(200, {"shard": shard, "segment": work.segment_path(shard),
+                                                 "requests": list(work.requests(shard))})
+                    if self.path == "/complete":
+                        work.complete(body["shard"], body["stats"])
+                        coordinator._leases.pop(body["shard"]["id"], None)
+                        return self._reply(204)
+                    if self.path == "/release":
+                        work.release(body["shard"])
+                        coordinator._leases.pop(body["shard"]["id"], None)
+                        return self._reply(204)
+                self._reply(404)
+
+        self._httpd = _ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    def _expire(self) -> List[int]:
+        deadline = time.monotonic() - self.lease_timeout
+        expired = sorted(shard_id for shard_id, leased in self._leases.items() if leased <= deadline)
+        for shard_id in expired:
+            del self._leases[shard_id]
+            self.work.release({"id": shard_id})
+        return expired
+
+    def expire_leases(self) -> List[int]:
+        """Devolve para a fila os shards com prazo vencido; retorna os seus IDs"""
+        with self._lock:
+            return self._expire()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "Coordinator":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "Coordinator":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class RemoteQueue:
+    """Fila de shards servida por um Coordinator"""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self._leased: Dict[int, Dict[str, Any]] = {}
+
+    def _request(self, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        req = request.Request(self.url + path, data=data, method=method,
+                              headers={"Content-Type": "application/json"})
+        try:
+            with request.urlopen(req, timeout=self.timeout) as response:
+                payload = response.read()
+                return response.status, json.loads(payload.decode("utf-8")) if payload else None
+        except (error.URLError, OSError, ValueError) as e:
+            raise BatchError(f"{method} {self.url + path}: {e}")
+
+    def lease(self, worker: str) -> Optional[Dict[str, Any]]:
+        status, payload = self._request("POST", "/lease", {"worker": worker})
+        if status == 204 or not payload:
+            return None
+        shard = payload["shard"]
+        self._leased[shard["id"]] = payload
+        return shard
+
+    def requests(self, shard: Dict[str, Any]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        for line_no, job in self._leased[shard["id"]]["requests"]:
+            yield line_no, job
+
+    def segment_path(self, shard: Dict[str, Any]) -> str:
+        return self._leased[shard["id"]]["segment"]
+
+    def complete(self, shard: Dict[str, Any], stats: Dict[str, Any]):
+        self._request("POST", "/complete", {"shard": shard, "stats": stats})
+        self._leased.pop(shard["id"], None)
+
+    def release(self, shard: Dict[str, Any]):
+        self._request("POST", "/release", {"shard": shard})
+        self._leased.pop(shard["id"], None)
+
+    def status(self) -> Dict[str, Any]:
+        return self._request("GET", "/status")[1]
+
+
+def open_queue(spec: str):
+    """Fila de um coordenador (http://...) ou de um diretório de trabalho"""
+    if spec.startswith(("http://", "https://")):
+        return RemoteQueue(spec)
+    work = WorkDirectory(spec)
+    # Falha cedo se o diretório ainda não tem um lote preparado
+    work.manifest
+    return work
+
+
+def _worker_main(spec: str, worker: str):
+    run_worker(open_queue(spec), worker)
+
+
+def run_batch(job_path: str, workdir: str, workers: int = 2, shard_size: int = DEFAULT_SHARD_SIZE,
+              transport: str = "dir", segment_format: str = "jsonl", restart: bool = False,
+              port: int = 0, lease_timeout: float = DEFAULT_LEASE_TIMEOUT) -> Dict[str, Any]:
+    """Prepara ou retoma o lote e o processa com `workers` processos locais
+
+    Com workers=0, o lote é apenas preparado para workers externos; no
+    transporte por socket, o coordenador os atende até todos os shards
+    serem concluídos.
+    """
+    work = WorkDirectory(workdir)
+    work.prepare(job_path, shard_size, segment_format, restart)
+
+    coordinator = Coordinator(work, port=port, lease_timeout=lease_timeout).start() if transport == "socket" else None
+    spec = coordinator.url if coordinator else workdir
+    try:
+        processes = [Process(target=_worker_main, args=(spec, f"worker-{os.getpid()}-{i}"))
+                     for i in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        if coordinator and not workers:
+            while work.status()["done"] < work.manifest["shards"]:
+                time.sleep(POLL_INTERVAL)
+                coordinator.expire_leases()
+    finally:
+        if coordinator:
+            coordinator.stop()
+
+    # Shards de workers locais que falharam voltam para a fila da próxima execução
+    if workers:
+        work.requeue_running()
+    return work.status()
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Gera prompts em lote com workers e checkpoints por shard")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    run = subparsers.add_parser("run", help="Cria ou retoma um lote e processa os shards")
+    run.add_argument("jobs", help="Arquivo JSONL com um pedido por linha")
+    run.add_argument("--workdir", required=True, help="Diretório de trabalho do lote")
+    run.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos locais")
+    run.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Pedidos por shard")
+    run.add_argument("--transport", choices=TRANSPORTS, default="dir", help="Distribuição dos shards")
+    run.add_argument("--port", type=int, default=0, help="Porta do coordenador (transporte socket)")
+    run.add_argument("--lease-timeout", type=float, default=DEFAULT_LEASE_TIMEOUT,
+                     help="Segundos até um shard sem conclusão voltar para a fila (transporte socket)")
+    run.add_argument("--format", choices=SEGMENT_FORMATS, default="jsonl", help="Formato dos segmentos")
+    run.add_argument("--restart", action="store_true", help="Descartar o lote existente no diretório")
+
+    worker = subparsers.add_parser("worker", help="Processa shards de um lote em andamento")
+    source = worker.add_mutually_exclusive_group(required=True)
+    source.add_argument("--workdir", help="Diretório de trabalho compartilhado")
+    source.add_argument("--coordinator", help="URL do coordenador")
+    worker.add_argument("--id", default=f"worker-{os.getpid()}", help="Identificação do worker")
+
+    status = subparsers.add_parser("status", help="Mostra o progresso do lote")
+    status.add_argument("--workdir", required=True, help="Diretório de trabalho do lote")
+
+    cat = subparsers.add_parser("cat", help="Escreve os prompts gerados como JSONL")
+    cat.add_argument("--workdir", required=True, help="Diretório de trabalho do lote")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "run":
+            if args.transport == "socket" and not args.workers:
+                print("Aguardando workers externos...", file=sys.stderr)
+            result = run_batch(args.jobs, args.workdir, args.workers, args.shard_size,
+                               args.transport, args.format, args.restart, args.port, args.lease_timeout)
+            print(json.dumps(result, ensure_ascii=False))
+            if result["done"] < result["shards"]:
+                print("Lote incompleto; execute novamente para retomar.", file=sys.stderr)
+                return 1
+            return 0
+
+        if args.command == "worker":
+            completed = run_worker(open_queue(args.coordinator or args.workdir), args.id)
+            print(f"{completed} shards concluídos", file=sys.stderr)
+            return 0
+
+        work = WorkDirectory(args.workdir)
+        if args.command == "status":
+            print(json.dumps(work.status(), ensure_ascii=False))
+            return 0
+
+        for record in work.iter_outputs():
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return 0
+    except (BatchError, OSError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Construtor de Conversas Multi-turno
+-----------------------------------
+
+generate_prompt() produz uma única troca (sistema, usuário e um espaço
+vazio para o assistente). Este módulo mantém uma conversa inteira: o
+prefixo da persona/template é renderizado uma única vez e os turnos são
+apenas acrescentados, com a contagem de tokens atualizada
+incrementalmente em relação à janela de contexto do modelo.
+
+Quando a janela enche, uma política de truncamento é aplicada:
+    drop-oldest   descarta os turnos mais antigos (preservando os fixados)
+    summary       move os turnos descartados para um espaço de resumo,
+                  anexado ao prompt do sistema
+    error         recusa o turno com ContextWindowExceeded
+
+Os turnos saem aos pares (usuário e assistente), para que os papéis
+continuem alternando depois do truncamento.
+
+O estado da conversa pode ser salvo em JSON e retomado em outro processo
+sem renderizar o prefixo novamente.
+
+Uso:
+    python3 conversation_builder.py start --state conversa.json --model claude-opus-4 \\
+        --persona code-developer --template code-generation --task "Criar um parser CSV" \\
+        --param language=Python
+    python3 conversation_builder.py append --state conversa.json --role assistant --text "..."
+    python3 conversation_builder.py show --state conversa.json
+"""
+
+import sys
+import json
+import argparse
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from prompt_generator import (AIModel, CHARS_PER_TOKEN, CompiledPrompt, LocaleCatalogs, ResourceManager,
+                              estimate_tokens, locale_argument)
+from parameter_matrix import parse_assignment
+
+TRUNCATION_POLICIES = ("drop-oldest", "summary", "error")
+
+# Tokens adicionais estimados por mensagem (marcadores de papel)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+# Marcador de um resumo cortado para caber no espaço reservado
+SUMMARY_ELLIPSIS = " [...]"
+
+# Papéis aceitos nos turnos, mapeados pelo prompt_format do modelo
+TURN_ROLES = ("user", "assistant")
+
+
+class ContextWindowExceeded(Exception):
+    """O turno não cabe na janela de contexto com a política 'error'"""
+
+
+class ConversationTurn:
+    def __init__(self, role: str, content: str, tokens: Optional[int] = None):
+        self.role = role
+        self.content = content
+        self.tokens = tokens if tokens is not None else estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "content": self.content, "tokens": self.tokens}
+
+
+def default_summarizer(turns: List[ConversationTurn]) -> str:
+    """Marcador usado quando nenhum resumidor é informado"""
+    return f"[Resumo de {len(turns)} turnos anteriores omitidos por limite de contexto]"
+
+
+class Conversation:
+    """Conversa com prefixo fixo e turnos acrescentados incrementalmente"""
+
+    def __init__(self, model: AIModel, system_prompt: str,
+                 policy: str = "drop-oldest",
+                 reserve_output: Optional[int] = None,
+                 pinned_turns: int = 1,
+                 summary_tokens: int = 512,
+                 summarizer: Optional[Callable[[List[ConversationTurn]], str]] = None):
+        if policy not in TRUNCATION_POLICIES:
+            raise ValueError(f"Política de truncamento inválida: '{policy}'")
+        self.model = model
+        self.system_prompt = system_prompt
+        self.system_tokens = estimate_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+        self.policy = policy
+        self.reserve_output = model.max_output if reserve_output is None else reserve_output
+        self.pinned_turns = pinned_turns
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer or default_summarizer
+
+        # Os primeiros turnos (normalmente a tarefa) nunca são descartados
+        self.pinned: List[ConversationTurn] = []
+        self.turns: Deque[ConversationTurn] = deque()
+        self.summary: Optional[ConversationTurn] = None
+        self.summarized: List[ConversationTurn] = []
+        self.dropped_count = 0
+        self.total_tokens = self.system_tokens
+
+    @classmethod
+    def start(cls, compiled: CompiledPrompt, task_description: str,
+              parameters: Dict[str, str], user_example: str = "", **options) -> "Conversation":
+        """Renderiza o prefixo uma vez e abre a conversa com a tarefa como primeiro turno"""
+        conversation = cls(compiled.model, compiled.render_system(task_description, parameters), **options)
+        user_prompt = task_description
+        if user_example:
+            user_prompt += f"\n\n{user_example}"
+        conversation.append("user", user_prompt)
+        return conversation
+
+    @property
+    def budget(self) -> int:
+        """Tokens disponíveis para a entrada, descontada a saída reservada"""
+        return self.model.context_window - self.reserve_output
+
+    @property
+    def remaining_tokens(self) -> int:
+        return self.budget - self.total_tokens
+
+    def append(self, role: str, content: str) -> ConversationTurn:
+        """Acrescenta um turno e aplica a política de truncamento se necessário"""
+        if role not in TURN_ROLES:
+            raise ValueError(f"Papel inválido: '{role}'")
+        turn = ConversationTurn(role, content)
+
+        if self.total_tokens + turn.tokens > self.budget:
+            if self.policy == "error":
+                raise ContextWindowExceeded(
+                    f"Turno de ~{turn.tokens} tokens excede o restante da janela ({self.remaining_tokens})")
+            self._make_room(turn)
+
+        if len(self.pinned) < self.pinned_turns:
+            self.pinned.append(turn)
+        else:
+            self.turns.append(turn)
+        self.total_tokens += turn.tokens
+        return turn
+
+    def _first_role(self) -> str:
+        """Papel que o primeiro turno após os fixados precisa ter para alternar"""
+        if not self.pinned:
+            return TURN_ROLES[0]
+        return TURN_ROLES[1] if self.pinned[-1].role == TURN_ROLES[0] else TURN_ROLES[0]
+
+    def _make_room(self, incoming: ConversationTurn):
+        needed = incoming.tokens
+        first_role = self._first_role()
+        summary_cost = 0
+        if self.policy == "summary":
+            # O espaço de resumo é reservado assim que o primeiro turno sai
+            summary_cost = self.summary_tokens - (self.summary.tokens if self.summary else 0)
+        # Descarta até caber e, depois, até a sequência voltar a começar pelo papel esperado
+        pending = list(self.turns) + [incoming]
+        drop = 0
+        used = self.total_tokens
+        while drop < len(self.turns) and (used + needed + summary_cost > self.budget
+                                          or (drop and pending[drop].role != first_role)):
+            used -= self.turns[drop].tokens
+            drop += 1
+
+        if used + needed + summary_cost > self.budget:
+            raise ContextWindowExceeded(
+                f"Turno de ~{needed} tokens não cabe na janela mesmo após o truncamento")
+        if drop and pending[drop].role != first_role:
+            raise ContextWindowExceeded(
+                f"Turno de ~{needed} tokens só caberia descartando a resposta ao turno anterior")
+
+        dropped = [self.turns.popleft() for _ in range(drop)]
+        self.total_tokens = used
+        self.dropped_count += len(dropped)
+
+        if self.policy == "summary" and dropped:
+            self.summarized.extend(dropped)
+            if self.summary:
+                self.total_tokens -= self.summary.tokens
+            self.summary = ConversationTurn("system", self.fit_summary(self.summarizer(self.summarized)),
+                                            self.summary_tokens)
+            self.total_tokens += self.summary.tokens
+
+    def fit_summary(self, content: str) -> str:
+        """Corta o resumo para caber no espaço reservado de summary_tokens"""
+        limit = max(0, self.summary_tokens - MESSAGE_OVERHEAD_TOKENS) * CHARS_PER_TOKEN
+        if len(content) <= limit:
+            return content
+        return content[:max(0, limit - len(SUMMARY_ELLIPSIS))] + SUMMARY_ELLIPSIS
+
+    def set_summary(self, content: str):
+        """Substitui o conteúdo do espaço de resumo (ex.: resumo gerado por um modelo)
+
+        O resumo ocupa sempre summary_tokens; textos maiores são cortados.
+        """
+        if self.summary is None:
+            raise ValueError("A conversa não possui turnos resumidos")
+        self.total_tokens -= self.summary.tokens
+        self.summary = ConversationTurn(self.summary.role, self.fit_summary(content), self.summary_tokens)
+        self.total_tokens += self.summary.tokens
+
+    def iter_messages(self):
+        """Mensagens na ordem de envio
+
+        Sem resumo, o prefixo é o mesmo objeto em todas as chamadas; com ele,
+        o resumo é anexado ao prompt do sistema.
+        """
+        roles = self.model.prompt_format
+        system = self.system_prompt
+        if self.summary:
+            system = f"{system}\n\n{self.summary.content}"
+        yield {"role": roles.get("system", "system"), "content": system}
+        for turn in self.pinned:
+            yield {"role": roles.get(turn.role, turn.role), "content": turn.content}
+        for turn in self.turns:
+            yield {"role": roles.get(turn.role, turn.role), "content": turn.content}
+
+    def messages(self) -> List[Dict[str, str]]:
+        return list(self.iter_messages())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado serializável da conversa, incluindo o prefixo já renderizado"""
+        return {
+            "model": {
+                "name": self.model.name,
+                "context_window": self.model.context_window,
+                "max_output": self.model.max_output,
+                "prompt_format": self.model.prompt_format,
+            },
+            "system_prompt": self.system_prompt,
+            "policy": self.policy,
+            "reserve_output": self.reserve_output,
+            "pinned_turns": self.pinned_turns,
+            "summary_tokens": self.summary_tokens,
+            "pinned": [turn.to_dict() for turn in self.pinned],
+            "turns": [turn.to_dict() for turn in self.turns],
+            "summary": self.summary.to_dict() if self.summary else None,
+            "summarized": [turn.to_dict() for turn in self.summarized],
+            "dropped_count": self.dropped_count,
+            "total_tokens": self.total_tokens,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any],
+                  summarizer: Optional[Callable[[List[ConversationTurn]], str]] = None) -> "Conversation":
+        model_data = data["model"]
+        model = AIModel(
+            name=model_data.get("name", ""),
+            description="",
+            provider="",
+            context_window=model_data.get("context_window", 0),
+            max_output=model_data.get("max_output", 0),
+            features={},
+            prompt_format=model_data.get("prompt_format", {}),
+            training_cutoff=""
+        )
+        conversation = cls(model, data["system_prompt"], data.get("policy", "drop-oldest"),
+                           data.get("reserve_output"), data.get("pinned_turns", 1),
+                           data.get("summary_tokens", 512), summarizer)
+
+        def turn(d):
+            return ConversationTurn(d["role"], d["content"], d.get("tokens"))
+
+        conversation.pinned = [turn(d) for d in data.get("pinned", [])]
+        conversation.turns = deque(turn(d) for d in data.get("turns", []))
+        conversation.summary = turn(data["summary"]) if data.get("summary") else None
+        conversation.summarized = [turn(d) for d in data.get("summarized", [])]
+        conversation.dropped_count = data.get("dropped_count", 0)
+        conversation.total_tokens = data.get("total_tokens", conversation.system_tokens
+                                             + sum(t.tokens for t in conversation.pinned)
+                                             + sum(t.tokens for t in conversation.turns)
+                                             + (conversation.summary.tokens if conversation.summary else 0))
+        return conversation
+
+    def save(self, file_path: str) -> bool:
+        return ResourceManager.save_json(file_path, self.to_dict())
+
+    @classmethod
+    def load(cls, file_path: str, **options) -> Optional["Conversation"]:
+        data = ResourceManager.load_json(file_path, None)
+        return cls.from_dict(data, **options) if data else None
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Constrói conversas multi-turno a partir de um prompt")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    start = subparsers.add_parser("start", help="Inicia uma conversa")
+    start.add_argument("--state", required=True, help="Arquivo de estado da conversa")
+    start.add_argument("--model", required=True, help="ID do modelo de IA")
+    start.add_argument("--persona", required=True, help="ID da persona")
+    start.add_argument("--template", required=True, help="ID do template")
+    start.add_argument("--task", required=True, help="Descrição da tarefa")
+    start.add_argument("--param", action="append", default=[], type=parse_assignment,
+                       help="Valor de uma variável do template (nome=valor)")
+    start.add_argument("--policy", choices=TRUNCATION_POLICIES, default="drop-oldest",
+                       help="Política quando a janela de contexto enche")
+    start.add_argument("--reserve-output", type=int, help="Tokens reservados para a resposta")
+    start.add_argument("--locale", type=locale_argument, help="Locale dos catálogos (ex.: en, pt-BR)")
+
+    append = subparsers.add_parser("append", help="Acrescenta um turno")
+    append.add_argument("--state", required=True, help="Arquivo de estado da conversa")
+    append.add_argument("--role", choices=TURN_ROLES, required=True, help="Papel do turno")
+    append.add_argument("--text", required=True, help="Conteúdo do turno")
+
+    show = subparsers.add_parser("show", help="Exibe as mensagens em JSON")
+    show.add_argument("--state", required=True, help="Arquivo de estado da conversa")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "start":
+        if args.locale:
+            catalogs = LocaleCatalogs().get(args.locale)
+            models, personas, templates = catalogs["models"], catalogs["personas"], catalogs["templates"]
+        else:
+            models = ResourceManager.load_models()
+            personas = ResourceManager.load_personas()
+            templates = ResourceManager.load_templates()
+        for kind, key, catalog in (("Modelo", args.model, models),
+                                   ("Persona", args.persona, personas),
+                                   ("Template", args.template, templates)):
+            if key not in catalog:
+                print(f"{kind} não encontrado: {key}", file=sys.stderr)
+                return 1
+        persona = personas[args.persona]
+        compiled = CompiledPrompt(models[args.model], persona, templates[args.template])
+        parameters = {"tone": persona.tone, "detail_level": persona.detail_level, "output_format": "markdown",
+                      "task_description": args.task}
+        parameters.update(dict(args.param))
+        missing = [v for v in compiled.variables if v != "topic" and v not in parameters]
+        if missing:
+            print(f"Aviso: variáveis sem valor: {', '.join(missing)} (use --param nome=valor)", file=sys.stderr)
+        conversation = Conversation.start(compiled, args.task, parameters,
+                                          policy=args.policy, reserve_output=args.reserve_output)
+    else:
+        conversation = Conversation.load(args.state)
+        if conversation is None:
+            print(f"Estado de conversa não encontrado: {args.state}", file=sys.stderr)
+            return 1
+        if args.command == "show":
+            print(json.dumps(conversation.messages(), ensure_ascii=False, indent=2))
+            return 0
+        try:
+            conversation.append(args.role, args.text)
+        except ContextWindowExceeded as e:
+            print(f"Erro: {e}", file=sys.stderr)
+            return 1
+
+    conversation.save(args.state)
+    print(f"{conversation.total_tokens} tokens usados, {conversation.remaining_tokens} restantes",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Regeneração Incremental de Prompts
+----------------------------------
+
+Mantém os prompts salvos em output/ sincronizados com os arquivos de
+recursos, como um sistema de build incremental:
+
+1. Cada prompt salvo registra nos metadados os IDs do modelo, da persona e
+   do template usados (ver PromptGenerator.save_prompt()).
+2. O estado do build guarda um hash por entrada de models.json,
+   personas.json e templates.json (personas e templates já com herança
+   e mixins resolvidos).
+3. Quando um arquivo de recursos muda, as entradas são comparadas uma a
+   uma e somente os prompts que dependem das entradas alteradas são
+   regenerados, em paralelo.
+
+Na primeira execução o estado é apenas registrado; use --force para
+regenerar tudo. Os prompts regenerados mantêm o formato do arquivo
+original (JSON minificado ou indentado), salvo com --json-style.
+
+Uso:
+    python3 incremental_build.py              # regenera o que estiver desatualizado
+    python3 incremental_build.py --watch      # observa os recursos e regenera a cada mudança
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from prompt_generator import (CatalogResolver, CompiledPrompt, LocaleCatalogs, ResourceManager, OUTPUT_DIR,
+                              MODELS_FILE, PERSONAS_FILE, TEMPLATES_FILE, SOURCE_LOCALE, normalize_locale,
+                              write_output_record)
+
+# Arquivo de estado do build, dentro do diretório de saída
+STATE_FILENAME = ".build_state.json"
+
+# Tipo de recurso -> chave do ID correspondente nos metadados salvos
+DEPENDENCY_KEYS = {
+    "models": "model_id",
+    "personas": "persona_id",
+    "templates": "template_id",
+}
+
+# Catálogos que aceitam herança e mixins
+COMPOSABLE_KINDS = ("personas", "templates")
+
+# Formato dos arquivos regenerados: o do arquivo original, minificado ou indentado
+JSON_STYLES = ("keep", "compact", "indent")
+
+DEFAULT_RESOURCE_FILES = {
+    "models": MODELS_FILE,
+    "personas": PERSONAS_FILE,
+    "templates": TEMPLATES_FILE,
+}
+
+
+def entry_hashes(data: Dict[str, Any]) -> Dict[str, str]:
+    """Calcula um hash por entrada de um catálogo"""
+    return {
+        entry_id: hashlib.sha1(json.dumps(entry, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+        for entry_id, entry in data.items()
+    }
+
+
+def diff_entries(old: Dict[str, str], new: Dict[str, str]) -> Set[str]:
+    """IDs adicionados, removidos ou modificados entre dois snapshots"""
+    return {entry_id for entry_id in old.keys() | new.keys() if old.get(entry_id) != new.get(entry_id)}
+
+
+class BuildReport:
+    def __init__(self):
+        self.changed: Dict[str, Set[str]] = {}
+        self.regenerated: List[str] = []
+        self.orphaned: List[Tuple[str, str]] = []
+        self.failed: List[Tuple[str, str]] = []
+
+    def __str__(self) -> str:
+        changes = ", ".join(f"{kind}: {len(ids)}" for kind, ids in self.changed.items() if ids) or "nenhuma"
+        return (f"Entradas alteradas ({changes}); {len(self.regenerated)} prompts regenerados, "
+                f"{len(self.orphaned)} sem dependência disponível, {len(self.failed)} falhas")
+
+
+# Catálogos por locale e prompts compilados de cada processo do pool
+_worker_catalogs: Dict[str, Dict[str, Dict[str, Any]]] = {}
+_worker_compiled: Dict[Tuple[str, str, str, str], CompiledPrompt] = {}
+_worker_json_style = "keep"
+
+def _init_worker(catalogs: Dict[str, Dict[str, Dict[str, Any]]], json_style: str = "keep"):
+    global _worker_catalogs, _worker_json_style
+    _worker_catalogs = catalogs
+    _worker_json_style = json_style
+    _worker_compiled.clear()
+
+def _regenerate(path: str) -> Tuple[str, str, str]:
+    """Regenera um prompt salvo; retorna (caminho, status, mensagem)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        record = json.loads(text)
+    except (OSError, ValueError):
+        record = None
+    if not isinstance(record, dict) or not record:
+        return path, "failed", "arquivo ilegível"
+    metadata = record.get("metadata", {})
+
+    # Prompts salvos antes da localização estão no locale de origem
+    try:
+        locale = normalize_locale(metadata.get("locale") or SOURCE_LOCALE)
+    except (AttributeError, ValueError):
+        return path, "failed", f"locale inválido: {metadata.get('locale')!r}"
+    catalogs = _worker_catalogs[locale]
+    ids = tuple(metadata.get(DEPENDENCY_KEYS[kind], "") for kind in ("models", "personas", "templates"))
+    for kind, entry_id in zip(("models", "personas", "templates"), ids):
+        if entry_id not in catalogs[kind]:
+            return path, "orphaned", f"{kind} '{entry_id}' não existe mais"
+
+    compiled = _worker_compiled.get((locale,) + ids)
+    if compiled is None:
+        model, persona, template = (catalogs[kind][entry_id]
+                                    for kind, entry_id in zip(("models", "personas", "templates"), ids))
+        compiled = _worker_compiled[(locale,) + ids] = CompiledPrompt(model, persona, template)
+
+    record["prompt"] = compiled.render(metadata.get("task_description", ""),
+                                       metadata.get("parameters", {}),
+                                       metadata.get("user_example", ""))
+    metadata["timestamp"] = datetime.now().isoformat()
+    metadata["model"] = compiled.model.name
+    metadata["persona"] = compiled.persona.name
+    metadata["template"] = compiled.template.name
+
+    if _worker_json_style == "keep":
+        # JSON minificado não tem quebras de linha (as do texto ficam escapadas)
+        compact = "\n" not in text.strip()
+    else:
+        compact = _worker_json_style == "compact"
+    try:
+        write_output_record(path, record, compact)
+    except OSError as e:
+        return path, "failed", f"erro ao salvar: {e}"
+    return path, "regenerated", ""
+
+
+class IncrementalBuilder:
+    """Regenera apenas os prompts afetados por mudanças nos recursos"""
+
+    def __init__(self, output_dir: str = OUTPUT_DIR,
+                 resource_files: Optional[Dict[str, str]] = None,
+                 workers: int = 1, json_style: str = "keep"):
+        if json_style not in JSON_STYLES:
+            raise ValueError(f"Formato de JSON inválido: '{json_style}'")
+        self.output_dir = output_dir
+        self.json_style = json_style
+        self.resource_files = dict(DEFAULT_RESOURCE_FILES)
+        self.resource_files.update(resource_files or {})
+        self.workers = workers
+        self.state_file = os.path.join(output_dir, STATE_FILENAME)
+        # Resolvedores mantidos entre builds (modo --watch): só as entradas
+        # alteradas e suas dependentes são achatadas novamente
+        self._resolvers: Dict[str, CatalogResolver] = {}
+
+    def load_state(self) -> Dict[str, Any]:
+        state = ResourceManager.load_json(self.state_file, None) or {}
+        state.setdefault("resources", None)
+        state.setdefault("outputs", {})
+        return state
+
+    def save_state(self, state: Dict[str, Any]):
+        ResourceManager.save_json(self.state_file, state)
+
+    def snapshot_resources(self) -> Dict[str, Dict[str, str]]:
+        """Hash atual de cada entrada dos arquivos de recursos
+
+        Personas e templates são comparados já achatados, de modo que
+        alterar uma entrada base também marca as que herdam dela.
+        """
+        snapshot = {}
+        for kind, path in self.resource_files.items():
+            data = ResourceManager.load_json(path, {}) or {}
+            if kind in COMPOSABLE_KINDS:
+                resolver = self._resolvers.get(kind)
+                if resolver is None:
+                    resolver = self._resolvers[kind] = CatalogResolver(data)
+                else:
+                    resolver.sync(data)
+                data = resolver.resolve_all(include_abstract=True)
+            snapshot[kind] = entry_hashes(data)
+        return snapshot
+
+    def load_catalogs(self, locales: Iterable[str] = (SOURCE_LOCALE,)) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Catálogos de cada locale usado pelos prompts a regenerar; locales inválidos são ignorados"""
+        localized = LocaleCatalogs(resource_files=self.resource_files, compiled_dir=None)
+        catalogs = {}
+        for locale in locales:
+            try:
+                catalogs[normalize_locale(locale)] = localized.get(locale)
+            except (AttributeError, ValueError):
+                continue
+        return catalogs
+
+    def scan_outputs(self, index: Dict[str, Any]) -> Dict[str, Any]:
+        """Atualiza o índice de dependências lendo apenas arquivos novos ou modificados"""
+        current = {}
+        for name in sorted(os.listdir(self.output_dir)):
+            if not name.endswith(".json") or name == STATE_FILENAME:
+                continue
+            path = os.path.join(self.output_dir, name)
+            mtime = os.path.getmtime(path)
+            entry = index.get(name)
+            if entry is None or entry.get("mtime") != mtime:
+                metadata = (ResourceManager.load_json(path, {}) or {}).get("metadata", {})
+                deps = {kind: metadata.get(key, "") for kind, key in DEPENDENCY_KEYS.items()}
+                # Prompts salvos antes dos IDs nos metadados não podem ser regenerados
+                if not all(deps.values()) or "task_description" not in metadata:
+                    deps = {}
+                entry = {"mtime": mtime, "deps": deps, "locale": metadata.get("locale") or SOURCE_LOCALE}
+                if index.get(name, {}).get("dirty"):
+                    entry["dirty"] = True
+            current[name] = entry
+        return current
+
+    def affected_outputs(self, index: Dict[str, Any], changed: Dict[str, Set[str]]) -> List[str]:
+        """Prompts que dependem de entradas alteradas ou cuja regeneração falhou antes"""
+        return [name for name, entry in index.items()
+                if entry["deps"] and (entry.get("dirty")
+                                      or any(entry["deps"].get(kind) in ids for kind, ids in changed.items()))]
+
+    def build(self, force: bool = False) -> BuildReport:
+        """Compara os recursos com o último build e regenera o necessário"""
+        report = BuildReport()
+        state = self.load_state()
+        snapshot = self.snapshot_resources()
+        index = self.scan_outputs(state["outputs"])
+
+        previous = state["resources"]
+        if force:
+            report.changed = {kind: set(hashes) for kind, hashes in snapshot.items()}
+        elif previous is not None:
+            report.changed = {kind: diff_entries(previous.get(kind, {}), hashes)
+                              for kind, hashes in snapshot.items()}
+
+        targets = self.affected_outputs(index, report.changed)
+        if targets:
+            paths = [os.path.join(self.output_dir, name) for name in targets]
+            locales = {index[name].get("locale") or SOURCE_LOCALE for name in targets}
+            for path, status, message in self._run(paths, self.load_catalogs(locales)):
+                name = os.path.basename(path)
+                if status == "regenerated":
+                    report.regenerated.append(name)
+                    index[name]["mtime"] = os.path.getmtime(path)
+                    index[name].pop("dirty", None)
+                elif status == "orphaned":
+                    report.orphaned.append((name, message))
+                else:
+                    report.failed.append((name, message))
+                    # O snapshot avança mesmo assim; a falha fica pendente no índice
+                    index[name]["dirty"] = True
+
+        state["resources"] = snapshot
+        state["outputs"] = index
+        self.save_state(state)
+        return report
+
+    def _run(self, paths: List[str], catalogs: Dict[str, Dict[str, Dict[str, Any]]]) -> Iterable[Tuple[str, str, str]]:
+        if self.workers <= 1 or len(paths) == 1:
+            _init_worker(catalogs, self.json_style)
+            return [_regenerate(path) for path in paths]
+        with Pool(self.workers, initializer=_init_worker, initargs=(catalogs, self.json_style)) as pool:
+            return pool.map(_regenerate, paths, chunksize=max(1, len(paths) // (self.workers * 4)))
+
+    def resource_mtimes(self) -> Dict[str, float]:
+        return {kind: os.path.getmtime(path) if os.path.exists(path) else 0.0
+                for kind, path in self.resource_files.items()}
+
+    def watch(self, interval: float = 1.0, cycles: Optional[int] = None, on_build=None):
+        """Observa os arquivos de recursos e regenera quando houver mudanças"""
+        report = self.build()
+        if on_build:
+            on_build(report)
+        mtimes = self.resource_mtimes()
+        count = 0
+        while cycles is None or count < cycles:
+            time.sleep(interval)
+            count += 1
+            current = self.resource_mtimes()
+            if current != mtimes:
+                mtimes = current
+                report = self.build()
+                if on_build:
+                    on_build(report)
+
+
+def print_report(report: BuildReport):
+    print(report)
+    for name, message in report.orphaned + report.failed:
+        print(f"  {name}: {message}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Regenera prompts afetados por mudanças nos recursos")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Diretório dos prompts salvos")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos para regeneração")
+    parser.add_argument("--force", action="store_true", help="Regenerar todos os prompts")
+    parser.add_argument("--watch", action="store_true", help="Observar os recursos continuamente")
+    parser.add_argument("--interval", type=float, default=1.0, help="Intervalo de verificação em segundos")
+    parser.add_argument("--json-style", choices=JSON_STYLES, default="keep",
+                        help="Formato dos arquivos regenerados (padrão: o do arquivo original)")
+    args = parser.parse_args(argv)
+
+    builder = IncrementalBuilder(args.output_dir, workers=args.workers, json_style=args.json_style)
+    if not args.watch:
+        report = builder.build(force=args.force)
+        print_report(report)
+        return 1 if report.failed else 0
+
+    if args.force:
+        print_report(builder.build(force=True))
+    print(f"Observando {', '.join(builder.resource_files.values())} (Ctrl+C para sair)")
+    try:
+        builder.watch(args.interval, on_build=print_report)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Catálogos Localizados
+---------------------
+
+Os campos de personas, templates e modelos estão escritos no locale de
+origem (pt-BR). Cada entrada pode trazer traduções parciais em "locales":
+
+    "legal-analyst": {
+        "name": "Analista Jurídico",
+        "system_prompt_template": "Como um Analista Jurídico...",
+        "locales": {"en": {"name": "Legal Analyst", "system_prompt_template": "As a Legal Analyst..."}}
+    }
+
+Um locale é resolvido por uma cadeia de fallback (pt-BR -> pt -> en); os
+campos sem tradução mantêm o texto de origem. Este script pré-compila os
+catálogos de cada locale em resources/compiled/ e aponta os campos ainda
+sem tradução.
+
+Uso:
+    python3 localization.py list                    # locales disponíveis
+    python3 localization.py compile                 # pré-compila todos os locales
+    python3 localization.py compile --locale en
+    python3 localization.py missing --locale en     # campos sem tradução
+"""
+
+import sys
+import argparse
+from typing import Any, Dict, List, Optional, Tuple
+
+from prompt_generator import (LocaleCatalogs, ResourceManager, ABSTRACT_KEY, COMPILED_DIR,
+                              LOCALES_KEY, SOURCE_LOCALE, locale_argument, locale_chain, normalize_locale)
+
+# Campos traduzíveis de cada catálogo
+TRANSLATABLE_FIELDS = {
+    "models": ("description",),
+    "personas": ("name", "description", "expertise", "tone", "detail_level", "approach",
+                 "system_prompt_template"),
+    "templates": ("name", "description", "structure", "example_input", "example_output"),
+}
+
+
+def missing_translations(data: Dict[str, Any], locale: str,
+                         fields: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    """(entrada, campo) que caem no texto de origem para o locale"""
+    source = locale_chain(SOURCE_LOCALE, fallback=None)
+    chain = []
+    for candidate in locale_chain(locale):
+        if candidate in source:
+            return []
+        chain.append(candidate)
+
+    missing = []
+    for entry_id, entry in data.items():
+        if not isinstance(entry, dict) or entry.get(ABSTRACT_KEY):
+            continue
+        translations = entry.get(LOCALES_KEY) or {}
+        for field in fields:
+            if field not in entry:
+                continue
+            if not any(field in translations.get(candidate, {}) for candidate in chain):
+                missing.append((entry_id, field))
+    return missing
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Pré-compila e verifica os catálogos localizados")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    subparsers.add_parser("list", help="Lista os locales com traduções")
+
+    compile_parser = subparsers.add_parser("compile", help="Pré-compila os catálogos por locale")
+    compile_parser.add_argument("--locale", type=locale_argument, action="append", default=[], help="Locale (padrão: todos)")
+    compile_parser.add_argument("--compiled-dir", default=COMPILED_DIR, help="Diretório dos catálogos compilados")
+
+    missing_parser = subparsers.add_parser("missing", help="Lista os campos sem tradução")
+    missing_parser.add_argument("--locale", type=locale_argument, required=True, help="Locale a verificar")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for locale in LocaleCatalogs().available_locales():
+            print(locale)
+        return 0
+
+    if args.command == "compile":
+        catalogs = LocaleCatalogs(compiled_dir=args.compiled_dir)
+        for locale in args.locale or catalogs.available_locales():
+            print(catalogs.precompile(locale))
+        return 0
+
+    catalogs = LocaleCatalogs()
+    locale = normalize_locale(args.locale)
+    total = 0
+    for kind, fields in TRANSLATABLE_FIELDS.items():
+        data = ResourceManager.load_catalog(kind, catalogs.resource_files[kind])
+        for entry_id, field in missing_translations(data, locale, fields):
+            print(f"{kind}/{entry_id}: {field}")
+            total += 1
+    print(f"{total} campos sem tradução para {locale}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Expansão de Parâmetros em Matriz
+--------------------------------
+
+Gera o mesmo template para muitas combinações de valores das variáveis
+(ex.: 20 linguagens x 5 tipos de conteúdo). As combinações são produzidas
+sob demanda e renderizadas com um único CompiledPrompt, que reaproveita os
+trechos estáticos do prompt entre todas as variantes. Quando o produto
+cartesiano é grande demais, é possível amostrar combinações de forma
+aleatória ou por hipercubo latino.
+
+Uso:
+    python3 parameter_matrix.py --model claude-opus-4 --persona code-developer \\
+        --template code-generation --task "validar CPFs" \\
+        --var language=python,java,go --var task_description=@tarefas.txt \\
+        --sample lhs --samples 10 --output matriz.jsonl
+    python3 parameter_matrix.py --locale en --model claude-opus-4 --persona legal-analyst \\
+        --template qa-template --task "cláusulas de rescisão" --var tone=formal,neutro
+"""
+
+import sys
+import json
+import random
+import argparse
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from prompt_generator import CompiledPrompt, LocaleCatalogs, ResourceManager, locale_argument, normalize_locale
+
+SAMPLING_METHODS = ("random", "lhs")
+
+
+def parse_values(spec: str) -> List[str]:
+    """Converte a especificação de valores de uma variável em lista
+
+    Formatos aceitos:
+        a,b,c        lista de valores
+        1..5         intervalo inteiro inclusivo
+        0..10:2      intervalo inteiro com passo
+        @arquivo     um valor por linha do arquivo
+    """
+    if spec.startswith("@"):
+        with open(spec[1:], 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+
+    if ".." in spec and "," not in spec:
+        bounds, _, step = spec.partition(":")
+        start, _, stop = bounds.partition("..")
+        try:
+            start_i, stop_i = int(start), int(stop)
+            step_i = int(step) if step else 1
+        except ValueError:
+            raise ValueError(f"Intervalo inválido: '{spec}'")
+        if step_i == 0:
+            raise ValueError(f"Passo do intervalo não pode ser zero: '{spec}'")
+        if start_i > stop_i and step_i > 0:
+            step_i = -step_i
+        end = stop_i + (1 if step_i > 0 else -1)
+        return [str(v) for v in range(start_i, end, step_i)]
+
+    return [value.strip() for value in spec.split(",") if value.strip()]
+
+
+class ParameterMatrix:
+    """Produto cartesiano lazy de listas de valores por variável"""
+
+    def __init__(self, variables: Dict[str, List[str]]):
+        for name, values in variables.items():
+            if not values:
+                raise ValueError(f"A variável '{name}' não possui valores")
+        self.names = list(variables.keys())
+        self.values = [list(variables[name]) for name in self.names]
+
+    @property
+    def size(self) -> int:
+        """Tamanho do produto, sem o limite de sys.maxsize imposto por len()"""
+        size = 1
+        for values in self.values:
+            size *= len(values)
+        return size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def combination(self, index: int) -> Dict[str, str]:
+        """Retorna a combinação de posição `index` na ordem do produto"""
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        combo = {}
+        # Decomposição em base mista: a última variável varia mais rápido
+        for name, values in zip(reversed(self.names), reversed(self.values)):
+            index, position = divmod(index, len(values))
+            combo[name] = values[position]
+        return {name: combo[name] for name in self.names}
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        # Odômetro sobre os índices, sem materializar o produto
+        if not self.names:
+            yield {}
+            return
+        positions = [0] * len(self.names)
+        while True:
+            yield {name: values[p] for name, values, p in zip(self.names, self.values, positions)}
+            dim = len(positions) - 1
+            while dim >= 0:
+                positions[dim] += 1
+                if positions[dim] < len(self.values[dim]):
+                    break
+                positions[dim] = 0
+                dim -= 1
+            if dim < 0:
+                return
+
+    def sample_random(self, count: int, seed: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Amostra combinações distintas de forma uniforme"""
+        rng = random.Random(seed)
+        size = self.size
+        count = min(count, size)
+        if count * 2 > size:
+            # Produto pequeno: sorteio sem reposição direto
+            for index in rng.sample(range(size), count):
+                yield self.combination(index)
+            return
+        # Produto grande: índices repetidos são raros e descartados
+        seen = set()
+        while len(seen) < count:
+            index = rng.randrange(size)
+            if index not in seen:
+                seen.add(index)
+                yield self.combination(index)
+
+    def sample_latin_hypercube(self, count: int, seed: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Amostra por hipercubo latino
+
+        Cada variável tem seu intervalo dividido em `count` estratos e cada
+        estrato é usado exatamente uma vez, o que cobre os valores de todas
+        as variáveis de maneira uniforme mesmo com poucas amostras. São no
+        máximo `size` amostras, e combinações repetidas são descartadas.
+        """
+        rng = random.Random(seed)
+        count = min(count, self.size)
+        columns = []
+        for values in self.values:
+            strata = list(range(count))
+            rng.shuffle(strata)
+            columns.append([values[int((s + rng.random()) / count * len(values))] for s in strata])
+        seen = set()
+        for row in range(count):
+            key = tuple(column[row] for column in columns)
+            if key not in seen:
+                seen.add(key)
+                yield dict(zip(self.names, key))
+
+
+def expand(compiled: CompiledPrompt, task_description: str,
+           base_parameters: Dict[str, str],
+           combinations: Iterator[Dict[str, str]],
+           user_example: str = "") -> Iterator[Tuple[Dict[str, str], Dict[str, str]]]:
+    """Renderiza cada combinação sob demanda, gerando (parâmetros, prompt)"""
+    for combo in combinations:
+        parameters = dict(base_parameters)
+        parameters.update(combo)
+        # Uma variável {task_description} no template pode variar por combinação
+        task = combo.get("task_description", task_description)
+        yield parameters, compiled.render(task, parameters, user_example)
+
+
+def parse_assignment(text: str) -> Tuple[str, str]:
+    """Separa 'nome=especificação'"""
+    name, sep, spec = text.partition("=")
+    if not sep or not name.strip():
+        raise argparse.ArgumentTypeError(f"Use o formato nome=valores: '{text}'")
+    return name.strip(), spec
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Gera prompts para uma matriz de parâmetros")
+    parser.add_argument("--model", required=True, help="ID do modelo de IA")
+    parser.add_argument("--persona", required=True, help="ID da persona")
+    parser.add_argument("--template", required=True, help="ID do template")
+    parser.add_argument("--task", required=True, help="Descrição da tarefa")
+    parser.add_argument("--var", action="append", default=[], type=parse_assignment,
+                        help="Variável e seus valores (nome=a,b,c | nome=1..5 | nome=@arquivo)")
+    parser.add_argument("--param", action="append", default=[], type=parse_assignment,
+                        help="Parâmetro fixo (nome=valor)")
+    parser.add_argument("--sample", choices=SAMPLING_METHODS, help="Amostrar em vez de expandir tudo")
+    parser.add_argument("--samples", type=int, default=100, help="Quantidade de amostras")
+    parser.add_argument("--seed", type=int, help="Semente para amostragem")
+    parser.add_argument("--output", help="Arquivo JSONL de saída (padrão: saída padrão)")
+    parser.add_argument("--locale", type=locale_argument, help="Locale dos catálogos (ex.: en, pt-BR)")
+    args = parser.parse_args(argv)
+
+    if args.locale:
+        catalogs = LocaleCatalogs().get(args.locale)
+        models, personas, templates = catalogs["models"], catalogs["personas"], catalogs["templates"]
+    else:
+        models = ResourceManager.load_models()
+        personas = ResourceManager.load_personas()
+        templates = ResourceManager.load_templates()
+    for kind, key, catalog in (("Modelo", args.model, models),
+                               ("Persona", args.persona, personas),
+                               ("Template", args.template, templates)):
+        if key not in catalog:
+            print(f"{kind} não encontrado: {key}", file=sys.stderr)
+            return 1
+
+    persona = personas[args.persona]
+    compiled = CompiledPrompt(models[args.model], persona, templates[args.template])
+
+    base_parameters = {
+        "tone": persona.tone,
+        "detail_level": persona.detail_level,
+        "output_format": "markdown",
+    }
+    base_parameters.update(dict(args.param))
+
+    try:
+        matrix = ParameterMatrix({name: parse_values(spec) for name, spec in args.var})
+    except (OSError, ValueError) as e:
+        print(f"Erro nas variáveis: {e}", file=sys.stderr)
+        return 1
+
+    missing = [v for v in compiled.variables
+               if v != "topic" and v not in base_parameters and v not in matrix.names]
+    if missing:
+        print(f"Aviso: variáveis sem valor: {', '.join(missing)}", file=sys.stderr)
+
+    if args.sample == "random":
+        combinations = matrix.sample_random(args.samples, args.seed)
+    elif args.sample == "lhs":
+        combinations = matrix.sample_latin_hypercube(args.samples, args.seed)
+    else:
+        combinations = iter(matrix)
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    count = 0
+    try:
+        for parameters, prompt in expand(compiled, args.task, base_parameters, combinations):
+            record = {"parameters": parameters, "prompt": prompt}
+            if args.locale:
+                record["locale"] = normalize_locale(args.locale)
+            out.write(json.dumps(record, ensure_ascii=False))
+            out.write("\n")
+            count += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"{count} prompts gerados (produto completo: {matrix.size})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
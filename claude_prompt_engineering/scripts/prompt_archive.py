@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Arquivo Compactado de Prompts
+-----------------------------
+
+Formato binário para arquivar muitos prompts gerados. Cada prompt salvo
+por save_prompt() repete o bloco de metadados e o prompt do sistema
+inteiro, quase sempre idêntico entre prompts da mesma persona/template.
+No arquivo compactado:
+
+- cada registro é JSON minificado, comprimido com zlib e precedido pelo
+  seu tamanho (4 bytes), podendo ser lido em sequência, sem carregar o
+  arquivo todo;
+- a compressão usa um dicionário (zdict) treinado com os prompts do
+  sistema e gravado no cabeçalho, de modo que mesmo registros pequenos e
+  comprimidos isoladamente aproveitam o texto repetido;
+- os metadados fixos (nomes e IDs do modelo, persona, template e o locale)
+  são gravados uma única vez como registro de referência e os prompts
+  guardam apenas o ID dessa referência.
+
+Layout: "PRAR", versão (1 byte), tamanho do dicionário (4 bytes), dicionário
+e, em seguida, os registros: tamanho (4 bytes), tipo ("M" referência, "P"
+prompt) e o JSON comprimido.
+
+Uso:
+    python3 prompt_archive.py pack ../output prompts.prar      # arquiva os prompts salvos
+    python3 prompt_archive.py cat prompts.prar > prompts.jsonl  # lê os registros em sequência
+    python3 prompt_archive.py bench --count 5000                # compara os formatos de saída
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import zlib
+import random
+import struct
+import argparse
+import tempfile
+from collections import Counter
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from prompt_generator import CompiledPrompt, Persona, PromptTemplate, ResourceManager
+
+MAGIC = b"PRAR"
+FORMAT_VERSION = 1
+ARCHIVE_SUFFIX = ".prar"
+
+# Tamanho de cada registro e do dicionário
+LENGTH = struct.Struct(">I")
+
+RECORD_REFERENCE = b"M"
+RECORD_PROMPT = b"P"
+
+# Janela do zlib: apenas os últimos 32 KB do dicionário são usados
+MAX_DICTIONARY_SIZE = 32 * 1024
+
+# Separadores dos trechos usados no treino: parágrafos e variáveis do template
+FRAGMENT_SEPARATOR = re.compile(r'\n\n|\{[^}]+\}')
+
+# Trechos menores que isso não compensam espaço no dicionário
+MIN_FRAGMENT_SIZE = 16
+
+DEFAULT_LEVEL = 6
+
+# Metadados gravados uma única vez, como referência
+REFERENCE_KEYS = ("model", "persona", "template", "model_id", "persona_id", "template_id", "locale")
+
+# Esqueleto de um registro de prompt, mantido no fim do dicionário
+RECORD_SKELETON = '{"r":0,"m":{"timestamp":"","task_description":"","user_example":"","parameters":{}},"p":{"system":"","user":"","assistant":""}}'
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def _dumps(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def train_dictionary(texts: Iterable[str], size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """Treina um dicionário de compressão com um corpus de prompts do sistema
+
+    Os textos são divididos em parágrafos e trechos entre variáveis, e cada
+    trecho é pontuado por frequência x tamanho. Os trechos mais valiosos
+    ficam no fim do dicionário, mais perto dos dados comprimidos, onde as
+    referências custam menos bits. Os trechos são gravados como aparecem
+    dentro de um registro (texto escapado em JSON).
+    """
+    counts: Counter = Counter()
+    for text in texts:
+        for fragment in FRAGMENT_SEPARATOR.split(text):
+            if len(fragment) >= MIN_FRAGMENT_SIZE:
+                counts[fragment] += 1
+
+    skeleton = RECORD_SKELETON.encode("utf-8")
+    budget = size - len(skeleton)
+    chosen, total = [], 0
+    for fragment, _ in sorted(counts.items(), key=lambda item: (-item[1] * len(item[0]), item[0])):
+        data = json.dumps(fragment, ensure_ascii=False)[1:-1].encode("utf-8")
+        if total + len(data) > budget:
+            continue
+        chosen.append(data)
+        total += len(data)
+    return b"".join(reversed(chosen)) + skeleton
+
+
+def dictionary_from_catalogs(personas: Dict[str, Persona], templates: Dict[str, PromptTemplate],
+                             size: int = MAX_DICTIONARY_SIZE) -> bytes:
+    """Dicionário treinado com os textos das personas e das seções dos templates"""
+    texts = [persona.system_prompt_template for persona in personas.values()]
+    for template in templates.values():
+        texts.extend(template.structure.values())
+    return train_dictionary(texts, size)
+
+
+def _read_exact(f, size: int) -> bytes:
+    data = f.read(size)
+    if len(data) != size:
+        raise ArchiveError("Registro truncado")
+    return data
+
+
+def _read_header(f) -> bytes:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ArchiveError("Não é um arquivo de prompts compactado")
+    version = _read_exact(f, 1)[0]
+    if version != FORMAT_VERSION:
+        raise ArchiveError(f"Versão de formato não suportada: {version}")
+    (size,) = LENGTH.unpack(_read_exact(f, LENGTH.size))
+    return _read_exact(f, size)
+
+
+def _iter_raw(f) -> Iterator[Tuple[bytes, int, int]]:
+    """(tipo, posição do corpo, tamanho do corpo) de cada registro"""
+    while True:
+        head = f.read(LENGTH.size)
+        if not head:
+            return
+        if len(head) != LENGTH.size:
+            raise ArchiveError("Registro truncado")
+        (size,) = LENGTH.unpack(head)
+        kind = _read_exact(f, 1)
+        yield kind, f.tell(), size - 1
+
+
+class ArchiveWriter:
+    """Acrescenta prompts a um arquivo compactado
+
+    Um compressor é preparado uma única vez com o dicionário e copiado para
+    cada registro, evitando reprocessar o dicionário a cada prompt.
+    """
+
+    def __init__(self, path: str, dictionary: bytes = b"", level: int = DEFAULT_LEVEL):
+        self.path = path
+        self.references: Dict[tuple, int] = {}
+        self.count = 0
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # Arquivo existente: mantém o dicionário e as referências já gravadas
+            file_size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                self.dictionary = _read_header(f)
+                decompressor = self._decompressor()
+                complete = f.tell()
+                try:
+                    for kind, offset, size in _iter_raw(f):
+                        if offset + size > file_size:
+                            raise ArchiveError("Registro truncado")
+                        if kind == RECORD_REFERENCE:
+                            d = decompressor.copy()
+                            reference = json.loads(d.decompress(_read_exact(f, size)) + d.flush())
+                            self.references[self._reference_key(reference["metadata"])] = reference["id"]
+                        else:
+                            # Registros de prompt não precisam ser lidos
+                            f.seek(size, os.SEEK_CUR)
+                            self.count += 1
+                        complete = offset + size
+                except ArchiveError:
+                    # Gravação interrompida: o último registro está incompleto
+                    pass
+            self._file = open(path, 'ab')
+            # Novos registros continuam após o último registro completo
+            self._file.truncate(complete)
+        else:
+            self.dictionary = dictionary[-MAX_DICTIONARY_SIZE:]
+            self._file = open(path, 'wb')
+            self._file.write(MAGIC + bytes([FORMAT_VERSION]) + LENGTH.pack(len(self.dictionary)) + self.dictionary)
+
+        if self.dictionary:
+            self._compressor = zlib.compressobj(level, zdict=self.dictionary)
+        else:
+            self._compressor = zlib.compressobj(level)
+
+    def _decompressor(self):
+        return zlib.decompressobj(zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+
+    @staticmethod
+    def _reference_key(metadata: Dict[str, Any]) -> tuple:
+        return tuple(metadata.get(key, "") for key in REFERENCE_KEYS)
+
+    def _write(self, kind: bytes, data: Any):
+        compressor = self._compressor.copy()
+        body = compressor.compress(_dumps(data)) + compressor.flush()
+        self._file.write(LENGTH.pack(len(body) + 1) + kind + body)
+
+    def append(self, record: Dict[str, Any]) -> int:
+        """Grava um registro no formato de save_prompt(); retorna seu índice"""
+        metadata = record.get("metadata", {})
+        key = self._reference_key(metadata)
+        reference = self.references.get(key)
+        if reference is None:
+            reference = self.references[key] = len(self.references)
+            self._write(RECORD_REFERENCE, {"id": reference, "metadata": dict(zip(REFERENCE_KEYS, key))})
+
+        self._write(RECORD_PROMPT, {
+            "r": reference,
+            "m": {k: v for k, v in metadata.items() if k not in REFERENCE_KEYS},
+            "p": record.get("prompt", {}),
+        })
+        self.count += 1
+        return self.count - 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_archive(path: str) -> Iterator[Dict[str, Any]]:
+    """Lê os prompts de um arquivo compactado, um registro por vez"""
+    with open(path, 'rb') as f:
+        dictionary = _read_header(f)
+        decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+        references: Dict[int, Dict[str, Any]] = {}
+        for kind, offset, size in _iter_raw(f):
+            d = decompressor.copy()
+            try:
+                data = json.loads(d.decompress(_read_exact(f, size)) + d.flush())
+            except zlib.error as e:
+                raise ArchiveError(f"Registro corrompido na posição {offset}: {e}")
+            if kind == RECORD_REFERENCE:
+                references[data["id"]] = data["metadata"]
+                continue
+            metadata = dict(references[data["r"]])
+            metadata.update(data["m"])
+            yield {"metadata": metadata, "prompt": data["p"]}
+
+
+def is_archive(path: str) -> bool:
+    if path.endswith(ARCHIVE_SUFFIX):
+        return True
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def iter_saved(output_dir: str) -> Iterator[Dict[str, Any]]:
+    """Prompts salvos por save_prompt() em um diretório"""
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith(".json") and not name.startswith("."):
+            record = ResourceManager.load_json(os.path.join(output_dir, name), None)
+            if record and "prompt" in record:
+                yield record
+
+
+def system_texts(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield from (content for content in record.get("prompt", {}).values() if len(content) > MIN_FRAGMENT_SIZE)
+
+
+def pack(output_dir: str, path: str, train_samples: int = 1000, level: int = DEFAULT_LEVEL) -> int:
+    """Arquiva os prompts salvos em um diretório; o dicionário é treinado com uma amostra"""
+    dictionary = train_dictionary(system_texts(islice(iter_saved(output_dir), train_samples)))
+    with ArchiveWriter(path, dictionary, level) as writer:
+        for record in iter_saved(output_dir):
+            writer.append(record)
+        return writer.count
+
+
+def sample_records(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Registros no formato de save_prompt() para os catálogos atuais"""
+    rng = random.Random(seed)
+    models = ResourceManager.load_models()
+    personas = ResourceManager.load_personas()
+    templates = ResourceManager.load_templates()
+    compiled: Dict[tuple, CompiledPrompt] = {}
+    records = []
+    for i in range(count):
+        ids = (rng.choice(list(models)), rng.choice(list(personas)), rng.choice(list(templates)))
+        if ids not in compiled:
+            compiled[ids] = CompiledPrompt(models[ids[0]], personas[ids[1]], templates[ids[2]])
+        prompt = compiled[ids]
+        task = f"Tarefa de exemplo número {i} sobre {rng.choice(['vendas', 'contratos', 'APIs', 'clientes'])}"
+        parameters = {"tone": prompt.persona.tone, "detail_level": prompt.persona.detail_level,
+                      "output_format": rng.choice(["markdown", "texto", "json"])}
+        records.append({
+            "metadata": {
+                "timestamp": f"2025-06-01T12:00:{i % 60:02d}.{i:06d}",
+                "model": prompt.model.name, "persona": prompt.persona.name, "template": prompt.template.name,
+                "model_id": ids[0], "persona_id": ids[1], "template_id": ids[2],
+                "task_description": task, "user_example": "", "locale": "pt-BR", "parameters": parameters,
+            },
+            "prompt": prompt.render(task, parameters),
+        })
+    return records
+
+
+def benchmark(count: int = 2000, seed: int = 0) -> List[Dict[str, Any]]:
+    """Compara bytes por prompt e vazão de escrita dos formatos de saída
+
+    A vazão (MB/s) é medida sobre o tamanho do registro em JSON minificado,
+    para que os formatos sejam comparados pela mesma quantidade de dados.
+    """
+    records = sample_records(count, seed)
+    payload = sum(len(_dumps(record)) for record in records)
+    dictionary = train_dictionary(system_texts(records[:1000]))
+    results = []
+
+    def measure(name: str, write):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            start = time.perf_counter()
+            write(tmp_dir)
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(os.path.join(tmp_dir, n)) for n in os.listdir(tmp_dir))
+        finally:
+            for n in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, n))
+            os.rmdir(tmp_dir)
+        results.append({"format": name, "bytes_per_prompt": round(size / count, 1),
+                        "write_mb_s": round(payload / elapsed / 1e6, 1), "prompts_s": round(count / elapsed)})
+
+    def json_files(indent):
+        def write(tmp_dir):
+            for i, record in enumerate(records):
+                with open(os.path.join(tmp_dir, f"{i}.json"), 'w', encoding='utf-8') as f:
+                    if indent:
+                        json.dump(record, f, ensure_ascii=False, indent=2)
+                    else:
+                        json.dump(record, f, ensure_ascii=False, separators=(",", ":"))
+        return write
+
+    def archive(dictionary_bytes):
+        def write(tmp_dir):
+            with ArchiveWriter(os.path.join(tmp_dir, "prompts" + ARCHIVE_SUFFIX), dictionary_bytes) as writer:
+                for record in records:
+                    writer.append(record)
+        return write
+
+    measure("json (indent=2, um arquivo por prompt)", json_files(True))
+    measure("json minificado (um arquivo por prompt)", json_files(False))
+    measure("arquivo compactado, sem dicionário", archive(b""))
+    measure("arquivo compactado, com dicionário", archive(dictionary))
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Arquiva prompts gerados em formato compactado")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    pack_parser = subparsers.add_parser("pack", help="Arquiva os prompts salvos em um diretório")
+    pack_parser.add_argument("output_dir", help="Diretório com os prompts salvos")
+    pack_parser.add_argument("archive", help="Arquivo compactado (acrescenta se já existir)")
+    pack_parser.add_argument("--train-samples", type=int, default=1000, help="Prompts usados para treinar o dicionário")
+    pack_parser.add_argument("--level", type=int, default=DEFAULT_LEVEL, help="Nível de compressão do zlib (1-9)")
+
+    cat_parser = subparsers.add_parser("cat", help="Escreve os registros como JSONL")
+    cat_parser.add_argument("archive", help="Arquivo compactado")
+
+    bench_parser = subparsers.add_parser("bench", help="Compara os formatos de saída")
+    bench_parser.add_argument("--count", type=int, default=2000, help="Quantidade de prompts")
+    bench_parser.add_argument("--seed", type=int, default=0, help="Semente dos prompts de exemplo")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        if not os.path.isdir(args.output_dir):
+            print(f"Diretório não encontrado: {args.output_dir}", file=sys.stderr)
+            return 1
+        count = pack(args.output_dir, args.archive, args.train_samples, args.level)
+        print(f"{count} prompts em {args.archive} ({os.path.getsize(args.archive)} bytes)", file=sys.stderr)
+        return 0
+
+    if args.command == "cat":
+        try:
+            for record in iter_archive(args.archive):
+                sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except (OSError, ArchiveError) as e:
+            print(f"Erro ao ler {args.archive}: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    print(f"{'Formato':42} {'bytes/prompt':>12} {'MB/s':>8} {'prompts/s':>10}")
+    for result in benchmark(args.count, args.seed):
+        print(f"{result['format']:42} {result['bytes_per_prompt']:>12} {result['write_mb_s']:>8} {result['prompts_s']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,7 @@ import os
 import json
 import sys
 import re
+import argparse
 from datetime import datetime
 from typing import Dict, List, Optional, Union, Any
 
@@ -34,6 +35,41 @@ PERSONAS_FILE = os.path.join(RESOURCES_DIR, "personas.json")
 TEMPLATES_FILE = os.path.join(RESOURCES_DIR, "templates.json")
 MODELS_FILE = os.path.join(RESOURCES_DIR, "models.json")
 
+# Variáveis entre chaves nos templates, ex.: {language}
+PLACEHOLDER_PATTERN = re.compile(r'\{([^}]+)\}')
+
+# Chaves de composição de personas e templates
+EXTENDS_KEY = "extends"
+MIXINS_KEY = "mixins"
+ABSTRACT_KEY = "abstract"
+COMPOSITION_KEYS = (EXTENDS_KEY, MIXINS_KEY, ABSTRACT_KEY)
+
+# Sufixo que acrescenta ao valor herdado em vez de substituí-lo, ex.: "system_prompt_template+"
+APPEND_SUFFIX = "+"
+
+# Localização: os campos de cada entrada estão no locale de origem e "locales"
+# traz traduções parciais, ex.: {"locales": {"en": {"name": "..."}}}
+LOCALES_KEY = "locales"
+SOURCE_LOCALE = "pt-BR"
+FALLBACK_LOCALE = "en"
+
+# Idioma e subtags (ex.: pt-BR, zh-Hant-TW); o locale também nomeia arquivos
+LOCALE_PATTERN = re.compile(r'^[A-Za-z]{2,3}(-[A-Za-z0-9]{2,8})*$')
+
+# Catálogos pré-compilados por locale (ver LocaleCatalogs)
+COMPILED_DIR = os.path.join(RESOURCES_DIR, "compiled")
+
+# Versão do formato compilado; incrementada quando a aplicação das traduções
+# ou a resolução da herança mudam, para descartar arquivos gravados antes
+COMPILED_FORMAT_VERSION = 2
+
+# Aproximação usada para estimar tokens sem depender de tokenizadores externos
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text: str) -> int:
+    """Estima a quantidade de tokens de um texto"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
 # Cores para terminal
 class Colors:
     HEADER = '\033[95m'
@@ -94,6 +130,308 @@ class PromptTemplate(PromptComponent):
         self.example_input = example_input
         self.example_output = example_output
 
+# Prompt pré-compilado para um par persona/template
+class CompiledPrompt:
+    """Separa o prompt do sistema em trechos estáticos e variáveis.
+
+    Os trechos sem variáveis são concatenados uma única vez, de modo que
+    renderizar várias combinações de parâmetros só custa a junção dos
+    segmentos variáveis.
+    """
+
+    def __init__(self, model: AIModel, persona: Persona, template: PromptTemplate):
+        self.model = model
+        self.persona = persona
+        self.template = template
+
+        # Lista de (texto estático, variável seguinte ou None)
+        self.segments: List[tuple] = []
+        variables: List[str] = []
+
+        pending = persona.system_prompt_template
+        sections = list(template.structure.values())
+        if sections:
+            pending += "\n\n"
+        for i, value in enumerate(sections):
+            if i:
+                pending += "\n\n"
+            parts = PLACEHOLDER_PATTERN.split(value)
+            # split() alterna texto e nome da variável
+            for j, part in enumerate(parts):
+                if j % 2 == 0:
+                    pending += part
+                else:
+                    self.segments.append((pending, part))
+                    pending = ""
+                    if part not in variables:
+                        variables.append(part)
+        self.segments.append((pending, None))
+        self.variables = variables
+
+    def render_system(self, task_description: str, parameters: Dict[str, str]) -> str:
+        """Monta o prompt do sistema substituindo as variáveis"""
+        chunks = []
+        for text, var in self.segments:
+            chunks.append(text)
+            if var is not None:
+                chunks.append(self.variable_value(var, task_description, parameters))
+        return "".join(chunks)
+
+    @staticmethod
+    def variable_value(var: str, task_description: str, parameters: Dict[str, str]) -> str:
+        """Valor de uma variável do template"""
+        if var in parameters:
+            return parameters[var]
+        if var == "topic":
+            return task_description
+        # Variável sem valor permanece no texto
+        return f"{{{var}}}"
+
+    def render_sections(self, task_description: str, parameters: Dict[str, str]) -> Dict[str, str]:
+        """Renderiza separadamente a persona e cada seção do template"""
+        sections = {"persona": self.persona.system_prompt_template}
+        for key, value in self.template.structure.items():
+            sections[key] = PLACEHOLDER_PATTERN.sub(
+                lambda match: self.variable_value(match.group(1), task_description, parameters), value)
+        return sections
+
+    def render(self, task_description: str, parameters: Dict[str, str],
+               user_example: str = "") -> Dict[str, str]:
+        """Gera o prompt completo no formato do modelo"""
+        system_prompt = self.render_system(task_description, parameters)
+
+        user_prompt = task_description
+        if user_example:
+            user_prompt += f"\n\n{user_example}"
+
+        prompt = {}
+        for role_key, role_name in self.model.prompt_format.items():
+            if role_key == "system":
+                prompt[role_name] = system_prompt
+            elif role_key == "user":
+                prompt[role_name] = user_prompt
+            else:
+                prompt[role_name] = ""
+        return prompt
+
+# Erro de composição de entradas (herança ou mixins inválidos)
+class CompositionError(Exception):
+    pass
+
+def merge_entry(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    """Aplica os campos de `override` sobre `base` sem modificar nenhum dos dois
+
+    Dicionários são mesclados recursivamente e os demais valores são
+    substituídos. Chaves terminadas em "+" acrescentam ao valor herdado:
+    textos são concatenados como um novo parágrafo e listas são estendidas.
+    """
+    result = dict(base)
+    for key, value in override.items():
+        if key in COMPOSITION_KEYS:
+            continue
+        if key.endswith(APPEND_SUFFIX):
+            target = key[:-len(APPEND_SUFFIX)]
+            current = result.get(target)
+            if isinstance(current, list):
+                result[target] = current + (value if isinstance(value, list) else [value])
+            elif isinstance(current, str) and current:
+                result[target] = f"{current}\n\n{value}"
+            else:
+                result[target] = value
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = merge_entry(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+# Resolução de herança e mixins de um catálogo
+class CatalogResolver:
+    """Achata entradas que declaram "extends" e "mixins"
+
+    Cada entrada é resolvida uma única vez e mantida em cache. Quando uma
+    entrada muda, update() descarta apenas o cache dela e das entradas que
+    dependem dela, direta ou indiretamente.
+    """
+
+    def __init__(self, raw: Dict[str, Dict[str, Any]]):
+        self.raw: Dict[str, Dict[str, Any]] = dict(raw)
+        self._resolved: Dict[str, Dict[str, Any]] = {}
+        self._dependents: Dict[str, set] = {}
+        for entry_id in self.raw:
+            self._link(entry_id)
+
+    @staticmethod
+    def dependencies(entry: Dict[str, Any]) -> List[str]:
+        """IDs dos quais uma entrada depende (pai e mixins)"""
+        deps = []
+        if entry.get(EXTENDS_KEY):
+            deps.append(entry[EXTENDS_KEY])
+        deps.extend(entry.get(MIXINS_KEY, []))
+        return deps
+
+    def _link(self, entry_id: str):
+        for dep in self.dependencies(self.raw[entry_id]):
+            self._dependents.setdefault(dep, set()).add(entry_id)
+
+    def _unlink(self, entry_id: str):
+        for dep in self.dependencies(self.raw[entry_id]):
+            self._dependents.get(dep, set()).discard(entry_id)
+
+    def dependents_of(self, entry_id: str) -> set:
+        """Entradas que dependem de `entry_id`, direta ou indiretamente"""
+        found = set()
+        pending = [entry_id]
+        while pending:
+            for dependent in self._dependents.get(pending.pop(), ()):
+                if dependent not in found:
+                    found.add(dependent)
+                    pending.append(dependent)
+        return found
+
+    def resolve(self, entry_id: str, _stack: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Retorna a entrada achatada, detectando ciclos"""
+        cached = self._resolved.get(entry_id)
+        if cached is not None:
+            return cached
+
+        stack = _stack or []
+        if entry_id in stack:
+            raise CompositionError("Ciclo de composição: " + " -> ".join(stack[stack.index(entry_id):] + [entry_id]))
+        if entry_id not in self.raw:
+            raise CompositionError(f"Entrada '{entry_id}' não encontrada" + (f" (usada por '{stack[-1]}')" if stack else ""))
+
+        entry = self.raw[entry_id]
+        stack = stack + [entry_id]
+        result = self.resolve(entry[EXTENDS_KEY], stack) if entry.get(EXTENDS_KEY) else {}
+        for mixin_id in entry.get(MIXINS_KEY, []):
+            result = self._apply_mixin(result, mixin_id, stack)
+        result = merge_entry(result, entry)
+
+        self._resolved[entry_id] = result
+        return result
+
+    def _apply_mixin(self, base: Dict[str, Any], mixin_id: str, stack: List[str]) -> Dict[str, Any]:
+        # Mixins contribuem com os próprios campos (e os de seus mixins), sem herança
+        if mixin_id in stack:
+            raise CompositionError("Ciclo de composição: " + " -> ".join(stack[stack.index(mixin_id):] + [mixin_id]))
+        if mixin_id not in self.raw:
+            raise CompositionError(f"Mixin '{mixin_id}' não encontrado (usado por '{stack[-1]}')")
+        mixin = self.raw[mixin_id]
+        if mixin.get(EXTENDS_KEY):
+            raise CompositionError(f"O mixin '{mixin_id}' não pode declarar '{EXTENDS_KEY}'")
+        for nested_id in mixin.get(MIXINS_KEY, []):
+            base = self._apply_mixin(base, nested_id, stack + [mixin_id])
+        return merge_entry(base, mixin)
+
+    def resolve_all(self, include_abstract: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Resolve todas as entradas; entradas inválidas são reportadas e ignoradas"""
+        resolved = {}
+        for entry_id, entry in self.raw.items():
+            if entry.get(ABSTRACT_KEY) and not include_abstract:
+                continue
+            try:
+                resolved[entry_id] = self.resolve(entry_id)
+            except CompositionError as e:
+                print(f"Erro ao resolver '{entry_id}': {e}")
+        return resolved
+
+    def update(self, entry_id: str, entry: Optional[Dict[str, Any]]) -> set:
+        """Substitui (ou remove, com None) uma entrada e retorna os IDs invalidados"""
+        invalidated = {entry_id} | self.dependents_of(entry_id)
+        if entry_id in self.raw:
+            self._unlink(entry_id)
+        if entry is None:
+            self.raw.pop(entry_id, None)
+        else:
+            self.raw[entry_id] = entry
+            self._link(entry_id)
+        invalidated |= self.dependents_of(entry_id)
+        for stale in invalidated:
+            self._resolved.pop(stale, None)
+        return invalidated
+
+    def sync(self, raw: Dict[str, Dict[str, Any]]) -> set:
+        """Atualiza o catálogo inteiro, invalidando só o que mudou"""
+        invalidated = set()
+        for entry_id in set(self.raw) | set(raw):
+            if self.raw.get(entry_id) != raw.get(entry_id):
+                invalidated |= self.update(entry_id, raw.get(entry_id))
+        # Mantém a ordem do arquivo
+        self.raw = {entry_id: self.raw[entry_id] for entry_id in raw}
+        return invalidated
+
+def normalize_locale(locale: str) -> str:
+    """Normaliza um identificador de locale, ex.: pt_br -> pt-BR
+
+    Levanta ValueError se o resultado não seguir LOCALE_PATTERN.
+    """
+    parts = re.split(r'[-_]', locale.strip())
+    normalized = [parts[0].lower()]
+    for part in parts[1:]:
+        if len(part) == 2:
+            normalized.append(part.upper())
+        elif len(part) == 4:
+            normalized.append(part.title())
+        else:
+            normalized.append(part)
+    result = "-".join(normalized)
+    if not LOCALE_PATTERN.match(result):
+        raise ValueError(f"Locale inválido: '{locale}'")
+    return result
+
+def locale_argument(text: str) -> str:
+    """Tipo dos argumentos --locale: valida e normaliza o locale"""
+    try:
+        return normalize_locale(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def locale_chain(locale: str, fallback: Optional[str] = FALLBACK_LOCALE) -> List[str]:
+    """Cadeia de fallback de um locale, do mais específico ao mais genérico
+
+    Ex.: pt-BR -> pt -> en
+    """
+    parts = normalize_locale(locale).split("-")
+    chain = ["-".join(parts[:i]) for i in range(len(parts), 0, -1)]
+    if fallback and fallback not in chain:
+        chain.append(fallback)
+    return chain
+
+def overlay_translation(base: Dict[str, Any], layer: Dict[str, Any]) -> Dict[str, Any]:
+    """Sobrepõe uma camada de tradução, chave a chave
+
+    Diferente de merge_entry(), o sufixo "+" não é interpretado aqui: uma
+    chave traduzida "campo+" substitui a chave "campo+" de origem e continua
+    acrescentando ao valor herdado quando a herança for resolvida.
+    """
+    result = dict(base)
+    for key, value in layer.items():
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = overlay_translation(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+def localize_entry(entry: Dict[str, Any], chain: List[str]) -> Dict[str, Any]:
+    """Aplica à entrada as traduções da cadeia de locales
+
+    Os campos próprios da entrada valem para o locale de origem e para o seu
+    idioma; os campos sem tradução na cadeia mantêm o texto de origem.
+    """
+    translations = entry.get(LOCALES_KEY) or {}
+    result = {key: value for key, value in entry.items() if key != LOCALES_KEY}
+    source = locale_chain(SOURCE_LOCALE, fallback=None)
+    layers = []
+    for locale in chain:
+        if locale in translations:
+            layers.append(translations[locale])
+        if locale in source:
+            break
+    # Do menos para o mais específico
+    for layer in reversed(layers):
+        result = overlay_translation(result, layer)
+    return result
+
 # Gerenciador de recursos
 class ResourceManager:
     @staticmethod
@@ -121,10 +459,43 @@ class ResourceManager:
             return False
     
     @staticmethod
-    def load_models() -> Dict[str, AIModel]:
+    def load_catalog(name: str, file_path: str, backend: Any = None) -> Dict[str, Any]:
+        """Carrega os dados brutos de um catálogo do backend ou do arquivo JSON"""
+        if backend is not None:
+            return backend.load_catalog(name)
+        return ResourceManager.load_json(file_path, {})
+    
+    @staticmethod
+    def save_catalog(name: str, file_path: str, data: Dict[str, Any], backend: Any = None) -> bool:
+        """Salva os dados brutos de um catálogo no backend ou no arquivo JSON"""
+        if backend is not None:
+            backend.save_catalog(name, data)
+            return True
+        return ResourceManager.save_json(file_path, data)
+    
+    @staticmethod
+    def resolve_catalog(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Achata herança e mixins, se o catálogo os utilizar"""
+        if not any(isinstance(entry, dict) and any(key in entry for key in COMPOSITION_KEYS)
+                   for entry in data.values()):
+            return data
+        return CatalogResolver(data).resolve_all()
+    
+    @staticmethod
+    def localize_catalog(data: Dict[str, Any], locale: Optional[str] = None) -> Dict[str, Any]:
+        """Aplica as traduções de um locale, se o catálogo as tiver"""
+        if not any(isinstance(entry, dict) and LOCALES_KEY in entry for entry in data.values()):
+            return data
+        chain = locale_chain(locale or SOURCE_LOCALE)
+        return {entry_id: localize_entry(entry, chain) if isinstance(entry, dict) else entry
+                for entry_id, entry in data.items()}
+    
+    @staticmethod
+    def load_models(file_path: Optional[str] = None, backend: Any = None,
+                    locale: Optional[str] = None) -> Dict[str, AIModel]:
         """Carrega modelos de IA disponíveis"""
-        models_data = ResourceManager.load_json(MODELS_FILE, {})
-        models = {}
+        file_path = file_path or MODELS_FILE
+        models_data = ResourceManager.load_catalog("models", file_path, backend)
         
         # Adicionar modelos padrão se o arquivo não existir
         if not models_data:
@@ -220,28 +591,19 @@ class ResourceManager:
                     "training_cutoff": "2023-12"
                 }
             }
-            ResourceManager.save_json(MODELS_FILE, models_data)
+            ResourceManager.save_catalog("models", file_path, models_data, backend)
         
-        # Converter dados em objetos AIModel
-        for model_id, model_data in models_data.items():
-            models[model_id] = AIModel(
-                name=model_data.get("name", model_id),
-                description=model_data.get("description", ""),
-                provider=model_data.get("provider", ""),
-                context_window=model_data.get("context_window", 0),
-                max_output=model_data.get("max_output", 0),
-                features=model_data.get("features", {}),
-                prompt_format=model_data.get("prompt_format", {}),
-                training_cutoff=model_data.get("training_cutoff", "")
-            )
+        # Aplicar as traduções do locale
+        models_data = ResourceManager.localize_catalog(models_data, locale)
         
-        return models
+        return ResourceManager.build_models(models_data)
     
     @staticmethod
-    def load_personas() -> Dict[str, Persona]:
+    def load_personas(file_path: Optional[str] = None, backend: Any = None,
+                      locale: Optional[str] = None) -> Dict[str, Persona]:
         """Carrega personas disponíveis"""
-        personas_data = ResourceManager.load_json(PERSONAS_FILE, {})
-        personas = {}
+        file_path = file_path or PERSONAS_FILE
+        personas_data = ResourceManager.load_catalog("personas", file_path, backend)
         
         # Adicionar personas padrão se o arquivo não existir
         if not personas_data:
@@ -274,27 +636,20 @@ class ResourceManager:
                     "system_prompt_template": "Como um Desenvolvedor de Código experiente, sua tarefa é criar, revisar ou depurar código conforme solicitado pelo usuário. Ao receber uma solicitação, você deve: 1) Compreender claramente os requisitos funcionais e técnicos; 2) Escrever código limpo, eficiente e bem documentado; 3) Explicar a lógica e as decisões de implementação; 4) Fornecer comentários úteis no código; 5) Sugerir melhorias ou alternativas quando relevante. Seu código deve seguir as melhores práticas da linguagem em questão e considerar aspectos como desempenho, segurança e manutenibilidade. Se os requisitos forem ambíguos, faça perguntas para esclarecer antes de implementar a solução. Mantenha um tom técnico mas acessível, e esteja preparado para explicar conceitos complexos de forma compreensível."
                 }
             }
-            ResourceManager.save_json(PERSONAS_FILE, personas_data)
+            ResourceManager.save_catalog("personas", file_path, personas_data, backend)
         
-        # Converter dados em objetos Persona
-        for persona_id, persona_data in personas_data.items():
-            personas[persona_id] = Persona(
-                name=persona_data.get("name", persona_id),
-                description=persona_data.get("description", ""),
-                expertise=persona_data.get("expertise", []),
-                tone=persona_data.get("tone", ""),
-                detail_level=persona_data.get("detail_level", ""),
-                approach=persona_data.get("approach", ""),
-                system_prompt_template=persona_data.get("system_prompt_template", "")
-            )
+        # Aplicar as traduções do locale e resolver herança e mixins uma única vez, no carregamento
+        personas_data = ResourceManager.localize_catalog(personas_data, locale)
+        personas_data = ResourceManager.resolve_catalog(personas_data)
         
-        return personas
+        return ResourceManager.build_personas(personas_data)
     
     @staticmethod
-    def load_templates() -> Dict[str, PromptTemplate]:
+    def load_templates(file_path: Optional[str] = None, backend: Any = None,
+                       locale: Optional[str] = None) -> Dict[str, PromptTemplate]:
         """Carrega templates de prompt disponíveis"""
-        templates_data = ResourceManager.load_json(TEMPLATES_FILE, {})
-        templates = {}
+        file_path = file_path or TEMPLATES_FILE
+        templates_data = ResourceManager.load_catalog("templates", file_path, backend)
         
         # Adicionar templates padrão se o arquivo não existir
         if not templates_data:
@@ -342,9 +697,51 @@ class ResourceManager:
                     "example_output": "# Meditação para Profissionais Ocupados: Encontrando Calma no Caos Corporativo\n\n## Introdução\n\nNo ritmo acelerado do mundo corporativo moderno, encontrar momentos de tranquilidade parece quase impossível. Reuniões consecutivas, prazos apertados e a constante enxurrada de e-mails criam um ambiente onde o estresse prospera. No entanto, é precisamente neste cenário caótico que a meditação oferece seus benefícios mais poderosos. Este artigo explora como profissionais ocupados podem incorporar práticas meditativas breves mas eficazes em seu dia de trabalho, transformando produtividade e bem-estar sem comprometer agendas já sobrecarregadas.\n\n## Por que meditar no trabalho?\n\nAntes de mergulharmos nas técnicas, vamos entender por que a meditação no ambiente de trabalho vale seu tempo precioso:\n\n- **Redução do estresse em tempo real**: Estudos mostram que mesmo 2-3 minutos de meditação podem reduzir significativamente os hormônios do estresse no corpo\n- **Melhoria do foco**: A prática regular fortalece sua capacidade de manter a atenção em tarefas complexas\n- **Tomada de decisão aprimorada**: Um estado mental mais calmo leva a escolhas mais deliberadas e menos reativas\n- **Criatividade aumentada**: Breves pausas meditativas podem desbloquear soluções inovadoras para problemas persistentes\n- **Melhor relacionamento interpessoal**: A consciência cultivada através da meditação melhora a comunicação e a empatia\n\n## 5 Técnicas de Meditação Rápida para o Ambiente de Trabalho\n\n### 1. Respiração 4-7-8 (2 minutos)\n\nEsta técnica pode ser feita discretamente em sua mesa:\n\n1. Inspire silenciosamente pelo nariz contando até 4\n2. Segure a respiração contando até 7\n3. Expire completamente pela boca contando até 8\n4. Repita 3-4 vezes\n\nIdeal para: Antes de reuniões importantes ou quando sentir ansiedade crescente.\n\n### 2. Escaneamento Corporal Expresso (3 minutos)\n\n1. Sente-se confortavelmente com os pés apoiados no chão\n2. Feche os olhos ou mantenha um olhar suave\n3. Direcione sua atenção metodicamente dos pés à cabeça\n4. Observe tensões e conscientemente relaxe cada área\n\nIdeal para: Após longas sessões de trabalho no computador ou momentos de alta tensão.\n\n[Continua com mais 3 técnicas e seções de conclusão...]\n\n## Conclusão\n\nA meditação não precisa ser uma prática demorada reservada para retiros espirituais. Estas técnicas rápidas demonstram que mesmo os profissionais mais ocupados podem colher os benefícios da atenção plena durante o dia de trabalho. Comece incorporando apenas uma técnica por dia e observe como pequenas pausas para reconexão mental podem transformar sua experiência profissional, aumentando tanto o bem-estar quanto a produtividade.\n\nLembre-se: em um mundo que valoriza a ocupação constante, tirar momentos para acalmar a mente não é apenas benéfico—é estratégico."
                 }
             }
-            ResourceManager.save_json(TEMPLATES_FILE, templates_data)
+            ResourceManager.save_catalog("templates", file_path, templates_data, backend)
         
-        # Converter dados em objetos PromptTemplate
+        # Aplicar as traduções do locale e resolver herança e mixins uma única vez, no carregamento
+        templates_data = ResourceManager.localize_catalog(templates_data, locale)
+        templates_data = ResourceManager.resolve_catalog(templates_data)
+        
+        return ResourceManager.build_templates(templates_data)
+    
+    @staticmethod
+    def build_models(models_data: Dict[str, Any]) -> Dict[str, AIModel]:
+        """Converte os dados de um catálogo em objetos AIModel"""
+        models = {}
+        for model_id, model_data in models_data.items():
+            models[model_id] = AIModel(
+                name=model_data.get("name", model_id),
+                description=model_data.get("description", ""),
+                provider=model_data.get("provider", ""),
+                context_window=model_data.get("context_window", 0),
+                max_output=model_data.get("max_output", 0),
+                features=model_data.get("features", {}),
+                prompt_format=model_data.get("prompt_format", {}),
+                training_cutoff=model_data.get("training_cutoff", "")
+            )
+        return models
+    
+    @staticmethod
+    def build_personas(personas_data: Dict[str, Any]) -> Dict[str, Persona]:
+        """Converte os dados de um catálogo em objetos Persona"""
+        personas = {}
+        for persona_id, persona_data in personas_data.items():
+            personas[persona_id] = Persona(
+                name=persona_data.get("name", persona_id),
+                description=persona_data.get("description", ""),
+                expertise=persona_data.get("expertise", []),
+                tone=persona_data.get("tone", ""),
+                detail_level=persona_data.get("detail_level", ""),
+                approach=persona_data.get("approach", ""),
+                system_prompt_template=persona_data.get("system_prompt_template", "")
+            )
+        return personas
+    
+    @staticmethod
+    def build_templates(templates_data: Dict[str, Any]) -> Dict[str, PromptTemplate]:
+        """Converte os dados de um catálogo em objetos PromptTemplate"""
+        templates = {}
         for template_id, template_data in templates_data.items():
             templates[template_id] = PromptTemplate(
                 name=template_data.get("name", template_id),
@@ -354,23 +751,155 @@ class ResourceManager:
                 example_input=template_data.get("example_input", ""),
                 example_output=template_data.get("example_output", "")
             )
-        
         return templates
 
+# Catálogos localizados, pré-compilados e carregados sob demanda
+class LocaleCatalogs:
+    """Versões dos catálogos por locale
+
+    Um locale só é compilado (traduções aplicadas, herança e mixins
+    resolvidos) na primeira vez em que é usado. O resultado é gravado em
+    compiled_dir/<locale>.json junto com a assinatura dos arquivos de
+    origem; enquanto eles não mudarem, outros processos leem apenas esse
+    arquivo. Com um backend de armazenamento, a compilação fica em memória.
+    """
+
+    KINDS = ("models", "personas", "templates")
+
+    def __init__(self, backend: Any = None, resource_files: Optional[Dict[str, str]] = None,
+                 compiled_dir: Optional[str] = COMPILED_DIR):
+        self.backend = backend
+        self.resource_files = {"models": MODELS_FILE, "personas": PERSONAS_FILE, "templates": TEMPLATES_FILE}
+        self.resource_files.update(resource_files or {})
+        self.compiled_dir = compiled_dir
+        self._loaded: Dict[str, Dict[str, Dict[str, PromptComponent]]] = {}
+
+    def source_stamp(self) -> Optional[Dict[str, List[int]]]:
+        """Assinatura dos arquivos de origem, ou None se não houver cache em disco"""
+        if self.backend is not None or not self.compiled_dir:
+            return None
+        stamp = {}
+        for kind, path in self.resource_files.items():
+            if os.path.exists(path):
+                stat = os.stat(path)
+                stamp[kind] = [stat.st_mtime_ns, stat.st_size]
+            else:
+                stamp[kind] = [0, 0]
+        return stamp
+
+    def compiled_path(self, locale: str) -> str:
+        return os.path.join(self.compiled_dir, f"{normalize_locale(locale)}.json")
+
+    def compile(self, locale: str) -> Dict[str, Dict[str, Any]]:
+        """Dados de cada catálogo com as traduções do locale aplicadas"""
+        compiled = {}
+        for kind in self.KINDS:
+            path = self.resource_files[kind]
+            data = ResourceManager.load_catalog(kind, path, self.backend)
+            if not data:
+                # Catálogo ausente: o carregador grava os padrões
+                getattr(ResourceManager, f"load_{kind}")(path, self.backend)
+                data = ResourceManager.load_catalog(kind, path, self.backend)
+            data = ResourceManager.localize_catalog(data, locale)
+            if kind != "models":
+                data = ResourceManager.resolve_catalog(data)
+            compiled[kind] = data
+        return compiled
+
+    def write(self, locale: str, stamp: Dict[str, List[int]], data: Dict[str, Dict[str, Any]]) -> str:
+        os.makedirs(self.compiled_dir, exist_ok=True)
+        path = self.compiled_path(locale)
+        # Outros processos podem ler o arquivo enquanto ele é gravado
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        if ResourceManager.save_json(tmp_path, {"format": COMPILED_FORMAT_VERSION, "locale": normalize_locale(locale),
+                                                "sources": stamp, "catalogs": data}):
+            os.replace(tmp_path, path)
+        elif os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return path
+
+    def precompile(self, locale: str) -> str:
+        """Compila um locale e grava o resultado; retorna o caminho do arquivo"""
+        stamp = self.source_stamp()
+        return self.write(locale, stamp, self.compile(locale))
+
+    def load_compiled(self, locale: str) -> Dict[str, Dict[str, Any]]:
+        """Lê a versão pré-compilada do locale, compilando-a se estiver desatualizada"""
+        stamp = self.source_stamp()
+        if stamp is None:
+            return self.compile(locale)
+        cached = ResourceManager.load_json(self.compiled_path(locale), None)
+        if cached and cached.get("format") == COMPILED_FORMAT_VERSION and cached.get("sources") == stamp:
+            return cached["catalogs"]
+        data = self.compile(locale)
+        self.write(locale, stamp, data)
+        return data
+
+    def get(self, locale: Optional[str] = None) -> Dict[str, Dict[str, PromptComponent]]:
+        """Modelos, personas e templates de um locale"""
+        locale = normalize_locale(locale or SOURCE_LOCALE)
+        if locale not in self._loaded:
+            data = self.load_compiled(locale)
+            self._loaded[locale] = {
+                "models": ResourceManager.build_models(data["models"]),
+                "personas": ResourceManager.build_personas(data["personas"]),
+                "templates": ResourceManager.build_templates(data["templates"]),
+            }
+        return self._loaded[locale]
+
+    def available_locales(self) -> List[str]:
+        """Locales com pelo menos uma tradução nos catálogos de origem"""
+        locales = {SOURCE_LOCALE}
+        for kind in self.KINDS:
+            data = ResourceManager.load_catalog(kind, self.resource_files[kind], self.backend) or {}
+            for entry in data.values():
+                if isinstance(entry, dict):
+                    for locale in entry.get(LOCALES_KEY) or {}:
+                        try:
+                            locales.add(normalize_locale(locale))
+                        except ValueError:
+                            pass
+        return sorted(locales)
+
+def write_output_record(file_path: str, record: Dict[str, Any], compact: bool = False):
+    """Grava um prompt salvo em JSON, minificado ou indentado; levanta OSError em falhas"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        if compact:
+            json.dump(record, f, ensure_ascii=False, separators=(",", ":"))
+        else:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+
 # Gerador de prompts
 class PromptGenerator:
-    def __init__(self):
-        self.models = ResourceManager.load_models()
-        self.personas = ResourceManager.load_personas()
-        self.templates = ResourceManager.load_templates()
+    def __init__(self, backend: Any = None, locale: Optional[str] = None):
+        # Backend de armazenamento opcional (ver storage.py); sem ele, usa os arquivos JSON locais
+        self.backend = backend
+        self.locale = normalize_locale(locale) if locale else SOURCE_LOCALE
+        if locale:
+            # Catálogos do locale pedido, pré-compilados (ver LocaleCatalogs)
+            catalogs = LocaleCatalogs(backend).get(self.locale)
+            self.models = catalogs["models"]
+            self.personas = catalogs["personas"]
+            self.templates = catalogs["templates"]
+        else:
+            self.models = ResourceManager.load_models(backend=backend)
+            self.personas = ResourceManager.load_personas(backend=backend)
+            self.templates = ResourceManager.load_templates(backend=backend)
         
         # Configurações padrão
         self.selected_model = None
         self.selected_persona = None
         self.selected_template = None
+        self.selected_model_id = None
+        self.selected_persona_id = None
+        self.selected_template_id = None
         self.task_description = ""
         self.parameters = {}
         self.user_example = ""
+        
+        # Formato de saída: JSON minificado e/ou arquivo compactado (ver prompt_archive.py)
+        self.compact_output = False
+        self.archive = None
     
     def clear_screen(self):
         """Limpa a tela do terminal"""
@@ -441,6 +970,7 @@ class PromptGenerator:
         model_id = self.select_from_list(self.models, "Selecione o modelo de IA alvo:")
         if model_id:
             self.selected_model = self.models[model_id]
+            self.selected_model_id = model_id
             self.print_success(f"Modelo selecionado: {self.selected_model.name}")
             return True
         return False
@@ -450,6 +980,7 @@ class PromptGenerator:
         persona_id = self.select_from_list(self.personas, "Selecione a persona para o modelo de IA:")
         if persona_id:
             self.selected_persona = self.personas[persona_id]
+            self.selected_persona_id = persona_id
             self.print_success(f"Persona selecionada: {self.selected_persona.name}")
             return True
         return False
@@ -459,6 +990,7 @@ class PromptGenerator:
         template_id = self.select_from_list(self.templates, "Selecione o template de prompt:")
         if template_id:
             self.selected_template = self.templates[template_id]
+            self.selected_template_id = template_id
             self.print_success(f"Template selecionado: {self.selected_template.name}")
             return True
         return False
@@ -497,7 +1029,7 @@ class PromptGenerator:
             for key in self.selected_template.structure.keys():
                 if "{" in self.selected_template.structure[key] and "}" in self.selected_template.structure[key]:
                     # Extrair variáveis entre chaves
-                    variables = re.findall(r'\{([^}]+)\}', self.selected_template.structure[key])
+                    variables = PLACEHOLDER_PATTERN.findall(self.selected_template.structure[key])
                     for var in variables:
                         if var not in self.parameters and var != "topic":  # topic já é coberto pela descrição da tarefa
                             self.parameters[var] = self.get_input(f"Valor para '{var}'")
@@ -523,75 +1055,70 @@ class PromptGenerator:
             self.print_error("Informações insuficientes para gerar o prompt.")
             return {}
         
-        # Preparar o prompt do sistema
-        system_prompt = self.selected_persona.system_prompt_template
-        
-        # Adicionar informações específicas do template
-        template_additions = []
-        for key, value in self.selected_template.structure.items():
-            # Substituir variáveis no template
-            formatted_value = value
-            for param_key, param_value in self.parameters.items():
-                formatted_value = formatted_value.replace(f"{{{param_key}}}", param_value)
-            
-            # Substituir {topic} pela descrição da tarefa se presente
-            formatted_value = formatted_value.replace("{topic}", self.task_description)
-            
-            template_additions.append(formatted_value)
-        
-        # Adicionar as adições do template ao prompt do sistema
-        if template_additions:
-            system_prompt += "\n\n" + "\n\n".join(template_additions)
-        
-        # Preparar o prompt do usuário
-        user_prompt = self.task_description
-        
-        # Adicionar exemplo se fornecido
-        if self.user_example:
-            user_prompt += f"\n\n{self.user_example}"
-        
-        # Criar o prompt final no formato apropriado para o modelo
-        prompt = {}
-        
-        # Garantir que todos os campos do formato do modelo estejam presentes
-        for role_key, role_name in self.selected_model.prompt_format.items():
-            if role_key == "system":
-                prompt[role_name] = system_prompt
-            elif role_key == "user":
-                prompt[role_name] = user_prompt
-            else:
-                # Para outros campos (como "assistant"), adicionar um valor vazio
-                prompt[role_name] = ""
-        
-        return prompt
+        compiled = CompiledPrompt(self.selected_model, self.selected_persona, self.selected_template)
+        return compiled.render(self.task_description, self.parameters, self.user_example)
     
-    def save_prompt(self, prompt: Dict[str, str]) -> str:
-        """Salva o prompt gerado em um arquivo"""
-        if not prompt:
-            return ""
-        
-        # Criar nome de arquivo baseado na data/hora e descrição da tarefa
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        task_slug = re.sub(r'[^a-zA-Z0-9]', '_', self.task_description[:30].lower()).strip('_')
-        filename = f"{timestamp}_{task_slug}.json"
-        filepath = os.path.join(OUTPUT_DIR, filename)
-        
-        # Adicionar metadados
-        output_data = {
+    def component_id(self, items: Dict[str, PromptComponent], selected: Optional[PromptComponent],
+                     selected_id: Optional[str]) -> str:
+        """Retorna o ID do componente selecionado no catálogo"""
+        if selected_id:
+            return selected_id
+        for item_id, item in items.items():
+            if item is selected:
+                return item_id
+        return ""
+    
+    def output_record(self, prompt: Dict[str, str]) -> Dict[str, Any]:
+        """Monta o registro salvo: metadados da geração e o prompt"""
+        # Os IDs permitem regenerar o prompt quando os recursos mudam
+        return {
             "metadata": {
                 "timestamp": datetime.now().isoformat(),
                 "model": self.selected_model.name if self.selected_model else "",
                 "persona": self.selected_persona.name if self.selected_persona else "",
                 "template": self.selected_template.name if self.selected_template else "",
+                "model_id": self.component_id(self.models, self.selected_model, self.selected_model_id),
+                "persona_id": self.component_id(self.personas, self.selected_persona, self.selected_persona_id),
+                "template_id": self.component_id(self.templates, self.selected_template, self.selected_template_id),
+                "task_description": self.task_description,
+                "user_example": self.user_example,
+                "locale": self.locale,
                 "parameters": self.parameters
             },
             "prompt": prompt
         }
+    
+    def save_prompt(self, prompt: Dict[str, str], output_dir: Optional[str] = None) -> str:
+        """Salva o prompt gerado em um arquivo"""
+        if not prompt:
+            return ""
+        
+        # Criar nome de arquivo baseado na data/hora e descrição da tarefa
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        task_slug = re.sub(r'[^a-zA-Z0-9]', '_', self.task_description[:30].lower()).strip('_')
+        output_key = f"{timestamp}_{task_slug}"
+        filepath = os.path.join(output_dir or OUTPUT_DIR, f"{output_key}.json")
+        output_data = self.output_record(prompt)
+        
+        # Acrescentar ao arquivo compactado, se houver
+        if self.archive is not None and output_dir is None:
+            try:
+                return f"{self.archive.path}#{self.archive.append(output_data)}"
+            except Exception as e:
+                self.print_error(f"Erro ao salvar o prompt: {e}")
+                return ""
+        
+        # Salvar no backend configurado, se houver
+        if self.backend is not None and output_dir is None:
+            try:
+                return self.backend.put("output", output_key, output_data)
+            except Exception as e:
+                self.print_error(f"Erro ao salvar o prompt: {e}")
+                return ""
         
         # Salvar arquivo
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
+            write_output_record(filepath, output_data, self.compact_output)
             return filepath
         except Exception as e:
             self.print_error(f"Erro ao salvar o prompt: {e}")
@@ -665,8 +1192,31 @@ class PromptGenerator:
 # Função principal
 def main():
     """Função principal do script"""
-    generator = PromptGenerator()
-    generator.run()
+    parser = argparse.ArgumentParser(description="Gerador interativo de prompts")
+    parser.add_argument("--storage", help="Backend de armazenamento (ex.: sqlite:catalogo.db, dir:catalogo, http://host:porta)")
+    parser.add_argument("--cache-ttl", type=float, default=0, help="TTL em segundos do cache de leitura do backend")
+    parser.add_argument("--locale", type=locale_argument, help=f"Locale dos catálogos (ex.: en, pt-BR; padrão: {SOURCE_LOCALE})")
+    parser.add_argument("--compact", action="store_true", help="Salvar os prompts em JSON minificado")
+    parser.add_argument("--archive", help="Acrescentar os prompts a um arquivo compactado (ver prompt_archive.py)")
+    args = parser.parse_args()
+    
+    backend = None
+    if args.storage:
+        from storage import create_backend, CachedBackend
+        backend = create_backend(args.storage)
+        if args.cache_ttl > 0:
+            backend = CachedBackend(backend, ttl=args.cache_ttl)
+    
+    generator = PromptGenerator(backend, args.locale)
+    generator.compact_output = args.compact
+    if args.archive:
+        from prompt_archive import ArchiveWriter, dictionary_from_catalogs
+        generator.archive = ArchiveWriter(args.archive, dictionary_from_catalogs(generator.personas, generator.templates))
+    try:
+        generator.run()
+    finally:
+        if generator.archive is not None:
+            generator.archive.close()
 
 if __name__ == "__main__":
     main()
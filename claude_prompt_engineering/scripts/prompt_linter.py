@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Avaliação e Lint de Prompts
+---------------------------
+
+Implementa o Módulo de Avaliação e Otimização descrito em
+agente_criacao_prompts.md: um conjunto de regras determinísticas que
+aponta problemas comuns em prompts gerados e atribui uma nota de 0 a 100.
+
+Regras:
+    placeholder        variáveis {nome} não substituídas
+    duplicate          instruções repetidas entre persona e template
+    output-format      ausência de orientação sobre o formato de saída
+    budget             tamanho do prompt em relação à janela do modelo
+    tone-conflict      diretivas de tom contraditórias
+    invalid-record     registro que não pôde ser lido (ex.: linha JSONL inválida)
+
+As expressões regulares são compiladas uma única vez no carregamento do
+módulo. Em lote, prompts do sistema idênticos são analisados apenas uma
+vez e o trabalho pode ser distribuído entre processos.
+
+Uso:
+    python3 prompt_linter.py ../output/*.json
+    python3 prompt_linter.py prompts.jsonl --workers 4 --min-score 70
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import unicodedata
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from prompt_generator import (AIModel, LocaleCatalogs, Persona, PromptTemplate, ResourceManager,
+                              PLACEHOLDER_PATTERN, estimate_tokens, normalize_locale)
+from prompt_archive import ARCHIVE_SUFFIX, iter_archive
+
+# Severidades e penalidades na nota
+SEVERITY_PENALTIES = {
+    "error": 25,
+    "warning": 10,
+    "info": 3,
+}
+
+# Fração da janela de contexto a partir da qual o prompt é considerado longo
+BUDGET_WARNING_RATIO = 0.5
+
+# Sentenças com menos palavras que isso não são comparadas como instruções
+MIN_INSTRUCTION_WORDS = 5
+
+# Limite de prompts do sistema distintos mantidos no cache de análises
+SYSTEM_CACHE_SIZE = 4096
+
+# Fração mínima de palavras da instrução menor contidas na maior para
+# considerá-las duplicadas (coeficiente de sobreposição)
+DUPLICATE_SIMILARITY = 0.9
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?;:])\s+|\n+')
+WORD_PATTERN = re.compile(r'\w+')
+
+# Orientações de formato: nomes de formatos e expressões sobre a forma da
+# resposta, sem palavras soltas como "saída" ou "estrutura", comuns em prosa
+OUTPUT_FORMAT_PATTERN = re.compile(
+    r'\b(?:markdown|json|xml|csv|yaml|html|formato|format|formata[cç][aã]o|formatad[oa]s?|formatted|formatting'
+    r'|blocos? de c[oó]digo|code blocks?'
+    r'|(?:em|in a|as a) (?:forma de )?(?:tabelas?|listas?|t[oó]picos|table|list|bullet points)'
+    r'|(?:bem|de forma|de maneira) estruturad[oa]s?|well[- ]structured|structured (?:way|format|manner)'
+    r'|(?:sua|a) resposta deve|your (?:answer|response) should)\b',
+    re.IGNORECASE
+)
+
+# Polos de tom opostos; cada par é um grupo nomeado em uma única regex
+TONE_POLES = {
+    "formal": r'formal|formalidade|solene',
+    "informal": r'informal|descontra[ií]d[oa]|coloquial|casual|g[ií]rias?',
+    "concise": r'concis[oa]|sucint[oa]|breve|resumid[oa]|objetiv[oa]',
+    "verbose": r'exaustiv[oa]|extens[oa]|prolix[oa]|minucios[oa]',
+    "serious": r's[eé]ri[oa]|sobri[oa]',
+    "humorous": r'bem-humorad[oa]|humor[ií]stic[oa]|engra[cç]ad[oa]|divertid[oa]',
+}
+TONE_CONFLICTS = (("formal", "informal"), ("concise", "verbose"), ("serious", "humorous"))
+TONE_PATTERN = re.compile(
+    "|".join(rf'(?P<{pole}>\b(?:{words})\b)' for pole, words in TONE_POLES.items()),
+    re.IGNORECASE
+)
+
+
+class LintIssue:
+    def __init__(self, rule: str, severity: str, message: str):
+        self.rule = rule
+        self.severity = severity
+        self.message = message
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"rule": self.rule, "severity": self.severity, "message": self.message}
+
+    def __str__(self) -> str:
+        return f"[{self.severity}] {self.rule}: {self.message}"
+
+
+class LintResult:
+    def __init__(self, issues: List[LintIssue], tokens: int, budget_ratio: float, source: str = ""):
+        self.issues = issues
+        self.tokens = tokens
+        self.budget_ratio = budget_ratio
+        self.source = source
+        penalty = sum(SEVERITY_PENALTIES.get(issue.severity, 0) for issue in issues)
+        self.score = max(0, 100 - penalty)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "source": self.source,
+            "score": self.score,
+            "tokens": self.tokens,
+            "budget_ratio": round(self.budget_ratio, 4),
+            "issues": [issue.to_dict() for issue in self.issues],
+        }
+
+
+def _normalize(sentence: str) -> str:
+    """Normaliza uma sentença para comparação (minúsculas, sem acentos e pontuação)"""
+    text = unicodedata.normalize("NFKD", sentence.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(WORD_PATTERN.findall(text))
+
+
+def _instructions(text: str) -> List[str]:
+    """Divide um texto em instruções normalizadas com tamanho relevante"""
+    result = []
+    for sentence in SENTENCE_SPLIT_PATTERN.split(text):
+        normalized = _normalize(sentence)
+        if normalized.count(" ") + 1 >= MIN_INSTRUCTION_WORDS:
+            result.append(normalized)
+    return result
+
+
+def _similar(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    words_a, words_b = set(a.split()), set(b.split())
+    return len(words_a & words_b) / min(len(words_a), len(words_b)) >= DUPLICATE_SIMILARITY
+
+
+class PromptLinter:
+    """Aplica as regras de avaliação a prompts gerados"""
+
+    def __init__(self, models: Optional[Dict[str, AIModel]] = None,
+                 personas: Optional[Dict[str, Persona]] = None,
+                 templates: Optional[Dict[str, PromptTemplate]] = None,
+                 locale_catalogs: Optional[LocaleCatalogs] = None):
+        self.models = models if models is not None else {}
+        self.personas = personas if personas is not None else {}
+        self.templates = templates if templates is not None else {}
+        # Catálogos traduzidos para prompts gerados em outros locales
+        self.locale_catalogs = locale_catalogs
+
+        self._lookup = self._index(self.models, self.personas, self.templates)
+        self._locale_lookup: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+        # Análises do prompt do sistema, reaproveitadas entre prompts idênticos
+        self._system_cache: Dict[tuple, tuple] = {}
+
+    @staticmethod
+    def _index(models: Dict[str, AIModel], personas: Dict[str, Persona],
+               templates: Dict[str, PromptTemplate]) -> Dict[str, Dict[str, Any]]:
+        # Os metadados salvos referenciam recursos pelo nome ou pelo ID
+        lookup = {}
+        for kind, catalog in (("model", models), ("persona", personas), ("template", templates)):
+            index = {}
+            for item_id, item in catalog.items():
+                index.setdefault(item.name, item)
+                index[item_id] = item
+            lookup[kind] = index
+        return lookup
+
+    @classmethod
+    def from_resources(cls) -> "PromptLinter":
+        """Cria um linter com os catálogos do diretório de recursos"""
+        return cls(ResourceManager.load_models(), ResourceManager.load_personas(),
+                   ResourceManager.load_templates(), LocaleCatalogs())
+
+    def resolve(self, kind: str, key: Optional[str], locale: Optional[str] = None):
+        """Localiza um recurso pelo ID ou pelo nome registrado nos metadados
+
+        Com um locale, usa os catálogos traduzidos (os nomes salvos estão no
+        idioma do prompt) e recorre aos de origem se não encontrar.
+        """
+        if not key:
+            return None
+        if locale and self.locale_catalogs is not None:
+            try:
+                locale = normalize_locale(locale)
+            except (AttributeError, ValueError):
+                return self._lookup.get(kind, {}).get(key)
+            if locale not in self._locale_lookup:
+                catalogs = self.locale_catalogs.get(locale)
+                self._locale_lookup[locale] = self._index(catalogs["models"], catalogs["personas"],
+                                                          catalogs["templates"])
+            found = self._locale_lookup[locale].get(kind, {}).get(key)
+            if found is not None:
+                return found
+        return self._lookup.get(kind, {}).get(key)
+
+    def check_placeholders(self, prompt: Dict[str, str]) -> List[LintIssue]:
+        issues = []
+        for role, content in prompt.items():
+            names = sorted(set(PLACEHOLDER_PATTERN.findall(content)))
+            if names:
+                issues.append(LintIssue("placeholder", "error",
+                                        f"Variáveis não substituídas em '{role}': "
+                                        + ", ".join(f"{{{n}}}" for n in names)))
+        return issues
+
+    def check_duplicates(self, system_prompt: str, persona: Optional[Persona]) -> List[LintIssue]:
+        if persona and persona.system_prompt_template and system_prompt.startswith(persona.system_prompt_template):
+            persona_part = _instructions(persona.system_prompt_template)
+            template_part = _instructions(system_prompt[len(persona.system_prompt_template):])
+        else:
+            # Sem a persona, compara todas as instruções entre si
+            persona_part = template_part = _instructions(system_prompt)
+
+        duplicates = []
+        same_list = persona_part is template_part
+        for i, sentence in enumerate(template_part):
+            candidates = persona_part[:i] if same_list else persona_part
+            if any(_similar(sentence, other) for other in candidates):
+                duplicates.append(sentence)
+
+        if not duplicates:
+            return []
+        sample = duplicates[0][:60]
+        return [LintIssue("duplicate", "warning",
+                          f"{len(duplicates)} instrução(ões) duplicada(s) entre persona e template, ex.: \"{sample}...\"")]
+
+    def check_output_format(self, system_prompt: str, user_prompt: str) -> List[LintIssue]:
+        if OUTPUT_FORMAT_PATTERN.search(system_prompt) or OUTPUT_FORMAT_PATTERN.search(user_prompt):
+            return []
+        return [LintIssue("output-format", "warning", "Nenhuma orientação sobre o formato de saída")]
+
+    def check_tone(self, text: str) -> List[LintIssue]:
+        poles = {match.lastgroup for match in TONE_PATTERN.finditer(text)}
+        issues = []
+        for a, b in TONE_CONFLICTS:
+            if a in poles and b in poles:
+                issues.append(LintIssue("tone-conflict", "warning",
+                                        f"Diretivas de tom conflitantes: {a} x {b}"))
+        return issues
+
+    def check_budget(self, tokens: int, model: Optional[AIModel]) -> Tuple[List[LintIssue], float]:
+        if not model or not model.context_window:
+            return [], 0.0
+        ratio = tokens / model.context_window
+        if tokens + model.max_output > model.context_window:
+            return [LintIssue("budget", "error",
+                              f"Prompt (~{tokens} tokens) + saída máxima ({model.max_output}) "
+                              f"excede a janela de {model.context_window} tokens de {model.name}")], ratio
+        if ratio > BUDGET_WARNING_RATIO:
+            return [LintIssue("budget", "warning",
+                              f"Prompt ocupa {ratio:.0%} da janela de contexto de {model.name}")], ratio
+        return [], ratio
+
+    def lint(self, prompt: Dict[str, str], model: Optional[AIModel] = None,
+             persona: Optional[Persona] = None, source: str = "") -> LintResult:
+        """Avalia um prompt no formato gerado por generate_prompt()"""
+        # O nome dos papéis depende do modelo (ex.: "model" no Gemini)
+        roles = model.prompt_format if model else {}
+        system_prompt = prompt.get(roles.get("system", "system"), "")
+        user_prompt = prompt.get(roles.get("user", "user"), "")
+
+        cache_key = (system_prompt, id(persona))
+        cached = self._system_cache.get(cache_key)
+        if cached is None:
+            cached = (self.check_duplicates(system_prompt, persona) + self.check_tone(system_prompt),
+                      OUTPUT_FORMAT_PATTERN.search(system_prompt) is not None)
+            if len(self._system_cache) >= SYSTEM_CACHE_SIZE:
+                self._system_cache.clear()
+            self._system_cache[cache_key] = cached
+        system_issues, system_has_format = cached
+
+        issues = self.check_placeholders(prompt)
+        issues += system_issues
+        if not system_has_format:
+            issues += self.check_output_format(system_prompt, user_prompt)
+
+        tokens = sum(estimate_tokens(content) for content in prompt.values())
+        budget_issues, ratio = self.check_budget(tokens, model)
+        issues += budget_issues
+
+        return LintResult(issues, tokens, ratio, source)
+
+    def lint_record(self, record: Dict[str, Any], source: str = "") -> LintResult:
+        """Avalia um registro salvo por save_prompt() ({"metadata", "prompt"})"""
+        if "_error" in record:
+            return LintResult([LintIssue("invalid-record", "error", record["_error"])], 0, 0.0, source)
+        metadata = record.get("metadata", {})
+        locale = metadata.get("locale")
+        model = (self.resolve("model", metadata.get("model_id"), locale)
+                 or self.resolve("model", metadata.get("model"), locale))
+        persona = (self.resolve("persona", metadata.get("persona_id"), locale)
+                   or self.resolve("persona", metadata.get("persona"), locale))
+        return self.lint(record.get("prompt", {}), model, persona, source)
+
+    def lint_batch(self, records: Iterable[Dict[str, Any]], workers: int = 1,
+                   chunksize: int = 256) -> Iterator[LintResult]:
+        """Avalia registros em lote, na mesma ordem da entrada"""
+        if workers <= 1:
+            for i, record in enumerate(records):
+                yield self.lint_record(record, record.get("_source", str(i)))
+            return
+
+        with Pool(workers, initializer=_init_worker, initargs=(self,)) as pool:
+            for result in pool.imap(_lint_worker, records, chunksize):
+                yield result
+
+
+# Linter de cada processo do pool, criado uma vez por processo
+_worker_linter: Optional[PromptLinter] = None
+
+def _init_worker(linter: PromptLinter):
+    global _worker_linter
+    _worker_linter = linter
+
+def _lint_worker(record: Dict[str, Any]) -> LintResult:
+    return _worker_linter.lint_record(record, record.get("_source", ""))
+
+
+def iter_records(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """Lê prompts de arquivos JSON salvos, arquivos JSONL, arquivos compactados ou diretórios"""
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(n for n in os.listdir(path) if n.endswith((".json", ".jsonl", ARCHIVE_SUFFIX)))
+            yield from iter_records([os.path.join(path, n) for n in names])
+        elif path.endswith(ARCHIVE_SUFFIX):
+            for index, record in enumerate(iter_archive(path)):
+                record["_source"] = f"{path}#{index}"
+                yield record
+        elif path.endswith(".jsonl"):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    if line.strip():
+                        source = f"{path}:{line_no}"
+                        try:
+                            record = json.loads(line)
+                        except ValueError as e:
+                            record = {"_error": f"JSON inválido: {e}"}
+                        if not isinstance(record, dict):
+                            record = {"_error": "O registro deve ser um objeto JSON"}
+                        record["_source"] = source
+                        yield record
+        else:
+            record = ResourceManager.load_json(path, None)
+            if not isinstance(record, dict):
+                record = {"_error": "Arquivo ilegível ou sem um objeto JSON"}
+            record["_source"] = path
+            yield record
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Avalia a qualidade de prompts gerados")
+    parser.add_argument("paths", nargs="+", help="Arquivos .json, .jsonl, .prar ou diretórios")
+    parser.add_argument("--workers", type=int, default=1, help="Processos para avaliação em paralelo")
+    parser.add_argument("--min-score", type=int, default=0, help="Nota mínima aceita (código de saída 1 abaixo dela)")
+    parser.add_argument("--jsonl", action="store_true", help="Emitir um resultado JSON por linha")
+    parser.add_argument("--quiet", action="store_true", help="Exibir apenas o resumo")
+    args = parser.parse_args(argv)
+
+    linter = PromptLinter.from_resources()
+    total = failed = 0
+    score_sum = 0
+    rule_counts: Dict[str, int] = {}
+
+    for result in linter.lint_batch(iter_records(args.paths), workers=args.workers):
+        total += 1
+        score_sum += result.score
+        for issue in result.issues:
+            rule_counts[issue.rule] = rule_counts.get(issue.rule, 0) + 1
+        if result.score < args.min_score:
+            failed += 1
+
+        if args.jsonl:
+            print(json.dumps(result.to_dict(), ensure_ascii=False))
+        elif not args.quiet and result.issues:
+            print(f"{result.source}: nota {result.score}")
+            for issue in result.issues:
+                print(f"  {issue}")
+
+    summary = f"{total} prompts avaliados, nota média {score_sum / total:.1f}" if total else "Nenhum prompt avaliado"
+    print(summary, file=sys.stderr)
+    for rule, count in sorted(rule_counts.items()):
+        print(f"  {rule}: {count}", file=sys.stderr)
+    if failed:
+        print(f"{failed} prompts abaixo da nota mínima {args.min_score}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
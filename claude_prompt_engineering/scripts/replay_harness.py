@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Replay e Regressão entre Versões de Catálogo
+--------------------------------------------
+
+Renderiza um corpus de requisições de geração passadas contra duas versões
+dos catálogos (base e candidata) e gera um relatório das diferenças:
+quantos prompts mudaram, variação de bytes e tokens por modelo e as seções
+que mais mudaram.
+
+O corpus pode ser o diretório output/ (metadados gravados por
+save_prompt()), um arquivo compactado de prompt_archive.py ou um arquivo
+JSONL com um registro por linha, no formato dos metadados ({"model_id",
+"persona_id", "template_id", "task_description", "parameters",
+"user_example", "locale"}) ou com esses campos dentro de "metadata". Cada
+requisição é renderizada com os catálogos do seu locale. Linhas com JSON
+inválido entram no relatório com o status "invalid" e a posição arquivo:linha.
+
+As requisições são lidas e processadas em lotes de tamanho fixo, de modo
+que o uso de memória não depende do tamanho do corpus.
+
+Versões de catálogo aceitas:
+    <diretório>      diretório com models.json, personas.json e templates.json
+    git:<revisão>    arquivos de resources/ em uma revisão do git
+    sqlite:..., dir:..., http://...   backends de storage.py
+
+Uso:
+    python3 replay_harness.py requisicoes.jsonl --base git:HEAD --candidate ../resources
+    python3 replay_harness.py ../output --base catalogo_antigo/ --candidate ../resources \\
+        --workers 4 --details diferencas.jsonl
+"""
+
+import os
+import sys
+import json
+import heapq
+import argparse
+import subprocess
+from itertools import islice
+from multiprocessing import Pool
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from prompt_generator import (CompiledPrompt, LocaleCatalogs, ResourceManager, RESOURCES_DIR,
+                              SOURCE_LOCALE, estimate_tokens, normalize_locale)
+from storage import MemoryBackend, StorageError, create_backend, CATALOG_NAMESPACES
+from prompt_archive import is_archive, iter_archive
+
+VERSIONS = ("base", "candidate")
+
+# Requisições processadas por lote (limita a memória em uso)
+DEFAULT_BATCH_SIZE = 2000
+
+# Quantidade de requisições com maior variação mantidas no relatório
+DEFAULT_TOP = 10
+
+
+def load_catalog_version(spec: str, resources_dir: str = RESOURCES_DIR) -> LocaleCatalogs:
+    """Carrega os três catálogos de uma versão, sem alterar a origem
+
+    Cada locale é compilado sob demanda, na primeira requisição que o usa.
+    """
+    raw: Dict[str, Dict[str, Any]] = {}
+    if spec.startswith("git:"):
+        revision = spec[len("git:"):]
+        for namespace in CATALOG_NAMESPACES:
+            try:
+                content = subprocess.run(
+                    ["git", "show", f"{revision}:./{namespace}.json"], cwd=resources_dir,
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True).stdout
+            except (OSError, subprocess.CalledProcessError) as e:
+                raise StorageError(f"Não foi possível ler {namespace}.json em {revision}: {e}")
+            raw[namespace] = json.loads(content.decode("utf-8"))
+    elif os.path.isdir(spec):
+        for namespace in CATALOG_NAMESPACES:
+            raw[namespace] = ResourceManager.load_json(os.path.join(spec, f"{namespace}.json"), {}) or {}
+    else:
+        backend = create_backend(spec)
+        for namespace in CATALOG_NAMESPACES:
+            raw[namespace] = backend.load_catalog(namespace)
+
+    # Backend em memória: os carregadores nunca gravam na origem
+    return LocaleCatalogs(backend=MemoryBackend(raw))
+
+
+def iter_requests(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """Lê as requisições sob demanda de diretórios de saída ou arquivos JSONL"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".json") and not name.startswith("."):
+                    record = ResourceManager.load_json(os.path.join(path, name), {}) or {}
+                    request = dict(record.get("metadata", {}))
+                    request["_source"] = name
+                    yield request
+        elif is_archive(path):
+            for index, record in enumerate(iter_archive(path)):
+                request = dict(record["metadata"])
+                request["_source"] = f"{os.path.basename(path)}#{index}"
+                yield request
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    source = f"{os.path.basename(path)}:{line_no}"
+                    try:
+                        record = json.loads(line)
+                        request = dict(record.get("metadata", record))
+                    except (ValueError, TypeError, AttributeError) as e:
+                        # A linha é registrada como erro, sem interromper o replay
+                        yield {"_source": source, "_error": f"JSON inválido: {e}"}
+                        continue
+                    request.setdefault("_source", source)
+                    yield request
+
+
+# Catálogos das duas versões e prompts compilados de cada processo
+_worker_versions: Dict[str, LocaleCatalogs] = {}
+_worker_names: Dict[tuple, Dict[str, Dict[str, str]]] = {}
+_worker_compiled: Dict[tuple, Optional[CompiledPrompt]] = {}
+
+def _init_worker(versions: Dict[str, LocaleCatalogs]):
+    global _worker_versions
+    _worker_versions = versions
+    _worker_names.clear()
+    _worker_compiled.clear()
+
+def _names(version: str, locale: str) -> Dict[str, Dict[str, str]]:
+    # Registros antigos só trazem os nomes dos recursos, no idioma do prompt
+    key = (version, locale)
+    if key not in _worker_names:
+        _worker_names[key] = {kind: {item.name: item_id for item_id, item in catalog.items()}
+                              for kind, catalog in _worker_versions[version].get(locale).items()}
+    return _worker_names[key]
+
+def _ids(version: str, request: Dict[str, Any]) -> Tuple[str, str, str]:
+    """IDs do modelo, da persona e do template; registros antigos são resolvidos pelo nome"""
+    locale = normalize_locale(request.get("locale") or SOURCE_LOCALE)
+    ids = []
+    for kind, id_key, name_key in (("models", "model_id", "model"),
+                                   ("personas", "persona_id", "persona"),
+                                   ("templates", "template_id", "template")):
+        entry_id = request.get(id_key) or _names(version, locale)[kind].get(request.get(name_key, ""), "")
+        ids.append(entry_id)
+    return tuple(ids)
+
+def _compiled(version: str, request: Dict[str, Any]) -> Optional[CompiledPrompt]:
+    locale = normalize_locale(request.get("locale") or SOURCE_LOCALE)
+    ids = _ids(version, request)
+    cache_key = (version, locale) + tuple(ids)
+    if cache_key not in _worker_compiled:
+        catalogs = _worker_versions[version].get(locale)
+        try:
+            _worker_compiled[cache_key] = CompiledPrompt(catalogs["models"][ids[0]],
+                                                         catalogs["personas"][ids[1]],
+                                                         catalogs["templates"][ids[2]])
+        except KeyError:
+            _worker_compiled[cache_key] = None
+    return _worker_compiled[cache_key]
+
+def _size(prompt: Dict[str, str]) -> Tuple[int, int]:
+    text = "".join(prompt.values())
+    return len(text.encode("utf-8")), estimate_tokens(text)
+
+def replay_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Renderiza uma requisição nas duas versões e compara os resultados"""
+    task = request.get("task_description", "")
+    parameters = request.get("parameters", {})
+    example = request.get("user_example", "")
+    result = {"source": request.get("_source", ""), "model": request.get("model_id", "")}
+    if "_error" in request:
+        result.update(status="invalid", error=request["_error"])
+        return result
+
+    try:
+        compiled = {version: _compiled(version, request) for version in VERSIONS}
+        # O relatório agrupa pelo ID do modelo, mesmo em registros que só trazem o nome
+        model_ids = [_ids(version, request)[0] for version in VERSIONS]
+        result["model"] = result["model"] or next((i for i in model_ids if i), request.get("model", ""))
+    except (AttributeError, ValueError):
+        result["status"] = "invalid-locale"
+        return result
+    missing = [version for version in VERSIONS if compiled[version] is None]
+    if missing:
+        result["status"] = "missing-" + "-".join(missing)
+        return result
+
+    prompts = {version: compiled[version].render(task, parameters, example) for version in VERSIONS}
+    for version in VERSIONS:
+        result[f"bytes_{version}"], result[f"tokens_{version}"] = _size(prompts[version])
+
+    if prompts["base"] == prompts["candidate"]:
+        result["status"] = "unchanged"
+        return result
+
+    result["status"] = "changed"
+    base_sections = compiled["base"].render_sections(task, parameters)
+    candidate_sections = compiled["candidate"].render_sections(task, parameters)
+    sections = {}
+    for name in list(base_sections) + [n for n in candidate_sections if n not in base_sections]:
+        before, after = base_sections.get(name, ""), candidate_sections.get(name, "")
+        if before != after:
+            sections[name] = len(after.encode("utf-8")) - len(before.encode("utf-8"))
+    if list(prompts["base"]) != list(prompts["candidate"]):
+        sections["format"] = 0
+    result["sections"] = sections
+    return result
+
+
+class ReplayReport:
+    """Agrega os resultados em memória constante"""
+
+    def __init__(self, top: int = DEFAULT_TOP):
+        self.top = top
+        self.total = 0
+        self.status: Dict[str, int] = {}
+        self.models: Dict[str, Dict[str, int]] = {}
+        self.sections: Dict[str, Dict[str, int]] = {}
+        self._largest: List[Tuple[int, int, Dict[str, Any]]] = []
+
+    def add(self, result: Dict[str, Any]):
+        self.total += 1
+        status = result["status"]
+        self.status[status] = self.status.get(status, 0) + 1
+        if status not in ("changed", "unchanged"):
+            return
+
+        stats = self.models.setdefault(result["model"], {
+            "requests": 0, "changed": 0, "bytes_base": 0, "bytes_candidate": 0,
+            "tokens_base": 0, "tokens_candidate": 0,
+        })
+        stats["requests"] += 1
+        for version in VERSIONS:
+            stats[f"bytes_{version}"] += result[f"bytes_{version}"]
+            stats[f"tokens_{version}"] += result[f"tokens_{version}"]
+        if status != "changed":
+            return
+
+        stats["changed"] += 1
+        for name, delta in result["sections"].items():
+            section = self.sections.setdefault(name, {"changed": 0, "bytes_delta": 0})
+            section["changed"] += 1
+            section["bytes_delta"] += delta
+
+        # Heap mínimo com as maiores variações absolutas de bytes
+        delta = abs(result["bytes_candidate"] - result["bytes_base"])
+        entry = (delta, self.total, result)
+        if len(self._largest) < self.top:
+            heapq.heappush(self._largest, entry)
+        elif delta > self._largest[0][0]:
+            heapq.heapreplace(self._largest, entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        models = {}
+        for model, stats in sorted(self.models.items()):
+            models[model] = dict(stats,
+                                 bytes_delta=stats["bytes_candidate"] - stats["bytes_base"],
+                                 tokens_delta=stats["tokens_candidate"] - stats["tokens_base"])
+        top_sections = sorted(self.sections.items(), key=lambda item: (-item[1]["changed"], item[0]))
+        largest = sorted(self._largest, key=lambda entry: (-entry[0], entry[1]))
+        return {
+            "total": self.total,
+            "changed": self.status.get("changed", 0),
+            "unchanged": self.status.get("unchanged", 0),
+            "status": self.status,
+            "models": models,
+            "top_sections": [dict(section=name, **stats) for name, stats in top_sections],
+            "top_requests": [{"source": r["source"], "model": r["model"],
+                              "bytes_delta": r["bytes_candidate"] - r["bytes_base"],
+                              "sections": sorted(r["sections"])} for _, _, r in largest],
+        }
+
+
+def batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_replay(requests: Iterable[Dict[str, Any]],
+               versions: Dict[str, LocaleCatalogs],
+               workers: int = 1, batch_size: int = DEFAULT_BATCH_SIZE,
+               top: int = DEFAULT_TOP, details=None) -> ReplayReport:
+    """Executa o replay e grava, opcionalmente, cada requisição alterada em `details`"""
+    report = ReplayReport(top)
+
+    def consume(results):
+        for result in results:
+            report.add(result)
+            if details is not None and result["status"] != "unchanged":
+                details.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    if workers <= 1:
+        _init_worker(versions)
+        for batch in batched(requests, batch_size):
+            consume(map(replay_request, batch))
+        return report
+
+    with Pool(workers, initializer=_init_worker, initargs=(versions,)) as pool:
+        chunksize = max(1, batch_size // (workers * 4))
+        for batch in batched(requests, batch_size):
+            consume(pool.map(replay_request, batch, chunksize))
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Compara renderizações entre duas versões dos catálogos")
+    parser.add_argument("corpus", nargs="+", help="Diretórios de saída ou arquivos JSONL de requisições")
+    parser.add_argument("--base", required=True, help="Versão base dos catálogos")
+    parser.add_argument("--candidate", default=RESOURCES_DIR, help="Versão candidata (padrão: resources/)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos para renderização")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Requisições por lote")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="Requisições com maior variação no relatório")
+    parser.add_argument("--details", help="Arquivo JSONL com cada requisição alterada")
+    args = parser.parse_args(argv)
+
+    try:
+        versions = {"base": load_catalog_version(args.base),
+                    "candidate": load_catalog_version(args.candidate)}
+    except (StorageError, ValueError) as e:
+        print(f"Erro ao carregar catálogos: {e}", file=sys.stderr)
+        return 1
+
+    details = open(args.details, 'w', encoding='utf-8') if args.details else None
+    try:
+        report = run_replay(iter_requests(args.corpus), versions, args.workers,
+                            args.batch_size, args.top, details)
+    finally:
+        if details:
+            details.close()
+
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
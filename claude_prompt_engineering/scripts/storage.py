@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Backends de Armazenamento
+-------------------------
+
+Interface comum para guardar os catálogos (models, personas, templates) e
+os prompts gerados fora dos arquivos JSON locais. Os dados são organizados
+em namespaces ("models", "personas", "templates", "output") de pares
+chave/valor JSON.
+
+Backends disponíveis (ver create_backend(); MemoryBackend é só para uso
+programático):
+    json:<diretório>     um arquivo JSON por catálogo, como em resources/
+    dir:<diretório>      um arquivo JSON por entrada
+    sqlite:<arquivo>     banco SQLite local
+    http://host:porta    armazenamento chave/valor via HTTP (LocalKVServer
+                         implementa o protocolo localmente)
+
+CachedBackend acrescenta cache de leitura com TTL e leitura em lote a
+qualquer backend, para que um nó de geração não consulte o armazenamento
+a cada renderização.
+
+Uso:
+    python3 storage.py copy json:../resources sqlite:catalogo.db
+    python3 storage.py serve --port 8765
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib import error, parse, request
+
+from prompt_generator import ResourceManager, RESOURCES_DIR, OUTPUT_DIR
+
+# Namespaces guardados como um único arquivo pelo JsonFileBackend
+CATALOG_NAMESPACES = ("models", "personas", "templates")
+
+# Máximo de chaves por consulta em lote
+BATCH_SIZE = 500
+
+
+class StorageError(Exception):
+    """Falha de comunicação ou de formato no backend de armazenamento"""
+
+
+class StorageBackend:
+    """Interface dos backends de armazenamento
+
+    Subclasses implementam list_keys(), get(), put() e delete(); as demais
+    operações têm implementações genéricas que podem ser especializadas.
+    """
+
+    def list_keys(self, namespace: str) -> List[str]:
+        raise NotImplementedError
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def put(self, namespace: str, key: str, value: Any) -> str:
+        """Grava um valor e retorna sua localização"""
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Lê várias chaves; chaves inexistentes são omitidas"""
+        result = {}
+        for key in keys:
+            value = self.get(namespace, key)
+            if value is not None:
+                result[key] = value
+        return result
+
+    def load_catalog(self, namespace: str) -> Dict[str, Any]:
+        """Lê um catálogo inteiro, preservando a ordem das chaves"""
+        keys = self.list_keys(namespace)
+        values = self.get_many(namespace, keys)
+        return {key: values[key] for key in keys if key in values}
+
+    def save_catalog(self, namespace: str, data: Dict[str, Any]):
+        """Substitui um catálogo inteiro"""
+        for key in set(self.list_keys(namespace)) - set(data):
+            self.delete(namespace, key)
+        for key, value in data.items():
+            self.put(namespace, key, value)
+
+
+class MemoryBackend(StorageBackend):
+    """Backend em memória, útil para catálogos temporários"""
+
+    def __init__(self, data: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.data: Dict[str, Dict[str, Any]] = {ns: dict(entries) for ns, entries in (data or {}).items()}
+
+    def list_keys(self, namespace: str) -> List[str]:
+        return list(self.data.get(namespace, {}))
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self.data.get(namespace, {}).get(key)
+
+    def put(self, namespace: str, key: str, value: Any) -> str:
+        self.data.setdefault(namespace, {})[key] = value
+        return f"memory:{namespace}/{key}"
+
+    def delete(self, namespace: str, key: str):
+        self.data.get(namespace, {}).pop(key, None)
+
+
+class JsonFileBackend(StorageBackend):
+    """Layout original: um arquivo JSON por catálogo e um arquivo por prompt"""
+
+    def __init__(self, resources_dir: str = RESOURCES_DIR, output_dir: str = OUTPUT_DIR):
+        self.resources_dir = resources_dir
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+
+    def _catalog_file(self, namespace: str) -> str:
+        return os.path.join(self.resources_dir, f"{namespace}.json")
+
+    def _entry_dir(self, namespace: str) -> str:
+        return self.output_dir if namespace == "output" else os.path.join(self.resources_dir, namespace)
+
+    def _entry_file(self, namespace: str, key: str) -> str:
+        return os.path.join(self._entry_dir(namespace), f"{parse.quote(key, safe='')}.json")
+
+    def list_keys(self, namespace: str) -> List[str]:
+        if namespace in CATALOG_NAMESPACES:
+            return list(self.load_catalog(namespace))
+        directory = self._entry_dir(namespace)
+        if not os.path.isdir(directory):
+            return []
+        return [parse.unquote(name[:-5]) for name in sorted(os.listdir(directory))
+                if name.endswith(".json") and not name.startswith(".")]
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        if namespace in CATALOG_NAMESPACES:
+            return self.load_catalog(namespace).get(key)
+        return ResourceManager.load_json(self._entry_file(namespace, key), None)
+
+    def put(self, namespace: str, key: str, value: Any) -> str:
+        if namespace in CATALOG_NAMESPACES:
+            with self._lock:
+                data = self.load_catalog(namespace)
+                data[key] = value
+                self.save_catalog(namespace, data)
+            return self._catalog_file(namespace)
+        path = self._entry_file(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not ResourceManager.save_json(path, value):
+            raise StorageError(f"Erro ao salvar {path}")
+        return path
+
+    def delete(self, namespace: str, key: str):
+        if namespace in CATALOG_NAMESPACES:
+            with self._lock:
+                data = self.load_catalog(namespace)
+                if data.pop(key, None) is not None:
+                    self.save_catalog(namespace, data)
+            return
+        path = self._entry_file(namespace, key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        if namespace in CATALOG_NAMESPACES:
+            data = self.load_catalog(namespace)
+            return {key: data[key] for key in keys if key in data}
+        return super().get_many(namespace, keys)
+
+    def load_catalog(self, namespace: str) -> Dict[str, Any]:
+        if namespace in CATALOG_NAMESPACES:
+            return ResourceManager.load_json(self._catalog_file(namespace), {}) or {}
+        return super().load_catalog(namespace)
+
+    def save_catalog(self, namespace: str, data: Dict[str, Any]):
+        if namespace in CATALOG_NAMESPACES:
+            os.makedirs(self.resources_dir, exist_ok=True)
+            if not ResourceManager.save_json(self._catalog_file(namespace), data):
+                raise StorageError(f"Erro ao salvar o catálogo {namespace}")
+            return
+        super().save_catalog(namespace, data)
+
+
+class DirectoryBackend(StorageBackend):
+    """Um arquivo JSON por entrada: <raiz>/<namespace>/<chave>.json"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.root, namespace, f"{parse.quote(key, safe='')}.json")
+
+    def list_keys(self, namespace: str) -> List[str]:
+        directory = os.path.join(self.root, namespace)
+        if not os.path.isdir(directory):
+            return []
+        return [parse.unquote(name[:-5]) for name in sorted(os.listdir(directory))
+                if name.endswith(".json") and not name.startswith(".")]
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return ResourceManager.load_json(self._path(namespace, key), None)
+
+    def put(self, namespace: str, key: str, value: Any) -> str:
+        path = self._path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Grava em arquivo temporário para que leitores não vejam escrita parcial
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if not ResourceManager.save_json(tmp_path, value):
+            raise StorageError(f"Erro ao salvar {path}")
+        os.replace(tmp_path, path)
+        return path
+
+    def delete(self, namespace: str, key: str):
+        path = self._path(namespace, key)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class SQLiteBackend(StorageBackend):
+    """Armazena todos os namespaces em uma tabela SQLite"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+
+    def close(self):
+        self._conn.close()
+
+    def list_keys(self, namespace: str) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key FROM entries WHERE namespace = ? ORDER BY rowid", (namespace,)).fetchall()
+        return [row[0] for row in rows]
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?", (namespace, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        result = {}
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = keys[start:start + BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM entries WHERE namespace = ? AND key IN ({placeholders})",
+                    [namespace] + batch).fetchall()
+            for key, value in rows:
+                result[key] = json.loads(value)
+        return result
+
+    def put(self, namespace: str, key: str, value: Any) -> str:
+        data = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._conn:
+            # UPDATE antes do INSERT preserva a ordem original (rowid) das chaves
+            cursor = self._conn.execute(
+                "UPDATE entries SET value = ? WHERE namespace = ? AND key = ?", (data, namespace, key))
+            if cursor.rowcount == 0:
+                self._conn.execute(
+                    "INSERT INTO entries (namespace, key, value) VALUES (?, ?, ?)", (namespace, key, data))
+        return f"sqlite:{self.path}#{namespace}/{key}"
+
+    def delete(self, namespace: str, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def save_catalog(self, namespace: str, data: Dict[str, Any]):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            self._conn.executemany(
+                "INSERT INTO entries (namespace, key, value) VALUES (?, ?, ?)",
+                [(namespace, key, json.dumps(value, ensure_ascii=False)) for key, value in data.items()])
+
+
+class HttpKVBackend(StorageBackend):
+    """Cliente de um armazenamento chave/valor via HTTP
+
+    Protocolo:
+        GET    /<namespace>/            lista de chaves (JSON)
+        GET    /<namespace>/<chave>     valor (404 se não existir)
+        PUT    /<namespace>/<chave>     grava o valor enviado no corpo
+        DELETE /<namespace>/<chave>     remove a chave
+        POST   /<namespace>/_mget       {"keys": [...]} -> {chave: valor}
+    """
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _url(self, namespace: str, key: str = "") -> str:
+        return f"{self.base_url}/{parse.quote(namespace, safe='')}/{parse.quote(key, safe='')}"
+
+    def _request(self, method: str, url: str, body: Any = None) -> Tuple[int, Any]:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        req = request.Request(url, data=data, method=method,
+                              headers={"Content-Type": "application/json"})
+        try:
+            with request.urlopen(req, timeout=self.timeout) as response:
+                payload = response.read()
+                return response.status, json.loads(payload.decode("utf-8")) if payload else None
+        except error.HTTPError as e:
+            if e.code == 404:
+                return 404, None
+            raise StorageError(f"{method} {url}: HTTP {e.code}")
+        except (error.URLError, OSError, ValueError) as e:
+            raise StorageError(f"{method} {url}: {e}")
+
+    def list_keys(self, namespace: str) -> List[str]:
+        _, keys = self._request("GET", self._url(namespace))
+        return keys or []
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        status, value = self._request("GET", self._url(namespace, key))
+        return value if status != 404 else None
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        keys = list(keys)
+        result = {}
+        for start in range(0, len(keys), BATCH_SIZE):
+            _, values = self._request("POST", self._url(namespace, "_mget"),
+                                      {"keys": keys[start:start + BATCH_SIZE]})
+            result.update(values or {})
+        return result
+
+    def put(self, namespace: str, key: str, value: Any) -> str:
+        url = self._url(namespace, key)
+        self._request("PUT", url, value)
+        return url
+
+    def delete(self, namespace: str, key: str):
+        self._request("DELETE", self._url(namespace, key))
+
+
+class CachedBackend(StorageBackend):
+    """Cache de leitura com TTL sobre outro backend
+
+    Leituras de catálogo e em lote buscam apenas as chaves ausentes ou
+    expiradas, em uma única chamada get_many() ao backend. Escritas passam
+    direto para o backend e atualizam o cache. Os valores retornados são
+    compartilhados com o cache e não devem ser modificados.
+    """
+
+    def __init__(self, backend: StorageBackend, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.backend = backend
+        self.ttl = ttl
+        self.clock = clock
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._listings: Dict[str, Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, namespace: Optional[str] = None):
+        """Descarta o cache de um namespace ou de todos"""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                self._listings.clear()
+                return
+            self._listings.pop(namespace, None)
+            for cache_key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[cache_key]
+
+    def list_keys(self, namespace: str) -> List[str]:
+        now = self.clock()
+        with self._lock:
+            cached = self._listings.get(namespace)
+        if cached and cached[0] > now:
+            self.hits += 1
+            return list(cached[1])
+        self.misses += 1
+        keys = self.backend.list_keys(namespace)
+        with self._lock:
+            self._listings[namespace] = (now + self.ttl, keys)
+        return list(keys)
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self.get_many(namespace, [key]).get(key)
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        now = self.clock()
+        result = {}
+        missing = []
+        with self._lock:
+            for key in keys:
+                cached = self._entries.get((namespace, key))
+                if cached and cached[0] > now:
+                    if cached[1] is not None:
+                        result[key] = cached[1]
+                else:
+                    missing.append(key)
+        self.hits += len(result)
+        if missing:
+            self.misses += len(missing)
+            fetched = self.backend.get_many(namespace, missing)
+            expires = now + self.ttl
+            with self._lock:
+                # Chaves inexistentes também ficam em cache até expirar
+                for key in missing:
+                    value = fetched.get(key)
+                    self._entries[(namespace, key)] = (expires, value)
+                    if value is not None:
+                        result[key] = value
+        return result
+
+    def put(self, namespace: str, key: str, value: Any) -> str:
+        location = self.backend.put(namespace, key, value)
+        with self._lock:
+            self._entries[(namespace, key)] = (self.clock() + self.ttl, value)
+            self._listings.pop(namespace, None)
+        return location
+
+    def delete(self, namespace: str, key: str):
+        self.backend.delete(namespace, key)
+        with self._lock:
+            self._entries.pop((namespace, key), None)
+            self._listings.pop(namespace, None)
+
+    def save_catalog(self, namespace: str, data: Dict[str, Any]):
+        self.backend.save_catalog(namespace, data)
+        self.invalidate(namespace)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class LocalKVServer:
+    """Servidor chave/valor em memória que implementa o protocolo do HttpKVBackend
+
+    Serve como substituto local do armazenamento compartilhado em testes e
+    em desenvolvimento.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.data: Dict[str, Dict[str, Any]] = {}
+        self.requests = 0
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _split(self) -> Tuple[str, str]:
+                parts = self.path.lstrip("/").split("/", 1)
+                namespace = parse.unquote(parts[0])
+                key = parse.unquote(parts[1]) if len(parts) > 1 else ""
+                return namespace, key
+
+            def _body(self) -> Any:
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length).decode("utf-8")) if length else None
+
+            def _reply(self, status: int, payload: Any = None):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                namespace, key = self._split()
+                with lock:
+                    server.requests += 1
+                    entries = server.data.get(namespace, {})
+                    if not key:
+                        return self._reply(200, list(entries))
+                    if key not in entries:
+                        return self._reply(404)
+                    return self._reply(200, entries[key])
+
+            def do_PUT(self):
+                namespace, key = self._split()
+                value = self._body()
+                with lock:
+                    server.requests += 1
+                    server.data.setdefault(namespace, {})[key] = value
+                self._reply(204)
+
+            def do_DELETE(self):
+                namespace, key = self._split()
+                with lock:
+                    server.requests += 1
+                    server.data.get(namespace, {}).pop(key, None)
+                self._reply(204)
+
+            def do_POST(self):
+                namespace, key = self._split()
+                if key != "_mget":
+                    return self._reply(404)
+                keys = (self._body() or {}).get("keys", [])
+                with lock:
+                    server.requests += 1
+                    entries = server.data.get(namespace, {})
+                    payload = {k: entries[k] for k in keys if k in entries}
+                self._reply(200, payload)
+
+        self._httpd = _ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalKVServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Atende requisições na thread atual até ser interrompido"""
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "LocalKVServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def create_backend(spec: str) -> StorageBackend:
+    """Cria um backend a partir de uma especificação como 'sqlite:catalogo.db'"""
+    if spec.startswith(("http://", "https://")):
+        return HttpKVBackend(spec)
+    scheme, sep, location = spec.partition(":")
+    if not sep:
+        raise ValueError(f"Especificação de backend inválida: '{spec}'")
+    if scheme == "json":
+        return JsonFileBackend(location or RESOURCES_DIR,
+                               os.path.join(location, "output") if location else OUTPUT_DIR)
+    if scheme == "dir":
+        return DirectoryBackend(location)
+    if scheme == "sqlite":
+        return SQLiteBackend(location)
+    raise ValueError(f"Backend desconhecido: '{scheme}'")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Função principal do script"""
+    parser = argparse.ArgumentParser(description="Gerencia backends de armazenamento de recursos")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.required = True
+
+    copy = subparsers.add_parser("copy", help="Copia os catálogos entre backends")
+    copy.add_argument("source", help="Backend de origem (ex.: json:../resources)")
+    copy.add_argument("target", help="Backend de destino (ex.: sqlite:catalogo.db)")
+    copy.add_argument("--outputs", action="store_true", help="Copiar também os prompts salvos")
+
+    serve = subparsers.add_parser("serve", help="Inicia um servidor chave/valor local")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        server = LocalKVServer(args.host, args.port)
+        print(f"Servidor chave/valor em {server.url} (Ctrl+C para sair)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    try:
+        source = create_backend(args.source)
+        target = create_backend(args.target)
+        namespaces = CATALOG_NAMESPACES + (("output",) if args.outputs else ())
+        for namespace in namespaces:
+            data = source.load_catalog(namespace)
+            target.save_catalog(namespace, data)
+            print(f"{namespace}: {len(data)} entradas copiadas")
+    except (StorageError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
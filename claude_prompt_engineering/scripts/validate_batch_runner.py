@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação da Execução em Lote Distribuída
+---------------------------------------------------
+
+Verifica a divisão do arquivo de jobs em shards, o processamento por vários
+workers pelo diretório compartilhado e pelo coordenador por socket, e a
+retomada de um lote interrompido sem refazer os shards já concluídos.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import PromptGenerator
+    from batch_runner import (BatchError, Coordinator, RemoteQueue, WorkDirectory,
+                              plan_shards, read_shard, run_batch, run_worker)
+except ImportError:
+    print("Erro ao importar o módulo de execução em lote. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+PERSONAS = ["excel-expert", "data-analyst", "code-developer", "legal-analyst"]
+TEMPLATES = ["qa-template", "data-analysis"]
+
+def make_jobs(count):
+    jobs = []
+    for i in range(count):
+        jobs.append({
+            "model_id": "claude-opus-4",
+            "persona_id": PERSONAS[i % len(PERSONAS)],
+            "template_id": TEMPLATES[i % len(TEMPLATES)],
+            "task_description": f"Tarefa {i}",
+            "parameters": {"topic": f"tema {i}"},
+            "locale": "en" if i % 5 == 0 else "pt-BR",
+        })
+    return jobs
+
+class TestBatchRunner(unittest.TestCase):
+    """Testes para a execução em lote com shards e checkpoints"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.jobs = make_jobs(40)
+        self.jobs[13]["persona_id"] = "inexistente"
+        self.job_path = os.path.join(self.tmp_dir, "jobs.jsonl")
+        with open(self.job_path, 'w', encoding='utf-8') as f:
+            for i, job in enumerate(self.jobs):
+                f.write(json.dumps(job, ensure_ascii=False) + "\n")
+                if i == 20:
+                    f.write("\n")
+        self.workdir = os.path.join(self.tmp_dir, "lote")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def expected(self):
+        return [job["task_description"] for i, job in enumerate(self.jobs) if i != 13]
+
+    def outputs(self, work):
+        return [record["metadata"]["task_description"] for record in work.iter_outputs()]
+
+    def test_plan_shards(self):
+        """Os shards cobrem todas as linhas, sem sobreposição"""
+        shards = plan_shards(self.job_path, 7)
+        self.assertEqual([shard["count"] for shard in shards], [7, 7, 7, 7, 7, 5])
+        lines = [line_no for shard in shards for line_no, _ in read_shard(self.job_path, shard)]
+        self.assertEqual(lines, list(range(1, 22)) + list(range(23, 42)))
+        jobs = [job for shard in shards for _, job in read_shard(self.job_path, shard)]
+        self.assertEqual(jobs, self.jobs)
+
+    def test_directory_workers(self):
+        """Vários processos pelo diretório compartilhado geram cada prompt uma vez, em ordem"""
+        status = run_batch(self.job_path, self.workdir, workers=3, shard_size=7)
+        self.assertEqual((status["done"], status["pending"], status["running"]), (6, 0, 0))
+        self.assertEqual((status["records"], status["errors"]), (39, 1))
+
+        work = WorkDirectory(self.workdir)
+        self.assertEqual(self.outputs(work), self.expected())
+        errors = [e for c in work.checkpoints().values() for e in c["errors"]]
+        self.assertEqual(errors[0]["line"], 14)
+
+        # O worker usa o mesmo caminho de renderização que o gerador interativo
+        generator = PromptGenerator(locale="en")
+        generator.selected_model = generator.models["claude-opus-4"]
+        generator.selected_persona = generator.personas["excel-expert"]
+        generator.selected_template = generator.templates["qa-template"]
+        generator.task_description = "Tarefa 0"
+        generator.parameters = {"topic": "tema 0"}
+        self.assertEqual(next(work.iter_outputs())["prompt"], generator.generate_prompt())
+
+    def test_socket_coordinator(self):
+        """O coordenador por socket distribui os shards a workers locais e externos"""
+        status = run_batch(self.job_path, self.workdir, workers=2, shard_size=7,
+                           transport="socket", segment_format="prar")
+        self.assertEqual((status["done"], status["records"]), (6, 39))
+        self.assertEqual(self.outputs(WorkDirectory(self.workdir)), self.expected())
+
+        other = os.path.join(self.tmp_dir, "externo")
+        work = WorkDirectory(other)
+        work.prepare(self.job_path, 10)
+        with Coordinator(work) as coordinator:
+            queue = RemoteQueue(coordinator.url)
+            self.assertEqual(run_worker(queue, "externo"), 4)
+            self.assertEqual(queue.status()["done"], 4)
+        self.assertEqual(self.outputs(work), self.expected())
+
+    def test_expired_lease_is_requeued(self):
+        """O shard de um worker externo que caiu volta para a fila após o prazo"""
+        work = WorkDirectory(self.workdir)
+        work.prepare(self.job_path, 10)
+        with Coordinator(work, lease_timeout=0.2) as coordinator:
+            abandoned = RemoteQueue(coordinator.url).lease("caiu")
+            queue = RemoteQueue(coordinator.url)
+            self.assertEqual(run_worker(queue, "vivo"), 3)
+            self.assertEqual(queue.status()["running"], 1)
+            time.sleep(0.3)
+            self.assertEqual(coordinator.expire_leases(), [abandoned["id"]])
+            self.assertEqual(run_worker(queue, "vivo"), 1)
+            self.assertEqual(queue.status()["done"], 4)
+        self.assertEqual(self.outputs(work), self.expected())
+
+    def test_worker_in_other_directory(self):
+        """Workers externos com outro diretório corrente gravam no diretório do lote"""
+        cwd = os.getcwd()
+        os.chdir(self.tmp_dir)
+        try:
+            work = WorkDirectory("lote")
+            work.prepare("jobs.jsonl", 20)
+        finally:
+            os.chdir(cwd)
+        elsewhere = os.path.join(self.tmp_dir, "outro")
+        os.makedirs(elsewhere)
+        with Coordinator(work) as coordinator:
+            subprocess.run([sys.executable, os.path.join(script_dir, "batch_runner.py"), "worker",
+                            "--coordinator", coordinator.url], cwd=elsewhere, check=True,
+                           stderr=subprocess.DEVNULL)
+        self.assertEqual(os.listdir(elsewhere), [])
+        self.assertEqual(self.outputs(WorkDirectory(self.workdir)), self.expected())
+
+    def test_resume_after_crash(self):
+        """Um lote interrompido retoma apenas os shards não concluídos"""
+        work = WorkDirectory(self.workdir)
+        work.prepare(self.job_path, 7)
+        self.assertEqual(run_worker(work, "primeiro", max_shards=2), 2)
+        # Worker que caiu no meio de um shard
+        crashed = work.lease("caiu")
+        with open(work.segment_path(crashed) + ".caiu.tmp", 'w') as f:
+            f.write("{incompleto")
+        before = {shard_id: c["worker"] for shard_id, c in work.checkpoints().items()}
+        mtimes = {name: os.stat(os.path.join(self.workdir, "done", name)).st_mtime_ns
+                  for name in os.listdir(os.path.join(self.workdir, "done"))}
+
+        status = run_batch(self.job_path, self.workdir, workers=2, shard_size=7)
+        self.assertEqual((status["done"], status["records"]), (6, 39))
+        checkpoints = WorkDirectory(self.workdir).checkpoints()
+        for shard_id, worker in before.items():
+            self.assertEqual(checkpoints[shard_id]["worker"], worker)
+        for name, mtime in mtimes.items():
+            self.assertEqual(os.stat(os.path.join(self.workdir, "done", name)).st_mtime_ns, mtime)
+        self.assertNotEqual(checkpoints[crashed["id"]]["worker"], "caiu")
+        self.assertEqual(self.outputs(WorkDirectory(self.workdir)), self.expected())
+
+    def test_malformed_jobs_are_recorded(self):
+        """Pedidos com forma inválida viram erros por linha, sem derrubar o worker"""
+        bad = [[1, 2], "texto", dict(self.jobs[0], parameters={"language": 3}),
+               dict(self.jobs[0], parameters=["a"]), dict(self.jobs[0], persona_id=["x"]),
+               dict(self.jobs[0], locale=5), dict(self.jobs[0], locale="../pwned"),
+               dict(self.jobs[0], locale="xx-YY")]
+        with open(self.job_path, 'w', encoding='utf-8') as f:
+            for job in bad + self.jobs[:4]:
+                f.write(json.dumps(job) + "\n")
+        status = run_batch(self.job_path, self.workdir, workers=1, shard_size=4)
+        self.assertEqual((status["done"], status["pending"]), (3, 0))
+        self.assertEqual((status["records"], status["errors"]), (4, 8))
+        errors = [e for c in WorkDirectory(self.workdir).checkpoints().values() for e in c["errors"]]
+        self.assertEqual(sorted(e["line"] for e in errors), [1, 2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)), ["jobs.jsonl", "lote"])
+
+    def test_other_job_requires_restart(self):
+        """O diretório de trabalho não é reaproveitado para outro arquivo de jobs"""
+        run_batch(self.job_path, self.workdir, workers=1, shard_size=20)
+        with open(self.job_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(make_jobs(1)[0]) + "\n")
+        with self.assertRaises(BatchError):
+            run_batch(self.job_path, self.workdir, workers=1, shard_size=20)
+        status = run_batch(self.job_path, self.workdir, workers=1, shard_size=20, restart=True)
+        self.assertEqual(status["records"], 40)
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação da execução em lote distribuída...\n")
+    run_tests()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação do Construtor de Conversas
+----------------------------------------------
+
+Verifica a contagem incremental de tokens, as políticas de truncamento e
+a persistência do estado da conversa.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import AIModel, CompiledPrompt, PromptGenerator, ResourceManager, estimate_tokens
+    from conversation_builder import Conversation, ContextWindowExceeded, MESSAGE_OVERHEAD_TOKENS, main
+except ImportError:
+    print("Erro ao importar o construtor de conversas. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+class TestConversationBuilder(unittest.TestCase):
+    """Testes para o construtor de conversas multi-turno"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.model = AIModel(
+            name="Modelo Pequeno",
+            description="Modelo de teste",
+            provider="Teste",
+            context_window=300,
+            max_output=100,
+            features={},
+            prompt_format={"system": "system", "user": "user", "assistant": "model"},
+            training_cutoff="2025-01"
+        )
+        # 40 caracteres ~ 10 tokens + 4 de marcação = 14 tokens por turno
+        self.turn_text = "x" * 40
+
+    def conversation(self, **options):
+        conversation = Conversation(self.model, "s" * 200, **options)
+        conversation.append("user", "Tarefa inicial")
+        return conversation
+
+    def test_prefix_rendered_once(self):
+        """A conversa começa com o mesmo prompt do sistema de generate_prompt()"""
+        models = ResourceManager.load_models()
+        personas = ResourceManager.load_personas()
+        templates = ResourceManager.load_templates()
+        compiled = CompiledPrompt(models["gemini-pro"], personas["excel-expert"], templates["qa-template"])
+        conversation = Conversation.start(compiled, "Somar vendas", {"tone": "neutro"})
+
+        generator = PromptGenerator()
+        generator.selected_model = models["gemini-pro"]
+        generator.selected_persona = personas["excel-expert"]
+        generator.selected_template = templates["qa-template"]
+        generator.task_description = "Somar vendas"
+        generator.parameters = {"tone": "neutro"}
+        prompt = generator.generate_prompt()
+
+        conversation.append("assistant", "Resposta")
+        messages = conversation.messages()
+        self.assertEqual(messages[0]["content"], prompt["system"])
+        self.assertIs(messages[0]["content"], conversation.messages()[0]["content"])
+        self.assertEqual([m["role"] for m in messages], ["system", "user", "model"])
+
+    def test_incremental_tokens(self):
+        """O total de tokens acompanha cada turno acrescentado"""
+        conversation = self.conversation()
+        before = conversation.total_tokens
+        turn = conversation.append("assistant", self.turn_text)
+        self.assertEqual(turn.tokens, 14)
+        self.assertEqual(conversation.total_tokens, before + 14)
+        self.assertEqual(conversation.remaining_tokens, 200 - conversation.total_tokens)
+
+    def test_drop_oldest(self):
+        """Turnos antigos são descartados, preservando a tarefa fixada"""
+        conversation = self.conversation()
+        for i in range(10):
+            conversation.append("user" if i % 2 else "assistant", f"{i}" + self.turn_text)
+        self.assertLessEqual(conversation.total_tokens, conversation.budget)
+        self.assertGreater(conversation.dropped_count, 0)
+        messages = conversation.messages()
+        self.assertEqual(messages[1]["content"], "Tarefa inicial")
+        self.assertTrue(messages[-1]["content"].startswith("9"))
+
+    def test_summary_slot(self):
+        """Turnos descartados vão para o espaço de resumo"""
+        conversation = self.conversation(policy="summary", summary_tokens=20)
+        for i in range(10):
+            conversation.append("assistant", f"{i}" + self.turn_text)
+        self.assertLessEqual(conversation.total_tokens, conversation.budget)
+        self.assertIsNotNone(conversation.summary)
+        self.assertEqual(len(conversation.summarized), conversation.dropped_count)
+        conversation.set_summary("Resumo do modelo")
+        self.assertEqual(conversation.messages()[0]["content"], "s" * 200 + "\n\nResumo do modelo")
+
+    def test_roles_alternate_after_truncation(self):
+        """Turnos saem aos pares e o resumo não quebra a alternância de papéis"""
+        for policy in ("drop-oldest", "summary"):
+            conversation = self.conversation(policy=policy, summary_tokens=20)
+            for i in range(15):
+                conversation.append("user" if i % 2 else "assistant", f"{i}" + self.turn_text)
+                roles = [m["role"] for m in conversation.messages()]
+                self.assertEqual(roles[:2], ["system", "user"])
+                self.assertTrue(all(a != b for a, b in zip(roles[1:], roles[2:])), (policy, i, roles))
+                self.assertLessEqual(conversation.total_tokens, conversation.budget)
+            self.assertEqual(conversation.dropped_count % 2, 0)
+            self.assertGreater(conversation.dropped_count, 0)
+
+    def test_long_summary_fits_slot(self):
+        """Resumos maiores que o espaço reservado são cortados e não estouram a janela"""
+        conversation = self.conversation(policy="summary", summary_tokens=20,
+                                         summarizer=lambda turns: "resumo " * 200)
+        for i in range(10):
+            conversation.append("assistant", f"{i}" + self.turn_text)
+            self.assertLessEqual(conversation.total_tokens, conversation.budget)
+        self.assertEqual(conversation.summary.tokens, 20)
+        self.assertLessEqual(estimate_tokens(conversation.summary.content) + MESSAGE_OVERHEAD_TOKENS, 20)
+
+        before = conversation.total_tokens
+        conversation.set_summary("r" * 1000)
+        self.assertEqual(conversation.total_tokens, before)
+        self.assertTrue(conversation.summary.content.endswith("[...]"))
+
+    def test_error_policy(self):
+        """A política 'error' recusa turnos que excedem a janela"""
+        conversation = self.conversation(policy="error")
+        with self.assertRaises(ContextWindowExceeded):
+            for _ in range(10):
+                conversation.append("assistant", self.turn_text)
+
+    def test_cli_template_variables(self):
+        """O comando start preenche as variáveis do template com --param e a tarefa"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "conversa.json")
+            self.assertEqual(main(["start", "--state", path, "--model", "claude-opus-4",
+                                   "--persona", "code-developer", "--template", "code-generation",
+                                   "--task", "Criar um parser CSV", "--param", "language=Python"]), 0)
+            system = Conversation.load(path).messages()[0]["content"]
+        self.assertIn("Python", system)
+        self.assertIn("Criar um parser CSV", system)
+        self.assertNotIn("{language}", system)
+        self.assertNotIn("{task_description}", system)
+
+    def test_cli_locale(self):
+        """O comando start usa os catálogos do locale informado"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "conversa.json")
+            self.assertEqual(main(["start", "--state", path, "--model", "claude-opus-4",
+                                   "--persona", "legal-analyst", "--template", "qa-template",
+                                   "--task", "Review the termination clauses", "--locale", "en"]), 0)
+            system = Conversation.load(path).messages()[0]["content"]
+        self.assertTrue(system.startswith("As a specialized Legal Analyst"))
+
+    def test_persisted_state(self):
+        """O estado salvo é retomado sem alterar prefixo, turnos ou totais"""
+        conversation = self.conversation(policy="summary", summary_tokens=20)
+        for i in range(8):
+            conversation.append("assistant", f"{i}" + self.turn_text)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "conversa.json")
+            self.assertTrue(conversation.save(path))
+            restored = Conversation.load(path)
+        self.assertEqual(restored.messages(), conversation.messages())
+        self.assertEqual(restored.total_tokens, conversation.total_tokens)
+        restored.append("user", "Novo turno")
+        self.assertLessEqual(restored.total_tokens, restored.budget)
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação do construtor de conversas...\n")
+    run_tests()
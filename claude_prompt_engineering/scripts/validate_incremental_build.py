@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação da Regeneração Incremental
+----------------------------------------------
+
+Verifica que apenas os prompts que dependem de entradas alteradas dos
+arquivos de recursos são regenerados.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import PromptGenerator, ResourceManager
+    import incremental_build
+    from incremental_build import IncrementalBuilder, diff_entries, entry_hashes
+except ImportError:
+    print("Erro ao importar o módulo de regeneração incremental. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+class TestIncrementalBuild(unittest.TestCase):
+    """Testes para a regeneração incremental de prompts"""
+
+    def setUp(self):
+        """Copia os recursos e gera prompts em um diretório temporário"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.tmp_dir, "output")
+        os.makedirs(self.output_dir)
+        self.resource_files = {}
+        for kind in ("models", "personas", "templates"):
+            path = os.path.join(self.tmp_dir, f"{kind}.json")
+            shutil.copy(os.path.join(parent_dir, "resources", f"{kind}.json"), path)
+            self.resource_files[kind] = path
+
+        generator = PromptGenerator()
+        self.outputs = {}
+        for persona_id in ("excel-expert", "legal-analyst"):
+            generator.selected_model = generator.models["claude-opus-4"]
+            generator.selected_persona = generator.personas[persona_id]
+            generator.selected_template = generator.templates["qa-template"]
+            generator.task_description = f"Tarefa para {persona_id}"
+            generator.parameters = {"tone": "neutro"}
+            path = generator.save_prompt(generator.generate_prompt(), self.output_dir)
+            self.outputs[persona_id] = os.path.basename(path)
+
+        self.builder = IncrementalBuilder(self.output_dir, self.resource_files)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def edit_resource(self, kind, edit):
+        data = ResourceManager.load_json(self.resource_files[kind])
+        edit(data)
+        ResourceManager.save_json(self.resource_files[kind], data)
+
+    def read_output(self, persona_id):
+        return ResourceManager.load_json(os.path.join(self.output_dir, self.outputs[persona_id]))
+
+    def test_entry_diff(self):
+        """O diff por entrada ignora entradas inalteradas"""
+        old = entry_hashes({"a": {"x": 1}, "b": {"x": 2}, "c": {}})
+        new = entry_hashes({"a": {"x": 1}, "b": {"x": 3}, "d": {}})
+        self.assertEqual(diff_entries(old, new), {"b", "c", "d"})
+
+    def test_saved_metadata_has_dependencies(self):
+        """save_prompt() registra os IDs e as entradas da geração"""
+        metadata = self.read_output("excel-expert")["metadata"]
+        self.assertEqual(metadata["persona_id"], "excel-expert")
+        self.assertEqual(metadata["template_id"], "qa-template")
+        self.assertEqual(metadata["model_id"], "claude-opus-4")
+        self.assertEqual(metadata["task_description"], "Tarefa para excel-expert")
+
+    def test_only_affected_outputs_regenerated(self):
+        """Alterar uma persona regenera apenas os prompts que a usam"""
+        first = self.builder.build()
+        self.assertEqual(first.regenerated, [])
+
+        self.edit_resource("personas", lambda d: d["legal-analyst"].update(
+            system_prompt_template="Persona jurídica revisada."))
+        report = self.builder.build()
+        self.assertEqual(report.changed["personas"], {"legal-analyst"})
+        self.assertEqual(report.regenerated, [self.outputs["legal-analyst"]])
+        self.assertTrue(self.read_output("legal-analyst")["prompt"]["system"].startswith("Persona jurídica revisada."))
+        self.assertNotIn("revisada", self.read_output("excel-expert")["prompt"]["system"])
+
+        # Sem novas mudanças, nada é regenerado
+        self.assertEqual(self.builder.build().regenerated, [])
+
+    def test_failed_outputs_are_retried(self):
+        """Prompts cuja regeneração falhou são refeitos no build seguinte"""
+        self.builder.build()
+        self.edit_resource("personas", lambda d: d["legal-analyst"].update(
+            system_prompt_template="Persona jurídica revisada."))
+        target = os.path.join(self.output_dir, self.outputs["legal-analyst"])
+        write = incremental_build.write_output_record
+
+        def failing_write(path, record, compact=False):
+            if path == target:
+                raise OSError("disco cheio")
+            write(path, record, compact)
+
+        with mock.patch.object(incremental_build, "write_output_record", failing_write):
+            report = self.builder.build()
+        self.assertEqual([name for name, _ in report.failed], [self.outputs["legal-analyst"]])
+
+        retry = self.builder.build()
+        self.assertEqual(retry.regenerated, [self.outputs["legal-analyst"]])
+        self.assertTrue(self.read_output("legal-analyst")["prompt"]["system"].startswith("Persona jurídica revisada."))
+        self.assertEqual(self.builder.build().regenerated, [])
+
+    def test_regeneration_keeps_json_style(self):
+        """Prompts salvos com --compact continuam minificados após a regeneração"""
+        generator = PromptGenerator()
+        generator.compact_output = True
+        generator.selected_model = generator.models["claude-opus-4"]
+        generator.selected_persona = generator.personas["legal-analyst"]
+        generator.selected_template = generator.templates["data-analysis"]
+        generator.task_description = "Tarefa compacta"
+        compact_path = generator.save_prompt(generator.generate_prompt(), self.output_dir)
+        indented_path = os.path.join(self.output_dir, self.outputs["legal-analyst"])
+
+        self.builder.build()
+        self.edit_resource("personas", lambda d: d["legal-analyst"].update(
+            system_prompt_template="Persona jurídica revisada.\nCom quebra de linha."))
+        self.assertEqual(len(self.builder.build().regenerated), 2)
+        with open(compact_path, encoding='utf-8') as f:
+            self.assertNotIn("\n", f.read())
+        with open(indented_path, encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith('{\n  "metadata"'))
+
+        # --json-style sobrepõe o formato original
+        builder = IncrementalBuilder(self.output_dir, self.resource_files, json_style="indent")
+        self.edit_resource("personas", lambda d: d["legal-analyst"].update(
+            system_prompt_template="Persona jurídica revisada outra vez."))
+        builder.build()
+        with open(compact_path, encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith('{\n  "metadata"'))
+
+    def test_template_change_in_parallel(self):
+        """Alterar um template regenera todos os dependentes usando vários processos"""
+        self.builder.build()
+        self.builder.workers = 2
+        self.edit_resource("templates", lambda d: d["qa-template"]["structure"].update(
+            process="Processo revisado."))
+        report = self.builder.build()
+        self.assertEqual(sorted(report.regenerated), sorted(self.outputs.values()))
+        for persona_id in self.outputs:
+            self.assertIn("Processo revisado.", self.read_output(persona_id)["prompt"]["system"])
+
+    def test_base_change_regenerates_children(self):
+        """Alterar uma persona base regenera os prompts das personas derivadas"""
+        self.edit_resource("personas", lambda d: d.update({
+            "legal-analyst": {"extends": "excel-expert", "name": "Analista derivado",
+                              "system_prompt_template+": "Foco em contratos."}}))
+        self.builder.build()
+        self.edit_resource("personas", lambda d: d["excel-expert"].update(
+            system_prompt_template="Persona base revisada."))
+        report = self.builder.build()
+        self.assertEqual(report.changed["personas"], {"excel-expert", "legal-analyst"})
+        self.assertEqual(sorted(report.regenerated), sorted(self.outputs.values()))
+        self.assertTrue(self.read_output("legal-analyst")["prompt"]["system"].startswith(
+            "Persona base revisada.\n\nFoco em contratos."))
+
+    def test_removed_entry_is_reported(self):
+        """Prompts cuja persona foi removida são apontados e não regenerados"""
+        self.builder.build()
+        self.edit_resource("personas", lambda d: d.pop("excel-expert"))
+        report = self.builder.build()
+        self.assertEqual([name for name, _ in report.orphaned], [self.outputs["excel-expert"]])
+        self.assertEqual(report.regenerated, [])
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação da regeneração incremental...\n")
+    run_tests()
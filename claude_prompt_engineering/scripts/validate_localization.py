@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação dos Catálogos Localizados
+---------------------------------------------
+
+Verifica a cadeia de fallback de locales, a aplicação das traduções sobre
+o texto de origem, a pré-compilação sob demanda por locale e o uso do
+locale nos caminhos interativo e em lote.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import (LocaleCatalogs, PromptGenerator, ResourceManager,
+                                  locale_chain, localize_entry, normalize_locale)
+    from incremental_build import IncrementalBuilder
+    from localization import missing_translations
+    from storage import JsonFileBackend, MemoryBackend
+except ImportError:
+    print("Erro ao importar o módulo de localização. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+ENTRY = {
+    "name": "Analista",
+    "structure": {"introduction": "Introdução", "process": "Processo"},
+    "locales": {
+        "en": {"name": "Analyst", "structure": {"introduction": "Introduction"}},
+        "pt": {"name": "Analista (pt)"},
+        "es": {"name": "Analista (es)"},
+    },
+}
+
+class TestLocaleChain(unittest.TestCase):
+    """Testes para a cadeia de fallback e a aplicação das traduções"""
+
+    def test_chain(self):
+        """A cadeia vai do locale mais específico ao fallback"""
+        self.assertEqual(normalize_locale("pt_br"), "pt-BR")
+        self.assertEqual(locale_chain("pt-BR"), ["pt-BR", "pt", "en"])
+        self.assertEqual(locale_chain("es-MX"), ["es-MX", "es", "en"])
+        self.assertEqual(locale_chain("en-US"), ["en-US", "en"])
+        for invalid in ("../pwned", "en/../x", "", "e", "pt-BR-"):
+            with self.assertRaises(ValueError):
+                normalize_locale(invalid)
+
+    def test_localize_entry(self):
+        """Traduções parciais caem no fallback e, por fim, no texto de origem"""
+        english = localize_entry(ENTRY, locale_chain("en-GB"))
+        self.assertEqual(english["name"], "Analyst")
+        self.assertEqual(english["structure"], {"introduction": "Introduction", "process": "Processo"})
+        self.assertNotIn("locales", english)
+
+        self.assertEqual(localize_entry(ENTRY, locale_chain("es-AR"))["name"], "Analista (es)")
+        self.assertEqual(localize_entry(ENTRY, locale_chain("de"))["name"], "Analyst")
+
+    def test_source_language_does_not_fall_back(self):
+        """Variantes do idioma de origem não caem para o inglês"""
+        self.assertEqual(localize_entry(ENTRY, locale_chain("pt-BR"))["name"], "Analista")
+        self.assertEqual(localize_entry(ENTRY, locale_chain("pt-PT"))["name"], "Analista (pt)")
+
+    def test_translations_before_inheritance(self):
+        """As traduções da base são herdadas pelas entradas derivadas"""
+        data = {
+            "base": {"system_prompt_template": "Base.", "locales": {"en": {"system_prompt_template": "Base EN."}}},
+            "derivada": {"extends": "base", "name": "Derivada", "locales": {"en": {"name": "Derived"}}},
+        }
+        localized = ResourceManager.resolve_catalog(ResourceManager.localize_catalog(data, "en"))
+        self.assertEqual(localized["derivada"]["system_prompt_template"], "Base EN.")
+        self.assertEqual(localized["derivada"]["name"], "Derived")
+
+    def test_localized_append_keys(self):
+        """Chaves "+" traduzidas continuam acrescentando ao valor herdado"""
+        data = {
+            "base": {"system_prompt_template": "Base.", "expertise": ["Contratos"],
+                     "locales": {"en": {"system_prompt_template": "Base EN.", "expertise": ["Contracts"]}}},
+            "jurisdicao-br": {"abstract": True, "expertise+": ["Direito brasileiro"],
+                              "system_prompt_template+": "Legislação brasileira.",
+                              "locales": {"en": {"expertise+": ["Brazilian law"],
+                                                 "system_prompt_template+": "Brazilian law."}}},
+            "derivada": {"extends": "base", "mixins": ["jurisdicao-br"], "name": "Derivada",
+                         "system_prompt_template+": "Cite a fonte.",
+                         "locales": {"en": {"system_prompt_template+": "Cite the source."}}},
+        }
+        english = ResourceManager.resolve_catalog(ResourceManager.localize_catalog(data, "en"))["derivada"]
+        self.assertEqual(english["system_prompt_template"], "Base EN.\n\nBrazilian law.\n\nCite the source.")
+        self.assertEqual(english["expertise"], ["Contracts", "Brazilian law"])
+        source = ResourceManager.resolve_catalog(ResourceManager.localize_catalog(data, "pt-BR"))["derivada"]
+        self.assertEqual(source["system_prompt_template"], "Base.\n\nLegislação brasileira.\n\nCite a fonte.")
+
+    def test_shipped_catalogs(self):
+        """Os catálogos distribuídos têm as traduções em inglês"""
+        personas = ResourceManager.load_personas(locale="en")
+        self.assertEqual(personas["legal-analyst"].name, "Legal Analyst")
+        self.assertEqual(ResourceManager.load_personas()["legal-analyst"].name, "Analista Jurídico")
+        templates = ResourceManager.load_templates(locale="en")
+        self.assertEqual(templates["qa-template"].structure["introduction"], "You will answer questions about {topic}.")
+        self.assertEqual(missing_translations(ResourceManager.load_json(os.path.join(parent_dir, "resources", "personas.json")),
+                                              "pt-PT", ("name",)), [])
+
+class TestLocaleCatalogs(unittest.TestCase):
+    """Testes para os catálogos pré-compilados por locale"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.compiled_dir = os.path.join(self.tmp_dir, "compiled")
+        self.resource_files = {}
+        for kind in ("models", "personas", "templates"):
+            path = os.path.join(self.tmp_dir, f"{kind}.json")
+            shutil.copy(os.path.join(parent_dir, "resources", f"{kind}.json"), path)
+            self.resource_files[kind] = path
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def catalogs(self):
+        return LocaleCatalogs(resource_files=self.resource_files, compiled_dir=self.compiled_dir)
+
+    def test_generator_locale(self):
+        """O gerador interativo usa os catálogos do locale escolhido"""
+        source = JsonFileBackend(os.path.join(parent_dir, "resources"), self.tmp_dir)
+        backend = MemoryBackend({kind: source.load_catalog(kind) for kind in ("models", "personas", "templates")})
+        generator = PromptGenerator(backend, locale="en_us")
+        self.assertEqual(generator.locale, "en-US")
+        self.assertEqual(generator.personas["data-analyst"].name, "Data Analyst")
+
+    def test_lazy_precompiled_load(self):
+        """Apenas os locales usados são compilados, e uma única vez"""
+        self.assertEqual(self.catalogs().get("en")["personas"]["code-developer"].name, "Software Developer")
+        self.assertEqual(os.listdir(self.compiled_dir), ["en.json"])
+
+        # Com as fontes inalteradas, outro processo lê apenas o arquivo compilado
+        cached = self.catalogs()
+        cached.compile = None
+        self.assertEqual(cached.get("en")["personas"]["code-developer"].name, "Software Developer")
+
+    def test_recompiles_when_sources_change(self):
+        """Alterar um arquivo de origem invalida a versão compilada"""
+        self.catalogs().get("en")
+        data = ResourceManager.load_json(self.resource_files["personas"])
+        data["code-developer"]["locales"]["en"]["name"] = "Developer"
+        ResourceManager.save_json(self.resource_files["personas"], data)
+        self.assertEqual(self.catalogs().get("en")["personas"]["code-developer"].name, "Developer")
+
+    def test_invalid_locale_writes_nothing(self):
+        """Um locale fora do padrão não vira nome de arquivo"""
+        with self.assertRaises(ValueError):
+            self.catalogs().get("../pwned")
+        self.assertEqual(sorted(os.listdir(self.tmp_dir)),
+                         ["models.json", "personas.json", "templates.json"])
+
+    def test_recompiles_other_format(self):
+        """Arquivos compilados de outra versão de formato são refeitos, sem temporários"""
+        catalogs = self.catalogs()
+        catalogs.get("en")
+        path = catalogs.compiled_path("en")
+        cached = ResourceManager.load_json(path)
+        cached.pop("format")
+        cached["catalogs"]["personas"]["code-developer"]["name"] = "Antigo"
+        ResourceManager.save_json(path, cached)
+        self.assertEqual(self.catalogs().get("en")["personas"]["code-developer"].name, "Software Developer")
+        self.assertEqual(os.listdir(self.compiled_dir), ["en.json"])
+
+    def test_incremental_build_keeps_locale(self):
+        """A regeneração incremental usa o locale registrado em cada prompt"""
+        output_dir = os.path.join(self.tmp_dir, "output")
+        os.makedirs(output_dir)
+        generator = PromptGenerator()
+        catalogs = self.catalogs().get("en")
+        generator.locale = "en"
+        generator.models, generator.personas, generator.templates = (
+            catalogs["models"], catalogs["personas"], catalogs["templates"])
+        generator.selected_model = generator.models["claude-opus-4"]
+        generator.selected_persona = generator.personas["legal-analyst"]
+        generator.selected_template = generator.templates["qa-template"]
+        generator.task_description = "Review the termination clauses"
+        path = generator.save_prompt(generator.generate_prompt(), output_dir)
+        self.assertEqual(ResourceManager.load_json(path)["metadata"]["locale"], "en")
+
+        builder = IncrementalBuilder(output_dir, self.resource_files)
+        builder.build()
+        data = ResourceManager.load_json(self.resource_files["templates"])
+        data["qa-template"]["locales"]["en"]["structure"]["process"] = "Think step by step."
+        ResourceManager.save_json(self.resource_files["templates"], data)
+        self.assertEqual(len(builder.build().regenerated), 1)
+
+        system = ResourceManager.load_json(path)["prompt"]["system"]
+        self.assertTrue(system.startswith("As a specialized Legal Analyst"))
+        self.assertIn("Think step by step.", system)
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação dos catálogos localizados...\n")
+    run_tests()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação da Expansão de Parâmetros
+---------------------------------------------
+
+Verifica a interpretação das listas/intervalos de valores, a expansão
+lazy do produto cartesiano, a amostragem e a equivalência entre o
+CompiledPrompt e o gerador interativo.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import CompiledPrompt, PromptGenerator, ResourceManager
+    from parameter_matrix import ParameterMatrix, parse_values, expand, main
+except ImportError:
+    print("Erro ao importar o módulo de expansão de parâmetros. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+class TestParameterMatrix(unittest.TestCase):
+    """Testes para a expansão de parâmetros em matriz"""
+
+    def test_parse_values(self):
+        """Testa os formatos de especificação de valores"""
+        self.assertEqual(parse_values("python, java,go"), ["python", "java", "go"])
+        self.assertEqual(parse_values("1..4"), ["1", "2", "3", "4"])
+        self.assertEqual(parse_values("0..10:5"), ["0", "5", "10"])
+        self.assertEqual(parse_values("3..1"), ["3", "2", "1"])
+        with self.assertRaises(ValueError):
+            parse_values("1..x")
+
+    def test_iteration_matches_index_order(self):
+        """A iteração segue a mesma ordem de combination()"""
+        matrix = ParameterMatrix({"language": ["py", "go", "rs"], "content_type": ["a", "b"]})
+        combos = list(matrix)
+        self.assertEqual(len(combos), len(matrix))
+        self.assertEqual(len(matrix), 6)
+        for i, combo in enumerate(combos):
+            self.assertEqual(combo, matrix.combination(i))
+        self.assertEqual(combos[1], {"language": "py", "content_type": "b"})
+
+    def test_random_sampling_is_distinct(self):
+        """A amostragem aleatória não repete combinações"""
+        matrix = ParameterMatrix({"a": parse_values("1..1000"), "b": parse_values("1..1000")})
+        samples = list(matrix.sample_random(50, seed=7))
+        self.assertEqual(len(samples), 50)
+        self.assertEqual(len({tuple(s.items()) for s in samples}), 50)
+        self.assertEqual(samples, list(matrix.sample_random(50, seed=7)))
+
+    def test_product_larger_than_maxsize(self):
+        """Produtos maiores que sys.maxsize são amostrados sem OverflowError"""
+        variables = {f"v{i}": parse_values("0..9") for i in range(20)}
+        matrix = ParameterMatrix(variables)
+        self.assertEqual(matrix.size, 10 ** 20)
+        self.assertGreater(matrix.size, sys.maxsize)
+        samples = list(matrix.sample_random(30, seed=3))
+        self.assertEqual(len({tuple(s.items()) for s in samples}), 30)
+        self.assertEqual(matrix.combination(matrix.size - 1), {name: "9" for name in variables})
+
+        args = ["--model", "claude-opus-4", "--persona", "code-developer", "--template", "code-generation",
+                "--task", "Parser CSV", "--samples", "3"]
+        for name in variables:
+            args += ["--var", f"{name}=0..9"]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for method in ("random", "lhs"):
+                output = os.path.join(tmp_dir, f"{method}.jsonl")
+                self.assertEqual(main(args + ["--sample", method, "--output", output]), 0)
+                with open(output, encoding='utf-8') as f:
+                    self.assertEqual(len(f.readlines()), 3)
+
+    def test_latin_hypercube_covers_values(self):
+        """Com tantas amostras quanto valores, cada valor aparece uma vez"""
+        matrix = ParameterMatrix({"language": parse_values("1..20"), "content_type": parse_values("1..5")})
+        samples = list(matrix.sample_latin_hypercube(20, seed=3))
+        self.assertEqual(sorted(s["language"] for s in samples), sorted(parse_values("1..20")))
+        counts = [sum(1 for s in samples if s["content_type"] == v) for v in parse_values("1..5")]
+        self.assertEqual(counts, [4] * 5)
+
+    def test_latin_hypercube_without_repeats(self):
+        """O hipercubo latino não repete combinações nem passa do tamanho do produto"""
+        matrix = ParameterMatrix({"language": ["python", "go"], "content_type": ["api", "cli"]})
+        samples = list(matrix.sample_latin_hypercube(10, seed=1))
+        keys = [tuple(s.items()) for s in samples]
+        self.assertLessEqual(len(keys), matrix.size)
+        self.assertEqual(len(set(keys)), len(keys))
+
+    def test_expand_matches_generator(self):
+        """Cada variante expandida é igual ao prompt do gerador interativo"""
+        models = ResourceManager.load_models()
+        personas = ResourceManager.load_personas()
+        templates = ResourceManager.load_templates()
+        model = models["claude-opus-4"]
+        persona = personas["code-developer"]
+        template = templates["code-generation"]
+
+        compiled = CompiledPrompt(model, persona, template)
+        self.assertIn("language", compiled.variables)
+
+        generator = PromptGenerator()
+        generator.selected_model = model
+        generator.selected_persona = persona
+        generator.selected_template = template
+        generator.task_description = "Validar CPFs"
+
+        base = {"tone": "técnico", "detail_level": "detalhado", "output_format": "markdown",
+                "task_description": "validar CPFs"}
+        matrix = ParameterMatrix({"language": ["Python", "Go"]})
+        results = list(expand(compiled, "Validar CPFs", base, iter(matrix)))
+        self.assertEqual(len(results), 2)
+        for parameters, prompt in results:
+            generator.parameters = parameters
+            self.assertEqual(prompt, generator.generate_prompt())
+            self.assertIn(f"código {parameters['language']}", prompt["system"])
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação da expansão de parâmetros...\n")
+    run_tests()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação do Arquivo Compactado de Prompts
+----------------------------------------------------
+
+Verifica que os prompts arquivados são lidos de volta sem perdas, que os
+metadados fixos são gravados uma única vez, que o dicionário reduz o
+tamanho dos registros e que o gerador e os leitores de corpus aceitam o
+formato compactado.
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import PromptGenerator
+    from prompt_archive import (ArchiveError, ArchiveWriter, dictionary_from_catalogs,
+                                iter_archive, pack, sample_records, train_dictionary)
+    from prompt_linter import iter_records
+    from replay_harness import iter_requests
+except ImportError:
+    print("Erro ao importar o módulo de arquivo compactado. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+class TestPromptArchive(unittest.TestCase):
+    """Testes para o arquivo compactado de prompts"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "prompts.prar")
+        self.records = sample_records(60, seed=1)
+        self.dictionary = train_dictionary(
+            content for record in self.records for content in record["prompt"].values())
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, path, records, dictionary):
+        with ArchiveWriter(path, dictionary) as writer:
+            for record in records:
+                writer.append(record)
+            return writer
+
+    def test_round_trip(self):
+        """Os registros lidos são iguais aos gravados"""
+        writer = self.write(self.path, self.records, self.dictionary)
+        self.assertEqual(list(iter_archive(self.path)), self.records)
+
+        combinations = {tuple(r["metadata"][k] for k in ("model_id", "persona_id", "template_id"))
+                        for r in self.records}
+        self.assertEqual(len(writer.references), len(combinations))
+
+    def test_dictionary_reduces_size(self):
+        """O dicionário treinado reduz o arquivo em relação ao zlib sem dicionário"""
+        plain = os.path.join(self.tmp_dir, "plain.prar")
+        self.write(plain, self.records, b"")
+        self.write(self.path, self.records, self.dictionary)
+        minified = sum(len(json.dumps(r, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                       for r in self.records)
+        self.assertLess(os.path.getsize(plain), minified)
+        self.assertLess(os.path.getsize(self.path) - len(self.dictionary), os.path.getsize(plain) / 2)
+
+    def test_append_reuses_header_and_references(self):
+        """Reabrir o arquivo mantém o dicionário e não repete referências"""
+        self.write(self.path, self.records[:30], self.dictionary)
+        with ArchiveWriter(self.path, b"outro dicionario") as writer:
+            self.assertEqual(writer.dictionary, self.dictionary)
+            self.assertEqual(writer.count, 30)
+            known = len(writer.references)
+            writer.append(self.records[0])
+            self.assertEqual(len(writer.references), known)
+            for record in self.records[30:]:
+                writer.append(record)
+        self.assertEqual(list(iter_archive(self.path)), self.records[:30] + [self.records[0]] + self.records[30:])
+
+    def test_truncated_archive(self):
+        """Um registro incompleto é reportado"""
+        self.write(self.path, self.records[:5], self.dictionary)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        with self.assertRaises(ArchiveError):
+            list(iter_archive(self.path))
+
+    def test_append_after_truncated_record(self):
+        """Reabrir um arquivo com o último registro incompleto descarta esse registro"""
+        self.write(self.path, self.records[:5], self.dictionary)
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 3)
+        with ArchiveWriter(self.path, self.dictionary) as writer:
+            self.assertEqual(writer.count, 4)
+            self.assertEqual(writer.append(self.records[5]), 4)
+        self.assertEqual(list(iter_archive(self.path)), self.records[:4] + [self.records[5]])
+
+    def test_generator_outputs(self):
+        """O gerador salva em JSON minificado ou no arquivo compactado"""
+        generator = PromptGenerator()
+        generator.selected_model = generator.models["claude-opus-4"]
+        generator.selected_persona = generator.personas["excel-expert"]
+        generator.selected_template = generator.templates["qa-template"]
+        generator.task_description = "Somar vendas por região"
+        prompt = generator.generate_prompt()
+
+        generator.compact_output = True
+        output_dir = os.path.join(self.tmp_dir, "output")
+        os.makedirs(output_dir)
+        filepath = generator.save_prompt(prompt, output_dir)
+        with open(filepath, encoding='utf-8') as f:
+            content = f.read()
+        self.assertNotIn("\n  ", content)
+        self.assertEqual(json.loads(content)["prompt"], prompt)
+
+        generator.archive = ArchiveWriter(self.path, dictionary_from_catalogs(generator.personas, generator.templates))
+        self.assertEqual(generator.save_prompt(prompt), f"{self.path}#0")
+        self.assertEqual(generator.save_prompt(prompt), f"{self.path}#1")
+        generator.archive.close()
+        records = list(iter_archive(self.path))
+        self.assertEqual(records[1]["prompt"], prompt)
+        self.assertEqual(records[1]["metadata"]["persona_id"], "excel-expert")
+
+        # pack() arquiva o diretório de saída existente
+        packed = os.path.join(self.tmp_dir, "packed.prar")
+        self.assertEqual(pack(output_dir, packed), 1)
+        self.assertEqual(next(iter_archive(packed))["prompt"], prompt)
+
+    def test_corpus_readers(self):
+        """O linter e o replay leem o arquivo compactado como corpus"""
+        self.write(self.path, self.records[:10], self.dictionary)
+        linted = list(iter_records([self.tmp_dir]))
+        self.assertEqual(len(linted), 10)
+        self.assertTrue(linted[3]["_source"].endswith("prompts.prar#3"))
+        requests = list(iter_requests([self.path]))
+        self.assertEqual(requests[0]["persona_id"], self.records[0]["metadata"]["persona_id"])
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação do arquivo compactado de prompts...\n")
+    run_tests()
@@ -26,7 +26,8 @@ sys.path.append(parent_dir + "/scripts")
 
 # Importar o módulo do gerador de prompts
 try:
-    from prompt_generator import ResourceManager, AIModel, Persona, PromptTemplate, PromptGenerator
+    from prompt_generator import (ResourceManager, AIModel, Persona, PromptTemplate, PromptGenerator,
+                                  CatalogResolver, CompositionError, merge_entry)
 except ImportError:
     print("Erro ao importar o módulo do gerador de prompts. Verifique se o arquivo está no diretório correto.")
     sys.exit(1)
@@ -196,6 +197,92 @@ class TestPromptGenerator(unittest.TestCase):
                 for key in expected_format.values():
                     self.assertIn(key, prompt, f"Formato incorreto para modelo {model_id}: falta campo '{key}'")
 
+class TestCatalogComposition(unittest.TestCase):
+    """Testes para herança e mixins de personas e templates"""
+    
+    def setUp(self):
+        """Catálogo com uma persona base, derivadas e fragmentos"""
+        self.raw = {
+            "base": {
+                "name": "Base",
+                "expertise": ["Direito"],
+                "tone": "Formal",
+                "system_prompt_template": "Você é um analista jurídico."
+            },
+            "jurisdicao-br": {
+                "abstract": True,
+                "expertise+": ["Direito brasileiro"],
+                "system_prompt_template+": "Considere a legislação brasileira."
+            },
+            "idioma-en": {
+                "abstract": True,
+                "system_prompt_template+": "Responda em inglês."
+            },
+            "analista-br": {
+                "extends": "base",
+                "mixins": ["jurisdicao-br"],
+                "name": "Analista BR"
+            },
+            "analista-br-en": {
+                "extends": "analista-br",
+                "mixins": ["idioma-en"],
+                "tone": "Neutro"
+            }
+        }
+    
+    def test_merge_entry(self):
+        """Dicionários são mesclados e chaves com '+' acrescentam"""
+        merged = merge_entry({"structure": {"a": "1", "b": "2"}, "tags": ["x"]},
+                             {"structure": {"b": "3", "a+": "4"}, "tags+": "y"})
+        self.assertEqual(merged, {"structure": {"a": "1\n\n4", "b": "3"}, "tags": ["x", "y"]})
+    
+    def test_inheritance_and_mixins(self):
+        """Entradas derivadas são achatadas na ordem base, mixins, campos próprios"""
+        resolver = CatalogResolver(self.raw)
+        entry = resolver.resolve("analista-br-en")
+        self.assertEqual(entry["name"], "Analista BR")
+        self.assertEqual(entry["tone"], "Neutro")
+        self.assertEqual(entry["expertise"], ["Direito", "Direito brasileiro"])
+        self.assertEqual(entry["system_prompt_template"],
+                         "Você é um analista jurídico.\n\nConsidere a legislação brasileira.\n\nResponda em inglês.")
+        self.assertNotIn("extends", entry)
+        
+        # Fragmentos abstratos não aparecem no catálogo resolvido
+        self.assertEqual(list(resolver.resolve_all()), ["base", "analista-br", "analista-br-en"])
+    
+    def test_cycle_detection(self):
+        """Ciclos de herança ou mixins são rejeitados"""
+        raw = dict(self.raw)
+        raw["base"] = dict(raw["base"], extends="analista-br-en")
+        resolver = CatalogResolver(raw)
+        with self.assertRaises(CompositionError):
+            resolver.resolve("analista-br")
+        
+        raw = {"a": {"mixins": ["b"]}, "b": {"mixins": ["a"]}}
+        with self.assertRaises(CompositionError):
+            CatalogResolver(raw).resolve("a")
+    
+    def test_incremental_invalidation(self):
+        """Alterar uma base invalida apenas ela e suas dependentes"""
+        resolver = CatalogResolver(self.raw)
+        resolver.resolve_all()
+        self.assertEqual(resolver.update("idioma-en", {"system_prompt_template+": "Answer in English."}),
+                         {"idioma-en", "analista-br-en"})
+        self.assertEqual(resolver.update("base", dict(self.raw["base"], tone="Sóbrio")),
+                         {"base", "analista-br", "analista-br-en"})
+        self.assertIn("Answer in English.", resolver.resolve("analista-br-en")["system_prompt_template"])
+        self.assertEqual(resolver.resolve("analista-br")["tone"], "Sóbrio")
+    
+    def test_load_personas_resolves(self):
+        """load_personas() entrega personas já achatadas"""
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "personas.json")
+            ResourceManager.save_json(path, self.raw)
+            personas = ResourceManager.load_personas(path)
+        self.assertEqual(list(personas), ["base", "analista-br", "analista-br-en"])
+        self.assertTrue(personas["analista-br-en"].system_prompt_template.endswith("Responda em inglês."))
+
 def run_tests():
     """Executa os testes de validação"""
     unittest.main(argv=['first-arg-is-ignored'], exit=False)
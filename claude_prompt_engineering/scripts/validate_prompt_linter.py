@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação do Lint de Prompts
+--------------------------------------
+
+Verifica cada regra de avaliação e a equivalência entre a avaliação
+sequencial e a avaliação em lote com vários processos.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import AIModel, LocaleCatalogs, Persona, PromptGenerator, ResourceManager
+    from prompt_linter import OUTPUT_FORMAT_PATTERN, PromptLinter, iter_records
+except ImportError:
+    print("Erro ao importar o módulo de lint de prompts. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+class TestPromptLinter(unittest.TestCase):
+    """Testes para as regras de avaliação de prompts"""
+
+    def setUp(self):
+        """Configuração inicial para os testes"""
+        self.model = AIModel(
+            name="Modelo Pequeno",
+            description="Modelo de teste",
+            provider="Teste",
+            context_window=1000,
+            max_output=200,
+            features={},
+            prompt_format={"system": "system", "user": "user", "assistant": "assistant"},
+            training_cutoff="2025-01"
+        )
+        self.persona = Persona(
+            name="Revisor",
+            description="Revisor de textos",
+            expertise=["Revisão"],
+            tone="Formal",
+            detail_level="Detalhado",
+            approach="Metódico",
+            system_prompt_template="Como revisor, corrija erros de gramática e ortografia do texto recebido."
+        )
+        self.linter = PromptLinter({"pequeno": self.model}, {"revisor": self.persona}, {})
+
+    def rules(self, result):
+        return {issue.rule for issue in result.issues}
+
+    def test_clean_prompt(self):
+        """Um prompt bem formado recebe nota máxima"""
+        prompt = {"system": self.persona.system_prompt_template + "\n\nResponda em formato markdown.",
+                  "user": "Revise o texto.", "assistant": ""}
+        result = self.linter.lint(prompt, self.model, self.persona)
+        self.assertEqual(result.issues, [])
+        self.assertEqual(result.score, 100)
+
+    def test_unresolved_placeholder(self):
+        """Variáveis não substituídas são erros"""
+        prompt = {"system": "Gere código {language}. Use formato markdown.", "user": "Tarefa"}
+        result = self.linter.lint(prompt, self.model)
+        self.assertIn("placeholder", self.rules(result))
+        self.assertIn("{language}", result.issues[0].message)
+
+    def test_duplicate_instruction(self):
+        """Instruções da persona repetidas no template são apontadas"""
+        prompt = {"system": self.persona.system_prompt_template
+                  + "\n\nCorrija os erros de gramática e ortografia do texto recebido. Use formato markdown.",
+                  "user": "Texto"}
+        result = self.linter.lint(prompt, self.model, self.persona)
+        self.assertIn("duplicate", self.rules(result))
+
+    def test_missing_output_format(self):
+        """A ausência de orientação de saída gera aviso"""
+        result = self.linter.lint({"system": "Ajude o usuário.", "user": "Oi"}, self.model)
+        self.assertEqual(self.rules(result), {"output-format"})
+
+    def test_template_output_format_section(self):
+        """A seção output_format dos templates satisfaz a regra; prosa comum, não"""
+        for text in ("Use formatação profissional.", "Apresente a análise de forma estruturada.",
+                     "Your answer should be clear and concise."):
+            self.assertEqual(self.linter.lint({"system": text, "user": "Oi"}, self.model).issues, [])
+        for text in ("Analise a estrutura de custos da empresa.", "Verifique a saída do relatório.",
+                     "Consulte a lista de clientes.", "Describe the output of the pipeline."):
+            self.assertEqual(self.rules(self.linter.lint({"system": text, "user": "Oi"}, self.model)),
+                             {"output-format"})
+
+        models = ResourceManager.load_models()
+        personas = ResourceManager.load_personas()
+        templates = ResourceManager.load_templates()
+        linter = PromptLinter(models, personas, templates)
+        generator = PromptGenerator()
+        generator.task_description = "Revisar o contrato"
+        flagged = []
+        for model_id, model in models.items():
+            for persona_id, persona in personas.items():
+                for template_id, template in templates.items():
+                    generator.selected_model, generator.selected_persona = model, persona
+                    generator.selected_template = template
+                    generator.selected_model_id = model_id
+                    generator.selected_persona_id = persona_id
+                    generator.selected_template_id = template_id
+                    record = generator.output_record(generator.generate_prompt())
+                    if "output-format" in self.rules(linter.lint_record(record)):
+                        flagged.append(template_id)
+        self.assertEqual(flagged, [])
+
+        # O registro é avaliado pelo próprio texto, não pelo template atual do catálogo
+        record = generator.output_record({"system": "Ajude o usuário.", "user": "Oi"})
+        self.assertIn("output-format", self.rules(linter.lint_record(record)))
+
+    def test_localized_templates_have_format(self):
+        """As traduções da seção output_format também satisfazem a regra"""
+        catalogs = LocaleCatalogs(compiled_dir=None).get("en")
+        for template in catalogs["templates"].values():
+            text = template.structure["output_format"]
+            self.assertIsNotNone(OUTPUT_FORMAT_PATTERN.search(text), text)
+
+    def test_malformed_lines_become_findings(self):
+        """Linhas JSONL inválidas viram achados, sem interromper o lint"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "prompts.jsonl")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({"prompt": {"system": "Use formato markdown.", "user": "Oi"}}) + "\n")
+                f.write("{incompleto\n")
+                f.write("[1, 2]\n")
+            results = list(self.linter.lint_batch(iter_records([path])))
+        self.assertEqual([r.score for r in results], [100, 75, 75])
+        self.assertEqual(self.rules(results[1]), {"invalid-record"})
+        self.assertEqual(results[1].source, f"{path}:2")
+
+    def test_budget(self):
+        """Prompts que não cabem na janela com a saída máxima são erros"""
+        prompt = {"system": "Use formato markdown. " + "x" * 4000, "user": "Tarefa"}
+        result = self.linter.lint(prompt, self.model)
+        self.assertIn("budget", self.rules(result))
+        self.assertGreater(result.budget_ratio, 1.0)
+
+    def test_tone_conflict(self):
+        """Diretivas de tom opostas são detectadas"""
+        prompt = {"system": "Mantenha um tom formal. Seja descontraído e use formato markdown.", "user": "Oi"}
+        result = self.linter.lint(prompt, self.model)
+        self.assertEqual(self.rules(result), {"tone-conflict"})
+        # "informal" não deve ser confundido com "formal"
+        prompt = {"system": "Seja informal e use formato markdown.", "user": "Oi"}
+        self.assertEqual(self.linter.lint(prompt, self.model).issues, [])
+
+    def test_batch_with_workers(self):
+        """A avaliação em paralelo preserva ordem e resultados"""
+        records = [
+            {"metadata": {"model": "Modelo Pequeno", "persona": "Revisor"},
+             "prompt": {"system": "Gere {item} em formato json.", "user": str(i)}}
+            for i in range(20)
+        ]
+        records.append({"metadata": {"model_id": "pequeno"}, "prompt": {"system": "Ajude.", "user": "Oi"}})
+        sequential = [r.to_dict() for r in self.linter.lint_batch(records)]
+        parallel = [r.to_dict() for r in self.linter.lint_batch(records, workers=2, chunksize=4)]
+        self.assertEqual([r["score"] for r in sequential], [r["score"] for r in parallel])
+        self.assertEqual(sequential[0]["score"], 75)
+        self.assertEqual(sequential[-1]["score"], 90)
+
+    def test_localized_records(self):
+        """Registros de outro locale são associados aos catálogos traduzidos"""
+        linter = PromptLinter(ResourceManager.load_models(), ResourceManager.load_personas(),
+                              ResourceManager.load_templates(), LocaleCatalogs(compiled_dir=None))
+        english = linter.resolve("persona", "Legal Analyst", "en")
+        self.assertEqual(linter.resolve("persona", "legal-analyst", "en-US").name, "Legal Analyst")
+        self.assertTrue(english.system_prompt_template.startswith("As a specialized Legal Analyst"))
+        self.assertEqual(linter.resolve("persona", "legal-analyst").name, "Analista Jurídico")
+        self.assertIsNone(linter.resolve("persona", "Legal Analyst"))
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação do lint de prompts...\n")
+    run_tests()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação do Replay entre Versões de Catálogo
+-------------------------------------------------------
+
+Verifica que o replay lê o corpus de prompts salvos e de arquivos JSONL,
+identifica os prompts alterados por uma nova versão dos catálogos e
+agrega as variações por modelo e por seção.
+"""
+
+import os
+import sys
+import io
+import json
+import shutil
+import tempfile
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import PromptGenerator, ResourceManager
+    from replay_harness import ReplayReport, iter_requests, load_catalog_version, run_replay
+except ImportError:
+    print("Erro ao importar o módulo de replay. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+class TestReplayHarness(unittest.TestCase):
+    """Testes para o replay de requisições entre versões de catálogo"""
+
+    def setUp(self):
+        """Cria uma versão candidata dos catálogos e um corpus de requisições"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.candidate_dir = os.path.join(self.tmp_dir, "candidate")
+        shutil.copytree(os.path.join(parent_dir, "resources"), self.candidate_dir)
+        personas_file = os.path.join(self.candidate_dir, "personas.json")
+        personas = ResourceManager.load_json(personas_file)
+        personas["legal-analyst"]["system_prompt_template"] += " Cite sempre a legislação aplicável."
+        ResourceManager.save_json(personas_file, personas)
+
+        self.corpus = os.path.join(self.tmp_dir, "requisicoes.jsonl")
+        with open(self.corpus, 'w', encoding='utf-8') as f:
+            for i in range(30):
+                persona_id = ("excel-expert", "legal-analyst", "inexistente")[i % 3]
+                f.write(json.dumps({"model_id": "claude-opus-4", "persona_id": persona_id,
+                                    "template_id": "qa-template", "task_description": f"Tarefa {i}",
+                                    "parameters": {"tone": "neutro"}}) + "\n")
+
+        self.versions = {"base": load_catalog_version(os.path.join(parent_dir, "resources")),
+                         "candidate": load_catalog_version(self.candidate_dir)}
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_changed_requests_and_sections(self):
+        """Apenas as requisições da persona alterada mudam, na seção da persona"""
+        details = io.StringIO()
+        report = run_replay(iter_requests([self.corpus]), self.versions, batch_size=7, top=3, details=details)
+        summary = report.to_dict()
+
+        self.assertEqual(summary["total"], 30)
+        self.assertEqual(summary["changed"], 10)
+        self.assertEqual(summary["unchanged"], 10)
+        self.assertEqual(summary["status"]["missing-base-candidate"], 10)
+        self.assertEqual([s["section"] for s in summary["top_sections"]], ["persona"])
+        self.assertEqual(len(summary["top_requests"]), 3)
+
+        delta = len(" Cite sempre a legislação aplicável.".encode("utf-8"))
+        model = summary["models"]["claude-opus-4"]
+        self.assertEqual(model["requests"], 20)
+        self.assertEqual(model["bytes_delta"], 10 * delta)
+        self.assertGreater(model["tokens_delta"], 0)
+        self.assertEqual(len(details.getvalue().splitlines()), 20)
+
+    def test_parallel_matches_serial(self):
+        """O resultado com vários processos é igual ao sequencial"""
+        serial = run_replay(iter_requests([self.corpus]), self.versions).to_dict()
+        parallel = run_replay(iter_requests([self.corpus]), self.versions, workers=2, batch_size=8).to_dict()
+        self.assertEqual(serial, parallel)
+
+    def test_saved_outputs_as_corpus(self):
+        """Prompts salvos por save_prompt() servem de corpus"""
+        output_dir = os.path.join(self.tmp_dir, "output")
+        os.makedirs(output_dir)
+        generator = PromptGenerator()
+        generator.selected_model = generator.models["claude-sonnet-4"]
+        generator.selected_persona = generator.personas["legal-analyst"]
+        generator.selected_template = generator.templates["qa-template"]
+        generator.task_description = "Revisar contrato"
+        generator.save_prompt(generator.generate_prompt(), output_dir)
+
+        requests = list(iter_requests([output_dir]))
+        self.assertEqual(requests[0]["persona_id"], "legal-analyst")
+        summary = run_replay(requests, self.versions).to_dict()
+        self.assertEqual(summary["changed"], 1)
+        self.assertIn("claude-sonnet-4", summary["models"])
+
+    def test_requests_use_their_locale(self):
+        """Uma alteração só na tradução afeta apenas as requisições daquele locale"""
+        templates_file = os.path.join(self.candidate_dir, "templates.json")
+        templates = ResourceManager.load_json(templates_file)
+        templates["qa-template"]["locales"]["en"]["structure"]["process"] = "Think step by step."
+        ResourceManager.save_json(templates_file, templates)
+        candidate = {"base": self.versions["base"], "candidate": load_catalog_version(self.candidate_dir)}
+
+        requests = [{"model_id": "claude-opus-4", "persona_id": "excel-expert", "template_id": "qa-template",
+                     "task_description": "Somar vendas", "locale": locale} for locale in ("en", "pt-BR", "en-GB")]
+        summary = run_replay(requests, candidate).to_dict()
+        self.assertEqual((summary["changed"], summary["unchanged"]), (2, 1))
+        self.assertEqual([s["section"] for s in summary["top_sections"]], ["process"])
+
+    def test_malformed_lines_are_reported(self):
+        """Linhas com JSON inválido viram erros com arquivo:linha, sem interromper o replay"""
+        with open(self.corpus, 'a', encoding='utf-8') as f:
+            f.write("{incompleto\n")
+            f.write("[1, 2]\n")
+        summary = run_replay(iter_requests([self.corpus]), self.versions).to_dict()
+        self.assertEqual(summary["total"], 32)
+        self.assertEqual(summary["status"]["invalid"], 2)
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as details:
+            run_replay(iter_requests([self.corpus]), self.versions, details=details)
+            details.seek(0)
+            results = [json.loads(line) for line in details]
+        self.assertEqual([r["source"] for r in results if r["status"] == "invalid"],
+                         ["requisicoes.jsonl:31", "requisicoes.jsonl:32"])
+
+    def test_model_grouped_by_id(self):
+        """Registros que só trazem o nome do modelo são agrupados pelo ID"""
+        model = self.versions["base"].get()["models"]["claude-opus-4"]
+        requests = [{"model_id": "claude-opus-4", "persona_id": "legal-analyst", "template_id": "qa-template",
+                     "task_description": "Revisar contrato"},
+                    {"model": model.name, "persona_id": "legal-analyst", "template_id": "qa-template",
+                     "task_description": "Revisar contrato"}]
+        summary = run_replay(requests, self.versions).to_dict()
+        self.assertEqual(list(summary["models"]), ["claude-opus-4"])
+        self.assertEqual(summary["models"]["claude-opus-4"]["requests"], 2)
+
+    def test_top_requests_bounded(self):
+        """O relatório mantém apenas as maiores variações"""
+        report = ReplayReport(top=2)
+        for i, delta in enumerate([5, 50, 1, 20]):
+            report.add({"source": str(i), "model": "m", "status": "changed", "sections": {"persona": delta},
+                        "bytes_base": 100, "bytes_candidate": 100 + delta,
+                        "tokens_base": 25, "tokens_candidate": 25})
+        self.assertEqual([r["source"] for r in report.to_dict()["top_requests"]], ["1", "3"])
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação do replay entre versões de catálogo...\n")
+    run_tests()
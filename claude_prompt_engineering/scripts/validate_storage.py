@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Script de Validação dos Backends de Armazenamento
+-------------------------------------------------
+
+Verifica que todos os backends seguem o mesmo contrato, que o cache de
+leitura respeita o TTL e agrupa leituras em lote, e que o gerador de
+prompts funciona sobre um backend.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Adicionar o diretório de scripts ao path
+script_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(script_dir)
+sys.path.append(script_dir)
+
+try:
+    from prompt_generator import PromptGenerator, ResourceManager
+    from storage import (CachedBackend, DirectoryBackend, HttpKVBackend, JsonFileBackend,
+                         LocalKVServer, SQLiteBackend, create_backend)
+except ImportError:
+    print("Erro ao importar o módulo de armazenamento. Verifique se o arquivo está no diretório correto.")
+    sys.exit(1)
+
+class CountingBackend(DirectoryBackend):
+    """Backend que conta as chamadas de leitura"""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    def list_keys(self, namespace):
+        self.calls.append(("list_keys", namespace))
+        return super().list_keys(namespace)
+
+    def get_many(self, namespace, keys):
+        keys = list(keys)
+        self.calls.append(("get_many", namespace, tuple(keys)))
+        return super().get_many(namespace, keys)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestStorageBackends(unittest.TestCase):
+    """Testes para os backends de armazenamento"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.server = LocalKVServer().start()
+        self.sqlite = SQLiteBackend(os.path.join(self.tmp_dir, "catalogo.db"))
+        self.backends = {
+            "json": JsonFileBackend(os.path.join(self.tmp_dir, "resources"), os.path.join(self.tmp_dir, "output")),
+            "dir": DirectoryBackend(os.path.join(self.tmp_dir, "entries")),
+            "sqlite": self.sqlite,
+            "http": HttpKVBackend(self.server.url),
+        }
+
+    def tearDown(self):
+        self.server.stop()
+        self.sqlite.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_backend_contract(self):
+        """Todos os backends leem, gravam, listam e removem da mesma forma"""
+        for name, backend in self.backends.items():
+            with self.subTest(backend=name):
+                for namespace in ("personas", "output"):
+                    catalog = {"b-persona": {"name": "B"}, "a/persona ç": {"name": "A"}}
+                    backend.save_catalog(namespace, catalog)
+                    self.assertEqual(backend.load_catalog(namespace), catalog)
+                    self.assertEqual(backend.get(namespace, "a/persona ç"), {"name": "A"})
+                    self.assertIsNone(backend.get(namespace, "inexistente"))
+
+                    backend.put(namespace, "b-persona", {"name": "B2"})
+                    self.assertEqual(backend.get_many(namespace, ["b-persona", "inexistente"]),
+                                     {"b-persona": {"name": "B2"}})
+
+                    backend.delete(namespace, "a/persona ç")
+                    self.assertEqual(backend.list_keys(namespace), ["b-persona"])
+
+    def test_sqlite_preserves_order(self):
+        """O SQLite mantém a ordem de inserção das entradas"""
+        catalog = {key: {"i": i} for i, key in enumerate(["z", "a", "m"])}
+        self.sqlite.save_catalog("templates", catalog)
+        self.sqlite.put("templates", "a", {"i": 10})
+        self.assertEqual(list(self.sqlite.load_catalog("templates")), ["z", "a", "m"])
+
+    def test_cache_ttl_and_batching(self):
+        """O cache busca apenas as chaves ausentes, em lote, e expira pelo TTL"""
+        inner = CountingBackend(os.path.join(self.tmp_dir, "counted"))
+        inner.save_catalog("personas", {"a": {"n": 1}, "b": {"n": 2}, "c": {"n": 3}})
+        inner.calls.clear()
+        clock = FakeClock()
+        cached = CachedBackend(inner, ttl=10, clock=clock)
+
+        self.assertEqual(len(cached.load_catalog("personas")), 3)
+        self.assertEqual(inner.calls, [("list_keys", "personas"), ("get_many", "personas", ("a", "b", "c"))])
+
+        inner.calls.clear()
+        cached.load_catalog("personas")
+        cached.get("personas", "b")
+        self.assertEqual(inner.calls, [])
+
+        # Uma chave nova só é buscada uma vez, mesmo ausente
+        cached.get_many("personas", ["a", "d"])
+        cached.get_many("personas", ["a", "d"])
+        self.assertEqual(inner.calls, [("get_many", "personas", ("d",))])
+
+        clock.now = 11
+        inner.calls.clear()
+        cached.get("personas", "a")
+        self.assertEqual(inner.calls, [("get_many", "personas", ("a",))])
+
+    def test_cache_write_through(self):
+        """Escritas atualizam o backend e o cache"""
+        cached = CachedBackend(self.backends["http"], ttl=60)
+        cached.put("models", "m1", {"name": "M1"})
+        self.assertEqual(self.server.data["models"]["m1"], {"name": "M1"})
+        requests = self.server.requests
+        self.assertEqual(cached.get("models", "m1"), {"name": "M1"})
+        self.assertEqual(self.server.requests, requests)
+
+    def test_generator_on_backend(self):
+        """O gerador carrega catálogos e salva prompts pelo backend"""
+        source = JsonFileBackend(os.path.join(parent_dir, "resources"), self.tmp_dir)
+        backend = CachedBackend(create_backend(self.server.url), ttl=60)
+        for namespace in ("models", "personas", "templates"):
+            backend.save_catalog(namespace, source.load_catalog(namespace))
+
+        generator = PromptGenerator(backend)
+        self.assertEqual(list(generator.personas), list(ResourceManager.load_personas()))
+        generator.selected_model = generator.models["claude-opus-4"]
+        generator.selected_persona = generator.personas["excel-expert"]
+        generator.selected_template = generator.templates["qa-template"]
+        generator.task_description = "Somar vendas por região"
+        location = generator.save_prompt(generator.generate_prompt())
+        self.assertTrue(location.startswith(self.server.url))
+
+        keys = backend.list_keys("output")
+        self.assertEqual(len(keys), 1)
+        self.assertEqual(backend.get("output", keys[0])["metadata"]["persona_id"], "excel-expert")
+
+def run_tests():
+    """Executa os testes de validação"""
+    unittest.main(argv=['first-arg-is-ignored'], exit=False)
+
+if __name__ == "__main__":
+    print("Iniciando validação dos backends de armazenamento...\n")
+    run_tests()